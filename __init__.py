@@ -1,5 +1,8 @@
 import logging
+import os
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
+from typing import Any
 
 logger = logging.getLogger("attila")
 
@@ -12,3 +15,40 @@ def get_path() -> str:
     Used in ``pelicanconf.py`` to dynamiccaly fetch theme location on the system.
     """
     return str(ATTILA_ROOT)
+
+
+def get_version() -> str:
+    """Returns the installed theme version, ``"dev"`` for a source checkout."""
+    try:
+        return version("attila")
+    except PackageNotFoundError:
+        return "dev"
+
+
+def get_jinja_environment(
+    cache_dir: str | os.PathLike | None = None,
+    max_size: int | None = None,
+    **options: Any,
+) -> dict[str, Any]:
+    """Returns a ``JINJA_ENVIRONMENT`` with a persistent bytecode cache.
+
+    Compiled templates are kept in ``cache_dir`` (by default
+    ``~/.cache/attila/jinja``) so the next build skips compiling them. Extra
+    keyword arguments are passed through to the Jinja environment::
+
+        JINJA_ENVIRONMENT = attila.get_jinja_environment(
+            extensions=["jinja2.ext.loopcontrols", "jinja2.ext.i18n"],
+        )
+    """
+    from .bytecode_cache import (
+        DEFAULT_MAX_SIZE,
+        ThemeBytecodeCache,
+        default_cache_dir,
+    )
+
+    options["bytecode_cache"] = ThemeBytecodeCache(
+        cache_dir or default_cache_dir(),
+        version=get_version(),
+        max_size=DEFAULT_MAX_SIZE if max_size is None else max_size,
+    )
+    return options
@@ -0,0 +1,128 @@
+"""Archives split in chunks, enabled with ``ATTILA_ARCHIVE_CHUNKS``.
+
+``archives.html`` lists every article in one page, which on large sites is
+slow to render, transfer and parse. With ``ATTILA_ARCHIVE_CHUNKS = "year"``
+it becomes an index of the yearly archives Pelican writes to
+``YEAR_ARCHIVE_SAVE_AS``; with a number, the articles are split in pages of
+at most that many entries, written to ``ATTILA_ARCHIVE_CHUNK_SAVE_AS``. The
+archive templates are then streamed to their file instead of being rendered
+to a string first.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import pairwise
+from typing import TYPE_CHECKING
+
+from . import logger
+
+if TYPE_CHECKING:
+    from pelican.contents import Article
+    from pelican.generators import ArticlesGenerator
+    from pelican.settings import Settings
+    from pelican.writers import Writer
+
+#: Templates the writer streams to their output when chunking is enabled.
+TEMPLATES = ("archives.html", "period_archives.html")
+CHUNK_SAVE_AS = "archives/{number}.html"
+CHUNK_URL = "archives/{number}.html"
+
+
+@dataclass
+class ArchiveChunk:
+    """One page of the archives, as linked from the index."""
+
+    number: int
+    title: str
+    url: str
+    save_as: str
+    articles: list[Article] = field(repr=False)
+    previous: ArchiveChunk | None = field(default=None, repr=False)
+    next: ArchiveChunk | None = field(default=None, repr=False)
+
+    @property
+    def count(self) -> int:
+        return len(self.articles)
+
+
+def _link(chunks: list[ArchiveChunk]) -> list[ArchiveChunk]:
+    for previous, chunk in pairwise(chunks):
+        previous.next, chunk.previous = chunk, previous
+    return chunks
+
+
+def year_chunks(generator: ArticlesGenerator) -> list[ArchiveChunk] | None:
+    """The yearly archives of ``generator``, ``None`` when not written."""
+    if not generator.settings.get("YEAR_ARCHIVE_SAVE_AS"):
+        logger.warning(
+            'ATTILA_ARCHIVE_CHUNKS = "year" needs YEAR_ARCHIVE_SAVE_AS, '
+            "keeping the archives in one page"
+        )
+        return None
+    return _link(
+        [
+            ArchiveChunk(
+                number,
+                str(archive["period"][0]),
+                archive["url"] or archive["save_as"],
+                archive["save_as"],
+                archive["dates"],
+            )
+            for number, archive in enumerate(generator.period_archives["year"], 1)
+        ]
+    )
+
+
+def size_chunks(
+    dates: list[Article], size: int, settings: Settings
+) -> list[ArchiveChunk]:
+    """``dates`` in pages of at most ``size`` articles."""
+    save_as = settings.get("ATTILA_ARCHIVE_CHUNK_SAVE_AS", CHUNK_SAVE_AS)
+    url = settings.get("ATTILA_ARCHIVE_CHUNK_URL", CHUNK_URL)
+    chunks = []
+    for number, start in enumerate(range(0, len(dates), size), 1):
+        articles = dates[start : start + size]
+        chunks.append(
+            ArchiveChunk(
+                number,
+                f"{articles[0].locale_date} – {articles[-1].locale_date}",
+                url.format(number=number),
+                save_as.format(number=number),
+                articles,
+            )
+        )
+    return _link(chunks)
+
+
+def archive_chunks(generator: ArticlesGenerator) -> list[ArchiveChunk] | None:
+    """The chunks ``ATTILA_ARCHIVE_CHUNKS`` asks for, if any."""
+    setting = generator.settings.get("ATTILA_ARCHIVE_CHUNKS")
+    if setting == "year":
+        return year_chunks(generator)
+    if isinstance(setting, int) and not isinstance(setting, bool) and setting > 0:
+        return size_chunks(generator.dates, setting, generator.settings)
+    logger.warning(
+        'ATTILA_ARCHIVE_CHUNKS should be "year" or a number of articles, not %r',
+        setting,
+    )
+    return None
+
+
+def write_chunks(
+    generator: ArticlesGenerator, writer: Writer, chunks: list[ArchiveChunk]
+) -> None:
+    """Write the pages of the size-bounded chunks with ``archives.html``."""
+    template = generator.get_template("archives")
+    for chunk in chunks:
+        writer.write_file(
+            chunk.save_as,
+            template,
+            generator.context,
+            dates=chunk.articles,
+            attila_archive_chunk=chunk,
+            template_name="archives",
+            blog=True,
+            url=chunk.url,
+            relative_urls=generator.settings["RELATIVE_URLS"],
+        )
@@ -0,0 +1,279 @@
+"""Bundled, minified and fingerprinted stylesheets and scripts.
+
+The theme stylesheet and scripts are concatenated with the local
+``CSS_OVERRIDE`` and ``JS_OVERRIDE`` entries, minified and written under
+``THEME_STATIC_DIR`` with the hash of their content in their name, so they
+can be cached for good. Remote entries are linked as they are, in order.
+"""
+
+from __future__ import annotations
+
+import os
+import posixpath
+import re
+from dataclasses import dataclass, field
+from hashlib import sha1
+from typing import TYPE_CHECKING
+
+from . import logger
+from .fonts import drop_legacy_formats
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pelican.generators import Generator
+    from pelican.settings import Settings
+
+#: Theme files bundled ahead of the overrides, relative to the static paths.
+THEME_CSS = ("css/style.css",)
+THEME_JS = ("js/fitvids.js", "js/script.js", "js/scroll.js")
+#: jQuery plugins bundled first with ``ATTILA_JQUERY``.
+JQUERY_JS = ("js/jquery.fitvids.js",)
+#: Theme files linked on their own by some templates only.
+THEME_FILES = ("js/search.js",)
+
+BUNDLE_NAME = "attila"
+HASH_LENGTH = 10
+
+_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+_IMPORT = re.compile(
+    r"""@import\s+(?:url\(\s*(['"]?)([^'")]+)\1\s*\)|(['"])([^'"]+)\3)\s*([^;]*);\s*"""
+)
+_CHARSET = re.compile(r"@charset\s+[^;]+;\s*")
+_SCHEME = re.compile(r"^[a-z][a-z0-9+.-]*:", re.IGNORECASE)
+
+
+@dataclass
+class Assets:
+    """What ``base.html`` links instead of the theme and override files.
+
+    ``css`` and ``js`` are site relative paths of the bundles and the remote
+    URLs of the overrides, in order; ``files`` maps theme static files to
+    their fingerprinted path.
+    """
+
+    css: list[str] = field(default_factory=list)
+    js: list[str] = field(default_factory=list)
+    files: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Source:
+    #: Path of the file in the output, relative to the site.
+    url: str
+    #: Path of the file to read.
+    path: str
+
+
+def fingerprint(data: bytes) -> str:
+    return sha1(data).hexdigest()[:HASH_LENGTH]
+
+
+def is_remote(url: str) -> bool:
+    # Same check as the templates use for CSS_OVERRIDE and JS_OVERRIDE.
+    return url.lower().startswith("http")
+
+
+def minify(kind: str, text: str) -> str:
+    """Minify CSS or JS with minify-html, which pelican-minify depends on."""
+    try:
+        import minify_html
+    except ImportError:
+        logger.debug("minify-html is not installed, %s left as is", kind)
+        return text
+
+    tag = "style" if kind == "css" else "script"
+    if f"</{tag}" in text.lower():
+        return text
+    wrapped = minify_html.minify(
+        f"<{tag}>{text}</{tag}>", minify_css=True, minify_js=True
+    )
+    start, end = f"<{tag}>", f"</{tag}>"
+    if not (wrapped.startswith(start) and wrapped.endswith(end)):
+        return text
+    return wrapped[len(start) : -len(end)]
+
+
+def _relocate(url: str, source_dir: str, target_dir: str) -> str:
+    if not url or url.startswith(("/", "#")) or _SCHEME.match(url):
+        return url
+    path, sep, suffix = url, "", ""
+    if (match := re.search(r"[?#]", url)) is not None:
+        path, sep, suffix = url[: match.start()], match.group(), url[match.end() :]
+    relocated = posixpath.relpath(
+        posixpath.normpath(posixpath.join(source_dir, path)), target_dir
+    )
+    return relocated + sep + suffix
+
+
+def relocate_css(text: str, source_dir: str, target_dir: str) -> tuple[str, list[str]]:
+    """Rewrite the relative URLs of a stylesheet moved to ``target_dir``.
+
+    Returns the stylesheet without its ``@charset`` and ``@import`` rules, and
+    the rewritten ``@import`` rules, which have to open the bundle.
+    """
+    imports = []
+
+    def _import(match: re.Match) -> str:
+        url = _relocate(match.group(2) or match.group(4), source_dir, target_dir)
+        media = f" {match.group(5).strip()}" if match.group(5).strip() else ""
+        imports.append(f'@import url("{url}"){media};')
+        return ""
+
+    def _url(match: re.Match) -> str:
+        url = _relocate(match.group(2), source_dir, target_dir)
+        return f'url("{url}")' if match.group(1) else f"url({url})"
+
+    text = _CHARSET.sub("", text)
+    text = _IMPORT.sub(_import, text)
+    if source_dir != target_dir:
+        text = _URL.sub(_url, text)
+    return text, imports
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+class AssetBuilder:
+    """Writes the bundles and fingerprinted files of one build."""
+
+    def __init__(self, settings: Settings, output_path: str) -> None:
+        self.settings = settings
+        self.output_path = output_path
+        self.static_dir = settings.get("THEME_STATIC_DIR", "theme")
+        self.written: set[str] = set()
+
+    def theme_file(self, name: str) -> Source | None:
+        # Later THEME_STATIC_PATHS override earlier ones when Pelican copies them.
+        for static_path in reversed(
+            self.settings.get("THEME_STATIC_PATHS", ["static"])
+        ):
+            path = os.path.join(self.settings["THEME"], static_path, name)
+            if os.path.isfile(path):
+                return Source(f"{self.static_dir}/{name}", path)
+        return None
+
+    def write(self, directory: str, stem: str, ext: str, data: str) -> str:
+        """Write ``data`` as ``directory/stem.<hash>.ext``, returns its URL."""
+        encoded = data.encode("utf-8")
+        url = f"{directory}/{stem}.{fingerprint(encoded)}.{ext}"
+        path = os.path.join(self.output_path, *url.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(encoded)
+        self.written.add(url)
+        return url
+
+    def bundle(self, kind: str, sources: list[Source]) -> str:
+        target_dir = f"{self.static_dir}/{kind}"
+        if kind == "css":
+            imports, parts = [], []
+            for source in sources:
+                text, source_imports = relocate_css(
+                    _read(source.path), posixpath.dirname(source.url), target_dir
+                )
+                imports.extend(source_imports)
+                parts.append(text)
+            text = "\n".join(imports + parts)
+            if self.settings.get("ATTILA_FONT_SUBSET") and not self.settings.get(
+                "ATTILA_FONT_LEGACY_FORMATS"
+            ):
+                text = drop_legacy_formats(text)
+        else:
+            # Guard against files relying on automatic semicolon insertion.
+            text = "\n;".join(_read(source.path) for source in sources)
+        return self.write(target_dir, BUNDLE_NAME, kind, minify(kind, text))
+
+    def link(
+        self, kind: str, theme: Iterable[Source], overrides: Iterable[str | Source]
+    ) -> list[str]:
+        """URLs to link, bundling consecutive local files together."""
+        urls, pending = [], list(theme)
+        for entry in overrides:
+            if isinstance(entry, Source):
+                pending.append(entry)
+                continue
+            if pending:
+                urls.append(self.bundle(kind, pending))
+                pending = []
+            urls.append(entry)
+        if pending:
+            urls.append(self.bundle(kind, pending))
+        return urls
+
+    def clean(self) -> None:
+        """Remove bundles and fingerprinted files of previous builds."""
+        stems = {BUNDLE_NAME} | {
+            posixpath.splitext(posixpath.basename(name))[0] for name in THEME_FILES
+        }
+        pattern = re.compile(
+            rf"^(?:{'|'.join(map(re.escape, stems))})\.[0-9a-f]{{{HASH_LENGTH}}}\.\w+$"
+        )
+        for kind in ("css", "js"):
+            directory = os.path.join(self.output_path, self.static_dir, kind)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                url = f"{self.static_dir}/{kind}/{name}"
+                if pattern.match(name) and url not in self.written:
+                    os.remove(os.path.join(directory, name))
+                    logger.debug("Removed stale asset %s", url)
+
+
+def _overrides(
+    entries: Iterable[str], static_files: dict[str, str]
+) -> list[str | Source]:
+    overrides: list[str | Source] = []
+    for entry in entries or ():
+        if is_remote(entry):
+            overrides.append(entry)
+            continue
+        url = entry.lstrip("/")
+        if url in static_files:
+            overrides.append(Source(url, static_files[url]))
+        else:
+            logger.warning("%s is not a static file, linking it as is", entry)
+            overrides.append(url)
+    return overrides
+
+
+def build_assets(generators: list[Generator]) -> Assets | None:
+    """Write the assets of the site built by ``generators``."""
+    generator = generators[0]
+    settings = generator.settings
+    static_files = {
+        static.url: static.source_path
+        for generator in generators
+        for static in getattr(generator, "staticfiles", ())
+    }
+    builder = AssetBuilder(settings, generator.output_path)
+
+    theme_css = [builder.theme_file(name) for name in THEME_CSS]
+    jquery_js = JQUERY_JS if settings.get("ATTILA_JQUERY") else ()
+    theme_js = [builder.theme_file(name) for name in (*jquery_js, *THEME_JS)]
+    if None in theme_css or None in theme_js:
+        logger.warning("Theme assets not found in %s, not bundling", settings["THEME"])
+        return None
+
+    assets = Assets(
+        css=builder.link(
+            "css", theme_css, _overrides(settings.get("CSS_OVERRIDE"), static_files)
+        ),
+        js=builder.link(
+            "js", theme_js, _overrides(settings.get("JS_OVERRIDE"), static_files)
+        ),
+    )
+    for name in THEME_FILES:
+        if (source := builder.theme_file(name)) is not None:
+            directory, basename = posixpath.split(source.url)
+            stem, ext = posixpath.splitext(basename)
+            kind = ext.lstrip(".")
+            assets.files[name] = builder.write(
+                directory, stem, kind, minify(kind, _read(source.path))
+            )
+    builder.clean()
+    logger.info("Bundled assets: %s", ", ".join(assets.css + assets.js))
+    return assets
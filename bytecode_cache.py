@@ -0,0 +1,102 @@
+"""Persistent Jinja bytecode cache for the theme templates."""
+
+from __future__ import annotations
+
+import os
+from contextlib import suppress
+from hashlib import sha1
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from jinja2 import FileSystemBytecodeCache
+
+from . import logger
+
+if TYPE_CHECKING:
+    from jinja2 import Environment
+    from jinja2.bccache import Bucket
+
+#: Default upper bound of the on-disk cache, in bytes.
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """``$XDG_CACHE_HOME/attila/jinja``, falling back to ``~/.cache``."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "attila" / "jinja"
+
+
+class ThemeBytecodeCache(FileSystemBytecodeCache):
+    """File system bytecode cache keyed on theme version and template source.
+
+    Each entry is named after the theme version, the template name and the
+    hash of its source, so an edited template or a new theme release gets a
+    fresh entry instead of overwriting one another CI job may still read.
+    Stale entries are evicted, least recently used first, once the cache
+    grows past ``max_size`` bytes.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        version: str,
+        max_size: int = DEFAULT_MAX_SIZE,
+    ) -> None:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        super().__init__(str(directory), pattern="attila-%s.cache")
+        self.version = version
+        self.max_size = max_size
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+        self.evict()
+
+    def _entries(self) -> list[Path]:
+        return list(Path(self.directory).glob(self.pattern % "*"))
+
+    def get_bucket(
+        self,
+        environment: Environment,
+        name: str,
+        filename: str | None,
+        source: str,
+    ) -> Bucket:
+        checksum = self.get_source_checksum(source)
+        bucket = super().get_bucket(
+            environment, f"{self.version}|{name}|{checksum}", filename, source
+        )
+        if bucket.code is not None:
+            # Bump the entry so eviction keeps templates still in use.
+            with suppress(OSError):
+                os.utime(self._get_cache_filename(bucket))
+        return bucket
+
+    def get_cache_key(self, name: str, filename: str | None = None) -> str:
+        return sha1(name.encode("utf-8")).hexdigest()
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        super().dump_bytecode(bucket)
+        try:
+            self._size += os.path.getsize(self._get_cache_filename(bucket))
+        except OSError:
+            return
+        if self._size > self.max_size:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits."""
+        if self._size <= self.max_size:
+            return
+        entries = []
+        for entry in self._entries():
+            try:
+                entries.append((entry.stat(), entry))
+            except FileNotFoundError:
+                continue
+        entries.sort(key=lambda item: item[0].st_mtime)
+
+        self._size = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in entries:
+            if self._size <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            self._size -= stat.st_size
+            logger.debug("Evicted template bytecode %s", entry.name)
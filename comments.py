@@ -0,0 +1,65 @@
+"""Disqus comment counts baked into the listing pages.
+
+``partials/comments_count.html`` links every article of the listings to its
+``#disqus_thread``, for Disqus' ``count.js`` to fill in the browser. With
+``ATTILA_COMMENT_COUNTS`` naming a JSON snapshot of the counts, the articles
+found in it are rendered with their count instead, and link to the comments
+so ``count.js`` leaves them alone. The snapshot is either a mapping of Disqus
+identifiers to counts::
+
+    {"/2018/04/with-cover-images.html": 3, "my-identifier": 0}
+
+or a response of the Disqus API ``threads/list`` endpoint, saved as is.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from . import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pelican.contents import Article
+
+
+def disqus_identifier(article: Article) -> str:
+    """Identifier of the thread of ``article``, as the templates give Disqus."""
+    return getattr(article, "disqus_identifier", None) or f"/{article.url}"
+
+
+def _api_counts(threads: Iterable[dict[str, Any]]) -> dict[str, int]:
+    counts = {}
+    for thread in threads:
+        for identifier in thread.get("identifiers") or ():
+            counts[identifier] = int(thread.get("posts", 0))
+    return counts
+
+
+def load_counts(path: str) -> dict[str, int] | None:
+    """Comment counts of the snapshot at ``path`` by identifier."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError) as error:
+        logger.warning("Comment counts not loaded from %s: %s", path, error)
+        return None
+    if isinstance(snapshot, dict) and isinstance(snapshot.get("response"), list):
+        return _api_counts(snapshot["response"])
+    if isinstance(snapshot, dict):
+        return {str(key): int(count) for key, count in snapshot.items()}
+    logger.warning("Comment counts not loaded from %s: not a JSON object", path)
+    return None
+
+
+def apply_counts(articles: Iterable[Article], counts: dict[str, int]) -> int:
+    """Set ``comment_count`` on the ``articles`` in ``counts``, returns how many."""
+    applied = 0
+    for article in articles:
+        count = counts.get(disqus_identifier(article))
+        if count is not None:
+            article.comment_count = count
+            applied += 1
+    return applied
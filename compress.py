@@ -0,0 +1,239 @@
+"""Gzip and brotli copies of the text files of the output.
+
+With ``ATTILA_COMPRESS`` set, every HTML, CSS, JS, XML, JSON, SVG and text
+file of the output gets ``.gz`` and ``.br`` siblings once the site is
+written, for web servers serving them as is (nginx ``gzip_static`` and
+``brotli_static``). Files are compressed in parallel, and the digests of
+their content are kept in ``CACHE_PATH`` so a rebuild only compresses the
+files that changed. Brotli needs ``pip install "attila[compress]"``.
+
+Any output directory can be compressed the same way::
+
+    python -m attila.compress output --cache cache
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING
+
+from . import logger
+from .assets import fingerprint
+from .parallel import pool_size
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from pelican.settings import Settings
+
+#: Output files compressed, by extension.
+EXTENSIONS = (
+    ".html",
+    ".htm",
+    ".css",
+    ".js",
+    ".mjs",
+    ".json",
+    ".map",
+    ".xml",
+    ".atom",
+    ".rss",
+    ".svg",
+    ".txt",
+    ".webmanifest",
+)
+FORMATS = ("gz", "br")
+#: Files smaller than this many bytes are served as they are.
+MIN_SIZE = 256
+CACHE_FILE = "attila-compress.json"
+
+
+@dataclass
+class CompressReport:
+    """Sizes of the compressed files of the output."""
+
+    files: int = 0
+    #: Files compressed by this build, the others were unchanged.
+    compressed: int = 0
+    original_bytes: int = 0
+    #: Total size of the copies, per format.
+    compressed_bytes: dict[str, int] = field(default_factory=dict)
+    #: Sizes of each file and of its copies, by path relative to the output.
+    sizes: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    def add(self, key: str, size: int, sizes: dict[str, int]) -> None:
+        self.files += 1
+        self.original_bytes += size
+        for fmt, compressed in sizes.items():
+            self.compressed_bytes[fmt] = self.compressed_bytes.get(fmt, 0) + compressed
+        self.sizes[key] = {"original": size, **sizes}
+
+    def summary(self) -> str:
+        ratios = ", ".join(
+            f"{fmt} {size / 1024:.0f} KiB ({size / (self.original_bytes or 1):.0%})"
+            for fmt, size in sorted(self.compressed_bytes.items())
+        )
+        return (
+            f"{self.files} files ({self.compressed} compressed), "
+            f"{self.original_bytes / 1024:.0f} KiB: {ratios or 'nothing'}"
+        )
+
+
+def encode(data: bytes, fmt: str) -> bytes:
+    if fmt == "gz":
+        # No timestamp, so unchanged files give identical archives.
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    import brotli
+
+    return brotli.compress(data, quality=11)
+
+
+def compress_file(job: tuple[str, tuple[str, ...]]) -> dict[str, int]:
+    """Write the ``formats`` siblings of ``path``, returns their sizes."""
+    path, formats = job
+    with open(path, "rb") as f:
+        data = f.read()
+    sizes = {}
+    for fmt in formats:
+        encoded = encode(data, fmt)
+        partial = f"{path}.{fmt}.part"
+        with open(partial, "wb") as f:
+            f.write(encoded)
+        os.replace(partial, f"{path}.{fmt}")
+        sizes[fmt] = len(encoded)
+    return sizes
+
+
+def _formats(formats) -> tuple[str, ...]:
+    supported = []
+    for fmt in formats:
+        if fmt not in FORMATS:
+            logger.warning("Unknown compression format %s", fmt)
+            continue
+        if fmt == "br":
+            try:
+                import brotli  # noqa: F401
+            except ImportError:
+                logger.warning("brotli is not installed, not writing .br files")
+                continue
+        supported.append(fmt)
+    return tuple(supported)
+
+
+def _text_files(output_path: str, min_size: int) -> Iterator[tuple[str, int]]:
+    for root, _, files in os.walk(output_path):
+        for name in files:
+            path = os.path.join(root, name)
+            if (
+                name.lower().endswith(EXTENSIONS)
+                and not os.path.islink(path)
+                and (size := os.path.getsize(path)) >= min_size
+            ):
+                yield path, size
+
+
+def _remove_siblings(path: str) -> None:
+    for fmt in FORMATS:
+        try:
+            os.remove(f"{path}.{fmt}")
+        except FileNotFoundError:
+            pass
+
+
+def _run(jobs: list[tuple[str, tuple[str, ...]]], workers: int) -> list[dict]:
+    processes = min(workers, len(jobs))
+    if processes > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        processes = 1
+    if processes <= 1:
+        return [compress_file(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (processes * 4))
+    with multiprocessing.get_context("fork").Pool(processes) as pool:
+        return pool.map(compress_file, jobs, chunksize=chunksize)
+
+
+def compress_output(output_path: str, settings: Settings) -> CompressReport:
+    """Write the compressed siblings of the text files of ``output_path``."""
+    formats = _formats(settings.get("ATTILA_COMPRESS_FORMATS", FORMATS))
+    min_size = settings.get("ATTILA_COMPRESS_MIN_SIZE", MIN_SIZE)
+    cache = os.path.join(settings.get("CACHE_PATH", "cache"), CACHE_FILE)
+    try:
+        with open(cache, encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+
+    # Relative path: [digest of the content, {format: compressed size}]
+    manifest: dict[str, list] = {}
+    report = CompressReport()
+    jobs, pending = [], []
+    for path, size in _text_files(output_path, min_size):
+        key = os.path.relpath(path, output_path).replace(os.sep, "/")
+        with open(path, "rb") as f:
+            digest = fingerprint(f.read())
+        entry = previous.get(key)
+        if (
+            entry is not None
+            and entry[0] == digest
+            and set(entry[1]) == set(formats)
+            and all(os.path.exists(f"{path}.{fmt}") for fmt in formats)
+        ):
+            manifest[key] = entry
+            report.add(key, size, entry[1])
+            continue
+        _remove_siblings(path)
+        jobs.append((path, formats))
+        pending.append((key, digest, size))
+
+    for (key, digest, size), sizes in zip(
+        pending, _run(jobs, pool_size(settings.get("ATTILA_COMPRESS_WORKERS", True)))
+    ):
+        manifest[key] = [digest, sizes]
+        report.add(key, size, sizes)
+    report.compressed = len(jobs)
+
+    # Copies written by earlier builds of files now gone or too small.
+    for key in previous.keys() - manifest.keys():
+        _remove_siblings(os.path.join(output_path, *key.split("/")))
+
+    os.makedirs(os.path.dirname(cache), exist_ok=True)
+    with open(cache, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    if report_path := settings.get("ATTILA_COMPRESS_REPORT"):
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(report), f, indent=2, sort_keys=True)
+    logger.info("Compressed output: %s", report.summary())
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m attila.compress", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("output", help="directory to compress the files of")
+    parser.add_argument(
+        "--cache", default="cache", help="where the digests are kept (default: cache)"
+    )
+    parser.add_argument(
+        "--formats", default=",".join(FORMATS), help="default: %(default)s"
+    )
+    parser.add_argument("--report", help="JSON file the sizes are written to")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    compress_output(
+        args.output,
+        {
+            "CACHE_PATH": args.cache,
+            "ATTILA_COMPRESS_FORMATS": args.formats.split(","),
+            "ATTILA_COMPRESS_REPORT": args.report,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Critical CSS inlined in the rendered pages, per template family.
+
+Once the site is written, pages are grouped by the ``body_class`` of
+``base.html`` (``post-template``, ``home-template``, ``tag-template``...) and
+the stylesheets they link. The rules of those stylesheets matching a sample
+of the pages of a family are inlined in their ``<head>``, and the stylesheets
+themselves are loaded without blocking the first paint.
+"""
+
+from __future__ import annotations
+
+import os
+import posixpath
+import re
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from . import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from bs4 import BeautifulSoup
+    from pelican.settings import Settings
+
+#: Pages of a family the rules are matched against.
+SAMPLE_SIZE = 5
+#: Classes the head scripts of ``base.html`` may set on ``<html>`` before the
+#: first paint, which the rendered pages do not have yet.
+ROOT_CLASSES = ("theme-dark", "theme-light")
+#: At-rules kept whole, as their content does not select elements.
+KEPT_AT_RULES = ("@font-face", "@keyframes", "@-webkit-keyframes", "@property")
+#: At-rules whose rules are filtered like top level ones.
+NESTED_AT_RULES = ("@media", "@supports", "@layer", "@container")
+
+MARKER = "data-attila-critical"
+
+_COMMENT = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/""", re.DOTALL)
+# Pseudo-classes and elements depending on the interaction or the layout,
+# which the elements they apply to have to match without them.
+_PSEUDO = re.compile(
+    r"::?(?:-[a-z]+-[\w-]+|hover|focus(?:-within|-visible)?|active|visited|"
+    r"target|before|after|first-line|first-letter|placeholder|selection|"
+    r"marker|backdrop)(?:\([^)]*\))?",
+    re.IGNORECASE,
+)
+_ARGUMENTS = re.compile(r"\([^()]*\)|\[[^\]]*\]")
+_CLASS = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+_ID = re.compile(r"#(-?[_a-zA-Z][\w-]*)")
+_TYPE = re.compile(r"(?:^|[\s>+~])([a-zA-Z][\w-]*)")
+_LINK = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_ATTR = re.compile(r"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+_BODY_CLASS = re.compile(r"""<body\b[^>]*\bclass\s*=\s*["']([^"']*)["']""")
+
+
+def _split(text: str, separator: str) -> list[str]:
+    """Split ``text`` on ``separator`` outside of parentheses and strings."""
+    parts, depth, quote, start = [], 0, None, 0
+    for index, char in enumerate(text):
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "\"'":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+
+def parse(css: str) -> list[tuple[str, str | None]]:
+    """Top level ``(prelude, block)`` pairs of ``css``.
+
+    Statements such as ``@import`` have no block.
+    """
+    css = _COMMENT.sub(lambda match: match.group(1) or "", css)
+    rules, depth, quote, start, body_start = [], 0, None, 0, 0
+    for index, char in enumerate(css):
+        if quote:
+            if char == quote and css[index - 1] != "\\":
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "{":
+            if depth == 0:
+                body_start = index
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append(
+                    (css[start:body_start].strip(), css[body_start + 1 : index])
+                )
+                start = index + 1
+        elif char == ";" and depth == 0:
+            rules.append((css[start:index].strip(), None))
+            start = index + 1
+    return [(prelude, block) for prelude, block in rules if prelude]
+
+
+def base_selector(selector: str) -> str:
+    """``selector`` without the state only known once the page is displayed."""
+    selector = _PSEUDO.sub("", selector).strip()
+    if not selector or selector[-1] in ">+~" or selector.endswith(" "):
+        selector += "*"
+    return selector
+
+
+def required_names(selector: str) -> tuple[set[str], set[str], set[str]] | None:
+    """Classes, ids and element names any element matching ``selector`` needs.
+
+    Returns ``None`` when the selector is too involved to tell.
+    """
+    if "\\" in selector:
+        return None
+    while True:
+        stripped = _ARGUMENTS.sub("", selector)
+        if stripped == selector:
+            break
+        selector = stripped
+    return (
+        set(_CLASS.findall(selector)),
+        set(_ID.findall(selector)),
+        {name.lower() for name in _TYPE.findall(selector)},
+    )
+
+
+class Family:
+    """Pages sharing a ``body_class`` and stylesheets."""
+
+    def __init__(self, body_class: str, stylesheets: tuple[str, ...]) -> None:
+        self.body_class = body_class
+        self.stylesheets = stylesheets
+        self.pages: list[str] = []
+        self._matched: dict[str, bool] = {}
+        self._classes: set[str] = set(ROOT_CLASSES)
+        self._ids: set[str] = set()
+        self._types: set[str] = set()
+
+    def _index(self, soup: BeautifulSoup) -> None:
+        for element in soup.find_all(True):
+            self._types.add(element.name.lower())
+            self._classes.update(element.get("class", ()))
+            if element.get("id"):
+                self._ids.add(element["id"])
+
+    def _may_match(self, selector: str) -> bool:
+        names = required_names(base_selector(selector))
+        if names is None:
+            return True
+        classes, ids, types = names
+        return classes <= self._classes and ids <= self._ids and types <= self._types
+
+    def _matches(self, selector: str, soups: list[BeautifulSoup]) -> bool:
+        if selector not in self._matched and not self._may_match(selector):
+            self._matched[selector] = False
+        if selector not in self._matched:
+            import soupsieve
+
+            try:
+                compiled = soupsieve.compile(base_selector(selector))
+            except (soupsieve.SelectorSyntaxError, NotImplementedError):
+                # Keep what cannot be checked rather than break the page.
+                self._matched[selector] = True
+            else:
+                self._matched[selector] = any(
+                    compiled.select_one(soup) is not None
+                    for soup in self._variants(selector, soups)
+                )
+        return self._matched[selector]
+
+    @staticmethod
+    def _variants(selector: str, soups: list[BeautifulSoup]) -> Iterator[BeautifulSoup]:
+        """``soups``, then with each root class ``selector`` depends on."""
+        yield from soups
+        for root_class in ROOT_CLASSES:
+            if root_class not in selector:
+                continue
+            for soup in soups:
+                if soup.html is None:
+                    continue
+                classes = soup.html.get("class", [])
+                soup.html["class"] = [*classes, root_class]
+                try:
+                    yield soup
+                finally:
+                    soup.html["class"] = classes
+
+    def _filter(self, rules: list[tuple[str, str | None]], soups) -> Iterator[str]:
+        for prelude, block in rules:
+            lowered = prelude.lower()
+            if block is None:
+                continue
+            if lowered.startswith(KEPT_AT_RULES):
+                yield f"{prelude}{{{block.strip()}}}"
+            elif lowered.startswith(NESTED_AT_RULES):
+                nested = "".join(self._filter(parse(block), soups))
+                if nested:
+                    yield f"{prelude}{{{nested}}}"
+            elif not lowered.startswith("@"):
+                selectors = [
+                    selector.strip()
+                    for selector in _split(prelude, ",")
+                    if self._matches(selector.strip(), soups)
+                ]
+                if selectors:
+                    declarations = " ".join(block.split())
+                    yield f"{','.join(selectors)}{{{declarations}}}"
+
+    def critical_css(self, output_path: str) -> str:
+        from bs4 import BeautifulSoup
+
+        soups = []
+        for page in self.pages[:SAMPLE_SIZE]:
+            with open(page, encoding="utf-8") as f:
+                soups.append(BeautifulSoup(f, "html.parser"))
+            self._index(soups[-1])
+
+        parts = []
+        for stylesheet in self.stylesheets:
+            with open(os.path.join(output_path, stylesheet), encoding="utf-8") as f:
+                parts.extend(self._filter(parse(f.read()), soups))
+        return "".join(parts)
+
+
+def _attributes(tag: str) -> dict[str, str]:
+    return {
+        match.group(1).lower(): next(g for g in match.groups()[1:] if g is not None)
+        for match in _ATTR.finditer(tag)
+    }
+
+
+def _local_path(href: str, page: str, output_path: str, siteurl: str) -> str | None:
+    """Path of the linked stylesheet relative to ``output_path``, if local."""
+    href = re.split(r"[?#]", href, maxsplit=1)[0]
+    if siteurl and href.startswith(siteurl):
+        href = href[len(siteurl) :]
+    elif href.lower().startswith(("http:", "https:", "//", "data:")):
+        return None
+    if href.startswith("/"):
+        path = posixpath.normpath(href.lstrip("/"))
+    else:
+        page_dir = os.path.relpath(os.path.dirname(page), output_path)
+        path = posixpath.normpath(posixpath.join(page_dir.replace(os.sep, "/"), href))
+    if path.startswith("../") or not os.path.isfile(os.path.join(output_path, path)):
+        return None
+    return path
+
+
+def _stylesheets(html: str, page: str, output_path: str, siteurl: str):
+    for match in _LINK.finditer(html.split("</head>", 1)[0]):
+        attributes = _attributes(match.group())
+        if attributes.get("rel", "").lower() != "stylesheet" or MARKER in attributes:
+            continue
+        path = _local_path(attributes.get("href", ""), page, output_path, siteurl)
+        if path is not None:
+            yield match.group(), attributes["href"], path
+
+
+def _deferred(href: str) -> str:
+    return (
+        f'<link rel="preload" href="{href}" as="style" {MARKER} '
+        "onload=\"this.onload=null;this.rel='stylesheet'\">"
+        f'<noscript><link rel="stylesheet" href="{href}"></noscript>'
+    )
+
+
+def _pages(output_path: str) -> Iterator[str]:
+    for root, _, files in os.walk(output_path):
+        for name in sorted(files):
+            if name.endswith(".html"):
+                yield os.path.join(root, name)
+
+
+def inline_critical_css(output_path: str, settings: Settings) -> None:
+    """Inline the critical CSS of every page written in ``output_path``."""
+    siteurl = settings.get("SITEURL", "")
+    families: dict[tuple[str, tuple[str, ...]], Family] = {}
+    links: dict[str, list[tuple[str, str]]] = defaultdict(list)
+
+    for page in _pages(output_path):
+        with open(page, encoding="utf-8") as f:
+            html = f.read()
+        match = _BODY_CLASS.search(html)
+        if match is None or MARKER in html.split("</head>", 1)[0]:
+            continue
+        stylesheets = list(_stylesheets(html, page, output_path, siteurl))
+        if not stylesheets:
+            continue
+        key = (match.group(1).strip(), tuple(path for _, _, path in stylesheets))
+        family = families.setdefault(key, Family(*key))
+        family.pages.append(page)
+        links[page] = [(tag, href) for tag, href, _ in stylesheets]
+
+    for family in families.values():
+        css = family.critical_css(output_path)
+        logger.debug(
+            "Critical CSS of %s: %d bytes, %d pages",
+            family.body_class,
+            len(css),
+            len(family.pages),
+        )
+        for page in family.pages:
+            with open(page, encoding="utf-8") as f:
+                html = f.read()
+            for index, (tag, href) in enumerate(links[page]):
+                inlined = f"<style {MARKER}>{css}</style>" if index == 0 else ""
+                html = html.replace(tag, inlined + _deferred(href), 1)
+            # Never leave half a page behind an interrupted build.
+            partial = f"{page}.part"
+            with open(partial, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(partial, page)
+
+    logger.info(
+        "Inlined critical CSS in %d pages of %d template families",
+        len(links),
+        len(families),
+    )
@@ -0,0 +1,298 @@
+"""Incremental publication of the output to a git branch, as ghp-import does.
+
+ghp-import writes every file of the output to a new commit of the
+``gh-pages`` branch. Here, the files are compared with the tree of the last
+published commit, and only those added, changed or removed are written to
+the object database, by several ``git hash-object`` processes at once, and
+staged in a temporary index on top of that tree. The content hashes of the
+published files are kept next to the repository, so unchanged files are not
+even read::
+
+    python -m attila.deploy output --branch gh-pages --push
+    python -m attila.deploy output --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from hashlib import sha1
+from typing import TYPE_CHECKING
+
+from . import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+BRANCH = "gh-pages"
+#: Files per ``git hash-object`` process.
+BATCH_SIZE = 512
+CACHE_DIR = "attila-deploy"
+_REMOVED = "0 " + "0" * 40
+
+
+@dataclass
+class Changes:
+    """Difference between the output and the last published tree."""
+
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    #: Size of the added and changed files.
+    size: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed, {self.size / 1024 / 1024:.1f} MiB to write"
+        )
+
+
+@dataclass
+class _File:
+    path: str
+    mode: str
+    size: int
+    mtime: int
+    sha: str | None = None
+
+
+def blob_sha(path: str, size: int) -> str:
+    """Object name git gives the content of ``path``."""
+    digest = sha1(b"blob %d\0" % size)
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Deployer:
+    """Publishes ``output`` to ``branch`` of the repository at ``repo``."""
+
+    def __init__(
+        self,
+        output: str,
+        branch: str = BRANCH,
+        repo: str = ".",
+        workers: int | None = None,
+    ):
+        self.output = os.path.abspath(output)
+        self.branch = branch
+        self.repo = repo
+        self.workers = workers or os.cpu_count() or 1
+        git_dir = self.git("rev-parse", "--absolute-git-dir").strip()
+        self.cache = os.path.join(git_dir, CACHE_DIR, f"{branch}.json")
+        self.files: dict[str, _File] = {}
+
+    def git(self, *args: str, stdin: str | None = None, env=None) -> str:
+        return subprocess.run(
+            ["git", *args],
+            cwd=self.repo,
+            input=stdin,
+            env={**os.environ, **(env or {})},
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    def published(self) -> tuple[str | None, dict[str, tuple[str, str]]]:
+        """Last commit of the branch and its files, ``{path: (mode, sha)}``."""
+        try:
+            parent = self.git(
+                "rev-parse", "--verify", "-q", f"refs/heads/{self.branch}"
+            )
+        except subprocess.CalledProcessError:
+            return None, {}
+        parent = parent.strip()
+        tree = {}
+        for entry in self.git("ls-tree", "-r", "-z", parent).split("\0"):
+            if entry:
+                meta, path = entry.split("\t", 1)
+                mode, _, sha = meta.split(" ")
+                tree[path] = (mode, sha)
+        return parent, tree
+
+    def _walk(self) -> Iterator[_File]:
+        for root, dirs, names in os.walk(self.output):
+            dirs[:] = [name for name in dirs if name != ".git"]
+            for name in names:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                yield _File(
+                    os.path.relpath(path, self.output).replace(os.sep, "/"),
+                    "100755" if stat.st_mode & 0o111 else "100644",
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                )
+
+    def scan(self) -> dict[str, _File]:
+        """Files of the output with their object names, hashing only new stats."""
+        try:
+            with open(self.cache, encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        files, unknown = {}, []
+        for file in self._walk():
+            files[file.path] = file
+            if (cached := cache.get(file.path)) and cached[:2] == [
+                file.size,
+                file.mtime,
+            ]:
+                file.sha = cached[2]
+            else:
+                unknown.append(file)
+        with ThreadPoolExecutor(self.workers) as pool:
+            shas = pool.map(
+                lambda file: blob_sha(
+                    os.path.join(self.output, *file.path.split("/")), file.size
+                ),
+                unknown,
+            )
+            for file, sha in zip(unknown, shas):
+                file.sha = sha
+        self.files = files
+        return files
+
+    def diff(self, tree: dict[str, tuple[str, str]]) -> Changes:
+        changes = Changes()
+        for path, file in sorted(self.files.items()):
+            if path not in tree:
+                changes.added.append(path)
+            elif tree[path] != (file.mode, file.sha):
+                changes.changed.append(path)
+            else:
+                continue
+            changes.size += file.size
+        changes.removed = sorted(tree.keys() - self.files.keys())
+        return changes
+
+    def write_objects(self, paths: list[str]) -> None:
+        """Write the blobs of ``paths`` with parallel ``git hash-object``."""
+        batches = [
+            paths[start : start + BATCH_SIZE]
+            for start in range(0, len(paths), BATCH_SIZE)
+        ]
+
+        def write(batch: list[str]) -> None:
+            absolute = [os.path.join(self.output, *path.split("/")) for path in batch]
+            shas = self.git(
+                "hash-object",
+                "-w",
+                "--no-filters",
+                "--stdin-paths",
+                stdin="\n".join(absolute) + "\n",
+            ).split()
+            for path, sha in zip(batch, shas):
+                if sha != self.files[path].sha:
+                    raise RuntimeError(f"{path} changed while being published")
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            list(pool.map(write, batches))
+
+    def commit(self, parent: str | None, changes: Changes, message: str) -> str:
+        """Commit the output as ``parent`` with ``changes``, move the branch."""
+        entries = [
+            f"{self.files[path].mode} {self.files[path].sha}\t{path}"
+            for path in changes.added + changes.changed
+        ] + [f"{_REMOVED}\t{path}" for path in changes.removed]
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {"GIT_INDEX_FILE": os.path.join(tmp, "index")}
+            if parent:
+                self.git("read-tree", parent, env=env)
+            else:
+                self.git("read-tree", "--empty", env=env)
+            self.git(
+                "update-index",
+                "-z",
+                "--index-info",
+                stdin="\0".join(entries) + "\0",
+                env=env,
+            )
+            tree = self.git("write-tree", env=env).strip()
+        args = ["commit-tree", tree, "-m", message]
+        if parent:
+            args += ["-p", parent]
+        commit = self.git(*args).strip()
+        self.git("update-ref", f"refs/heads/{self.branch}", commit, parent or "0" * 40)
+        return commit
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.cache), exist_ok=True)
+        with open(self.cache, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    path: [file.size, file.mtime, file.sha]
+                    for path, file in self.files.items()
+                },
+                f,
+            )
+
+
+def deploy(
+    output: str,
+    branch: str = BRANCH,
+    message: str | None = None,
+    repo: str = ".",
+    remote: str | None = None,
+    dry_run: bool = False,
+    workers: int | None = None,
+) -> Changes:
+    """Publish ``output`` to ``branch``, pushed to ``remote`` if given."""
+    deployer = Deployer(output, branch, repo, workers)
+    parent, tree = deployer.published()
+    deployer.scan()
+    changes = deployer.diff(tree)
+    logger.info("%s: %s", branch, changes.summary())
+    if dry_run:
+        return changes
+
+    if changes:
+        deployer.write_objects(changes.added + changes.changed)
+        message = message or f"Publish site on {datetime.date.today().isoformat()}"
+        commit = deployer.commit(parent, changes, message)
+        deployer.save()
+        logger.info("Published %s as %s", branch, commit[:10])
+    if remote and (changes or parent is not None):
+        # Even when nothing changed, in case the previous push failed.
+        deployer.git("push", remote, f"refs/heads/{branch}")
+    return changes
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m attila.deploy", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("output", help="directory to publish")
+    parser.add_argument("-b", "--branch", default=BRANCH, help="default: %(default)s")
+    parser.add_argument("-m", "--message", help="commit message")
+    parser.add_argument(
+        "-p", "--push", action="store_true", help="push the branch to --remote"
+    )
+    parser.add_argument("-r", "--remote", default="origin", help="default: %(default)s")
+    parser.add_argument(
+        "-n", "--dry-run", action="store_true", help="only print the changes"
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    deploy(
+        args.output,
+        args.branch,
+        args.message,
+        remote=args.remote if args.push else None,
+        dry_run=args.dry_run,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Web fonts of the theme subset to what the site displays.
+
+Once the site is written, the text of the pages and the ``icon-*`` classes
+they use are collected, and every woff2 font the theme stylesheet declares is
+replaced in the output by a subset holding only those glyphs. The legacy eot,
+svg, ttf and woff formats are dropped from the stylesheets and the output
+unless ``ATTILA_FONT_LEGACY_FORMATS`` is set.
+
+Subsetting needs fontTools with brotli support: ``pip install fonttools[woff]``.
+"""
+
+from __future__ import annotations
+
+import os
+import posixpath
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, ClassVar
+
+from . import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from pelican.settings import Settings
+
+#: Theme stylesheet declaring the fonts, relative to the static paths.
+THEME_CSS = "css/style.css"
+#: Fonts requested before the stylesheet is parsed, as (family, weight, style).
+PRELOAD_FACES = (("icon", "400", "normal"), ("Fira Sans", "400", "normal"))
+LEGACY_FORMATS = (".eot", ".svg", ".ttf", ".woff")
+#: Characters kept in every text font, for what scripts write in the pages.
+BASE_CHARACTERS = {chr(code) for code in range(0x20, 0x7F)} | set(" ©–—‘’“”•…")
+ICON_PREFIX = "icon-"
+
+_FONT_FACE = re.compile(r"@font-face\s*\{([^}]*)\}", re.IGNORECASE)
+_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+_ICON = re.compile(
+    r"""\.(icon-[\w-]+):+before\s*\{\s*content:\s*(['"])\\([0-9a-fA-F]+)\2"""
+)
+_WEIGHTS = {"normal": "400", "bold": "700"}
+
+
+@dataclass
+class FontFace:
+    family: str
+    weight: str
+    style: str
+    #: URL of the woff2 source as written in the stylesheet.
+    url: str
+
+    @property
+    def path(self) -> str:
+        """Path of the font relative to the stylesheet directory."""
+        return re.split(r"[?#]", self.url, maxsplit=1)[0]
+
+
+def _declarations(block: str) -> Iterator[tuple[str, str]]:
+    for declaration in block.split(";"):
+        name, _, value = declaration.partition(":")
+        if value:
+            yield name.strip().lower(), value.strip()
+
+
+def _sources(value: str) -> list[str]:
+    # Font sources are separated by commas outside of url() and format().
+    sources, depth, start = [], 0, 0
+    for index, char in enumerate(value):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            sources.append(value[start:index].strip())
+            start = index + 1
+    sources.append(value[start:].strip())
+    return [source for source in sources if source]
+
+
+def _is_legacy(source: str) -> bool:
+    if source.lower().startswith("local("):
+        return False
+    match = _URL.search(source)
+    path = re.split(r"[?#]", match.group(2), maxsplit=1)[0] if match else ""
+    return path.lower().endswith(LEGACY_FORMATS)
+
+
+def font_faces(css: str) -> list[FontFace]:
+    """Faces of ``css`` with a local woff2 source."""
+    faces = []
+    for match in _FONT_FACE.finditer(css):
+        declarations = dict(_declarations(match.group(1)))
+        woff2 = [
+            url.group(2)
+            for url in _URL.finditer(declarations.get("src", ""))
+            if re.split(r"[?#]", url.group(2), maxsplit=1)[0].endswith(".woff2")
+            and not url.group(2).lower().startswith(("http:", "https:", "//", "/"))
+        ]
+        if woff2:
+            weight = declarations.get("font-weight", "400").lower()
+            faces.append(
+                FontFace(
+                    declarations.get("font-family", "").strip("'\""),
+                    _WEIGHTS.get(weight, weight),
+                    declarations.get("font-style", "normal").lower(),
+                    woff2[0],
+                )
+            )
+    return faces
+
+
+def drop_legacy_formats(css: str) -> str:
+    """Remove the eot, svg, ttf and woff sources of the ``@font-face`` rules."""
+
+    def _font_face(match: re.Match) -> str:
+        declarations = []
+        for declaration in match.group(1).split(";"):
+            name, _, value = declaration.partition(":")
+            if name.strip().lower() == "src":
+                sources = [s for s in _sources(value) if not _is_legacy(s)]
+                if not sources:
+                    continue
+                declaration = f"{name}:{','.join(sources)}"
+            declarations.append(declaration)
+        return "@font-face {" + ";".join(declarations) + "}"
+
+    return _FONT_FACE.sub(_font_face, css)
+
+
+def icon_codepoints(css: str) -> dict[str, int]:
+    """Code point of each ``icon-*`` class of ``css``."""
+    return {match.group(1): int(match.group(3), 16) for match in _ICON.finditer(css)}
+
+
+class _TextCollector(HTMLParser):
+    """Characters and icon classes of a page."""
+
+    #: Elements whose content is not displayed as text.
+    SKIPPED: ClassVar[set[str]] = {"script", "style", "template"}
+    #: Attributes displayed as text.
+    TEXT_ATTRIBUTES: ClassVar[set[str]] = {"alt", "placeholder", "title", "value"}
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.characters: set[str] = set()
+        self.icons: set[str] = set()
+        self._skipped = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED:
+            self._skipped += 1
+        for name, value in attrs:
+            if not value:
+                continue
+            if name == "class":
+                self.icons.update(
+                    token for token in value.split() if token.startswith(ICON_PREFIX)
+                )
+            elif name in self.TEXT_ATTRIBUTES:
+                self.characters.update(value)
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED and self._skipped:
+            self._skipped -= 1
+
+    def handle_data(self, data):
+        if not self._skipped:
+            self.characters.update(data)
+
+
+def collect_text(pages: Iterable[str]) -> tuple[set[str], set[str]]:
+    """Characters displayed and icon classes used by ``pages``."""
+    collector = _TextCollector()
+    for page in pages:
+        with open(page, encoding="utf-8") as f:
+            collector.feed(f.read())
+        collector.close()
+        collector.reset()
+    return collector.characters, collector.icons
+
+
+def _pages(output_path: str) -> Iterator[str]:
+    for root, _, files in os.walk(output_path):
+        for name in sorted(files):
+            if name.endswith(".html"):
+                yield os.path.join(root, name)
+
+
+def _theme_file(settings: Settings, name: str) -> str | None:
+    # Later THEME_STATIC_PATHS override earlier ones when Pelican copies them.
+    for static_path in reversed(settings.get("THEME_STATIC_PATHS", ["static"])):
+        path = os.path.join(settings["THEME"], static_path, *name.split("/"))
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _theme_faces(settings: Settings) -> tuple[str, list[FontFace]]:
+    path = _theme_file(settings, THEME_CSS)
+    if path is None:
+        return "", []
+    with open(path, encoding="utf-8") as f:
+        css = f.read()
+    return css, font_faces(css)
+
+
+def preloads(settings: Settings) -> list[str]:
+    """Site relative URLs of the fonts ``base.html`` preloads."""
+    static_dir = settings.get("THEME_STATIC_DIR", "theme")
+    css_dir = posixpath.dirname(f"{static_dir}/{THEME_CSS}")
+    _, faces = _theme_faces(settings)
+    return [
+        posixpath.normpath(posixpath.join(css_dir, face.path))
+        + face.url[len(face.path) :]
+        for face in faces
+        if (face.family, face.weight, face.style) in PRELOAD_FACES
+    ]
+
+
+def subset(source: str, target: str, unicodes: Iterable[int]) -> None:
+    from fontTools import subset as subsetter
+    from fontTools.ttLib import TTFont
+
+    options = subsetter.Options()
+    options.flavor = "woff2"
+    font = TTFont(source)
+    instance = subsetter.Subsetter(options)
+    instance.populate(unicodes=sorted(unicodes))
+    instance.subset(font)
+    font.flavor = "woff2"
+    font.save(target)
+
+
+def subset_fonts(output_path: str, settings: Settings) -> None:
+    """Subset the theme fonts in ``output_path`` to the glyphs of its pages."""
+    static_dir = settings.get("THEME_STATIC_DIR", "theme")
+    css_dir = posixpath.dirname(THEME_CSS)
+    css, faces = _theme_faces(settings)
+    characters, icons = collect_text(_pages(output_path))
+    text = {ord(char) for char in characters | BASE_CHARACTERS}
+    codepoints = icon_codepoints(css)
+    glyphs = {codepoints[icon] for icon in icons if icon in codepoints}
+
+    try:
+        import fontTools  # noqa: F401
+    except ImportError:
+        logger.warning("fontTools is not installed, fonts are not subset")
+        faces = []
+
+    for face in faces:
+        name = posixpath.normpath(posixpath.join(css_dir, face.path))
+        source = _theme_file(settings, name)
+        target = os.path.join(output_path, static_dir, *name.split("/"))
+        if source is None:
+            continue
+        unicodes = glyphs if face.family == "icon" else text
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        subset(source, target, unicodes)
+        logger.debug(
+            "Subset %s to %d glyphs: %d bytes",
+            name,
+            len(unicodes),
+            os.path.getsize(target),
+        )
+
+    if settings.get("ATTILA_FONT_LEGACY_FORMATS"):
+        return
+    font_dir = os.path.join(output_path, static_dir, "font")
+    if os.path.isdir(font_dir):
+        for name in os.listdir(font_dir):
+            if name.lower().endswith(LEGACY_FORMATS):
+                os.remove(os.path.join(font_dir, name))
+    stylesheet = os.path.join(output_path, static_dir, *THEME_CSS.split("/"))
+    if os.path.isfile(stylesheet):
+        with open(stylesheet, encoding="utf-8") as f:
+            css = f.read()
+        with open(stylesheet, "w", encoding="utf-8") as f:
+            f.write(drop_legacy_formats(css))
+    logger.info(
+        "Subset %d fonts to %d characters and %d icons",
+        len(faces),
+        len(text),
+        len(glyphs),
+    )
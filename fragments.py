@@ -0,0 +1,88 @@
+"""Render-once cache of the site-wide partials, enabled with ``ATTILA_FRAGMENT_CACHE``.
+
+The navigation, the footer and the feed links come out the same on nearly
+every page. With the cache, the templates include them through
+``attila_cached_include(name, *inputs)``: a partial is rendered once per
+distinct ``inputs``, the values of the context it depends on besides the
+settings, and the HTML is reused for the rest of the build. The least
+recently used fragments are dropped past ``ATTILA_FRAGMENT_CACHE_SIZE``.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from jinja2 import Undefined, pass_context
+from markupsafe import Markup
+
+from . import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    from jinja2 import Environment
+    from jinja2.runtime import Context
+
+#: Fragments kept by default.
+DEFAULT_SIZE = 512
+
+
+class FragmentCache:
+    """Rendered fragments by template name and inputs, least recently used first."""
+
+    def __init__(self, size: int = DEFAULT_SIZE) -> None:
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._fragments: OrderedDict[Hashable, Markup] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    @staticmethod
+    def key(name: str, context: Context, inputs: tuple[Any, ...]) -> Hashable:
+        # Undefined variables all compare equal, whatever their name.
+        values = tuple(None if isinstance(v, Undefined) else v for v in inputs)
+        # Relative to the output file with RELATIVE_URLS.
+        return name, context.get("SITEURL"), values
+
+    def include(self, context: Context, name: str, *inputs: Any) -> Markup:
+        """Render ``name`` with ``context``, unless already done for ``inputs``."""
+        key = self.key(name, context, inputs)
+        try:
+            fragment = self._fragments[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable inputs, not worth a fragment.
+            logger.debug("Cannot cache %s for %r", name, inputs)
+            return self.render(context, name)
+        else:
+            self.hits += 1
+            self._fragments.move_to_end(key)
+            return fragment
+
+        self.misses += 1
+        fragment = self._fragments[key] = self.render(context, name)
+        if len(self._fragments) > self.size:
+            self._fragments.popitem(last=False)
+        return fragment
+
+    @staticmethod
+    def render(context: Context, name: str) -> Markup:
+        # What ``{% include %}`` does: the template sees the whole context.
+        template = context.environment.get_template(name, parent=context.name)
+        return Markup(template.render(context.get_all()))
+
+
+def install(environment: Environment, size: int = DEFAULT_SIZE) -> FragmentCache:
+    """Add ``attila_cached_include`` to the globals of ``environment``."""
+    cache = FragmentCache(size)
+
+    @pass_context
+    def attila_cached_include(context: Context, name: str, *inputs: Any) -> Markup:
+        return cache.include(context, name, *inputs)
+
+    environment.globals["attila_cached_include"] = attila_cached_include
+    return cache
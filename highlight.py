@@ -0,0 +1,202 @@
+"""Code blocks highlighted at build time, as highlight.js does in the browser.
+
+``article.html`` and ``page.html`` run ``hljs.highlightElement`` on the code
+blocks once the page is loaded: ``.highlight pre`` for Markdown and reST, and
+``pre.highlight > code[data-lang]`` for AsciiDoc. With ``ATTILA_HIGHLIGHT``
+set, those elements are highlighted with Pygments while the site is built
+instead, with the ``hljs-*`` classes the theme stylesheet colours, and the
+pages do not load highlight.js at all.
+
+Markdown and reST blocks are already split into Pygments tokens by Pelican,
+so only their classes are renamed; AsciiDoc blocks are tokenized here.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from typing import TYPE_CHECKING
+
+from pygments.token import (
+    STANDARD_TYPES,
+    Comment,
+    Generic,
+    Keyword,
+    Name,
+    Number,
+    Operator,
+    String,
+    Token,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pelican.contents import Content
+    from pygments.token import _TokenType
+
+#: highlight.js class of the Pygments token types, inherited by subtypes.
+HLJS_CLASSES = {
+    Comment: "hljs-comment",
+    Comment.Preproc: "hljs-preprocessor",
+    Comment.PreprocFile: "hljs-string",
+    Keyword: "hljs-keyword",
+    Keyword.Constant: "hljs-literal",
+    Keyword.Type: "hljs-type",
+    Name.Attribute: "hljs-attribute",
+    Name.Builtin: "hljs-built_in",
+    Name.Builtin.Pseudo: "hljs-keyword",
+    Name.Class: "hljs-title",
+    Name.Decorator: "hljs-meta",
+    Name.Entity: "hljs-symbol",
+    Name.Function: "hljs-title",
+    Name.Label: "hljs-symbol",
+    Name.Tag: "hljs-tag",
+    Name.Variable: "hljs-variable",
+    String: "hljs-string",
+    String.Regex: "hljs-regexp",
+    String.Symbol: "hljs-symbol",
+    Number: "hljs-number",
+    Operator.Word: "hljs-keyword",
+    Generic.Deleted: "hljs-deletion",
+    Generic.Inserted: "hljs-addition",
+    Generic.Heading: "hljs-section",
+    Generic.Subheading: "hljs-section",
+    Generic.Emph: "hljs-emphasis",
+    Generic.Strong: "hljs-strong",
+}
+#: Source extensions of the AsciiDoc contents.
+ASCIIDOC_EXTENSIONS = (".adoc", ".asciidoc")
+
+_PYGMENTS_TYPES = {name: token for token, name in STANDARD_TYPES.items() if name}
+# What highlight.js sets on the elements it highlighted.
+_MARKER = 'data-highlighted="yes"'
+
+# ".highlight pre": the Pygments block of Markdown and reST.
+_PYGMENTS_BLOCK = re.compile(
+    r"""(<div\b[^>]*\bclass=["'](?:[^"']*\s)?highlight(?:\s[^"']*)?["'][^>]*>\s*)"""
+    r"""<pre\b([^>]*)>(.*?)</pre>""",
+    re.DOTALL,
+)
+# "pre.highlight > code[data-lang]": the source blocks of AsciiDoctor.
+_ASCIIDOC_BLOCK = re.compile(
+    r"""<pre\b([^>]*\bclass=["'](?:[^"']*\s)?highlight(?:\s[^"']*)?["'][^>]*)>"""
+    r"""<code\b([^>]*\bdata-lang=["']([^"']*)["'][^>]*)>(.*?)</code>\s*</pre>""",
+    re.DOTALL,
+)
+_SPAN = re.compile(r"""<span\b([^>]*)>""")
+_CLASS = re.compile(r"""\bclass=(["'])(.*?)\1""")
+_TAG = re.compile(r"<[^>]+>")
+
+
+def hljs_class(token: _TokenType) -> str | None:
+    while token is not Token:
+        if token in HLJS_CLASSES:
+            return HLJS_CLASSES[token]
+        token = token.parent
+    return None
+
+
+def _classes(attributes: str) -> list[str]:
+    match = _CLASS.search(attributes)
+    return match.group(2).split() if match else []
+
+
+def _add_class(attributes: str, *names: str) -> str:
+    classes = _classes(attributes)
+    classes.extend(name for name in names if name not in classes)
+    value = " ".join(classes)
+    if _CLASS.search(attributes):
+        return _CLASS.sub(lambda m: f'class="{value}"', attributes, count=1)
+    return f' class="{value}"{attributes}'
+
+
+def _span(css_class: str | None, text: str) -> str:
+    return f'<span class="{css_class}">{text}</span>' if css_class else text
+
+
+def _rename(match: re.Match) -> str:
+    """A Pygments ``<span>`` with the class highlight.js would give it."""
+    tokens = [_PYGMENTS_TYPES.get(name) for name in _classes(match.group(1))]
+    css_class = next((hljs_class(t) for t in tokens if t is not None), None)
+    # Spans may be nested, as for highlighted lines, so only tags are renamed.
+    return f'<span class="{css_class}">' if css_class else "<span>"
+
+
+def tokenize(code: str, language: str) -> str:
+    """``code`` as highlighted HTML; plain text for unknown languages."""
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+
+    try:
+        lexer = get_lexer_by_name(language, stripnl=False, ensurenl=False)
+    except ClassNotFound:
+        return html.escape(code, quote=False)
+    return "".join(
+        _span(hljs_class(token), html.escape(value, quote=False))
+        for token, value in lexer.get_tokens(code)
+    )
+
+
+def line_numbers(code: str) -> str:
+    """Line numbers of the ``code`` HTML, as the theme script used to add them."""
+    lines = len(re.split(r"\n(?!$)", _TAG.sub("", code)))
+    if lines < 2:
+        return ""
+    numbers = "".join(
+        f'<span class="line" aria-hidden="true">{number}</span>'
+        for number in range(1, lines + 1)
+    )
+    return f'<div class="lines">{numbers}</div>'
+
+
+def _pygments_block(match: re.Match, numbers: bool) -> str:
+    prefix, attributes, code = match.groups()
+    if _MARKER in attributes:
+        return match.group()
+    code = _SPAN.sub(_rename, code)
+    lines = line_numbers(code) if numbers else ""
+    attributes = _add_class(
+        attributes, *(("hljs", "has-lines") if lines else ("hljs",))
+    )
+    return f"{prefix}<pre{attributes} {_MARKER}>{code}{lines}</pre>"
+
+
+def _asciidoc_block(match: re.Match, numbers: bool) -> str:
+    pre_attributes, attributes, language, code = match.groups()
+    if _MARKER in attributes:
+        return match.group()
+    code = tokenize(html.unescape(_TAG.sub("", code)), language)
+    lines = line_numbers(code) if numbers and language != "text" else ""
+    if lines:
+        pre_attributes = _add_class(pre_attributes, "has-lines")
+    attributes = _add_class(attributes, "hljs", f"language-{language}")
+    return (
+        f"<pre{pre_attributes}><code{attributes} {_MARKER}>{code}</code>{lines}</pre>"
+    )
+
+
+def highlight_html(text: str, asciidoc: bool = False, numbers: bool = False) -> str:
+    """Highlight the code blocks of a content, as its template would."""
+    if asciidoc:
+        return _ASCIIDOC_BLOCK.sub(lambda match: _asciidoc_block(match, numbers), text)
+    return _PYGMENTS_BLOCK.sub(lambda match: _pygments_block(match, numbers), text)
+
+
+def highlight_contents(contents: Iterable[Content], numbers: bool = False) -> int:
+    """Highlight the code blocks of ``contents``, returns how many changed."""
+    changed = 0
+    for content in contents:
+        text = getattr(content, "_content", None)
+        if not text or "<pre" not in text:
+            continue
+        source_path = (getattr(content, "source_path", None) or "").lower()
+        # page.html always uses the Markdown and reST selector.
+        asciidoc = content.template == "article" and source_path.endswith(
+            ASCIIDOC_EXTENSIONS
+        )
+        highlighted = highlight_html(text, asciidoc=asciidoc, numbers=numbers)
+        if highlighted != text:
+            content._content = highlighted
+            changed += 1
+    return changed
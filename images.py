@@ -0,0 +1,344 @@
+"""Responsive variants of the cover images and author avatars.
+
+Every local image a template shows as a cover (``cover`` and ``og_image``
+metadata, ``HEADER_COVER``, ``HOME_COVER`` and the ``cover`` of
+``TAG_META``, ``CATEGORY_META`` and ``AUTHOR_META``) or as an avatar (the
+``image`` of ``AUTHOR_META``) is encoded at several widths, in the formats of
+``ATTILA_IMAGE_FORMATS`` plus JPEG, or PNG for images with transparency.
+
+Variants are named after the hash of their source and kept in ``CACHE_PATH``,
+so a rebuild only encodes new or changed images, in parallel, and copies the
+others to the output.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import re
+import shutil
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from pelican.settings import DEFAULT_CONFIG
+from pelican.utils import slugify
+
+from . import logger
+from .assets import fingerprint, is_remote
+from .parallel import pool_size
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from pelican.generators import Generator
+    from pelican.settings import Settings
+
+#: Widths of the variants, per use of the image, capped to the source width.
+WIDTHS = {
+    "cover": (640, 960, 1280, 1920, 2560),
+    "avatar": (96, 192, 384),
+}
+FORMATS = ("avif", "webp")
+MIME_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg", "png": "png"}
+SAVE_OPTIONS = {
+    "avif": {"quality": 50},
+    "webp": {"quality": 75},
+    "jpeg": {"quality": 80, "optimize": True, "progressive": True},
+    "png": {"optimize": True},
+}
+
+#: Where the variants are written, relative to the output.
+OUTPUT_DIR = "images/responsive"
+CACHE_DIR = "attila-images"
+MANIFEST = "manifest.json"
+
+_CONTENT_LISTS = (
+    "articles",
+    "translations",
+    "hidden_articles",
+    "hidden_translations",
+    "drafts",
+    "drafts_translations",
+    "pages",
+    "hidden_pages",
+    "draft_pages",
+    "draft_translations",
+)
+_VARIANT = re.compile(r"^[^/]+\.[0-9a-f]+\.\d+\.\w+$")
+
+
+@dataclass
+class Variant:
+    #: Path of the file in the output, relative to the site.
+    url: str
+    width: int
+
+
+@dataclass
+class SourceSet:
+    """Variants of one format, as a ``srcset``."""
+
+    type: str
+    variants: list[Variant] = field(default_factory=list)
+
+
+@dataclass
+class ResponsiveImage:
+    """What ``partials/image.html`` renders instead of a plain ``<img>``.
+
+    ``sources`` lists the modern formats; the last item of ``fallback``
+    is the largest variant, used as ``src``.
+    """
+
+    width: int
+    height: int
+    sources: list[SourceSet]
+    fallback: SourceSet
+
+    @property
+    def src(self) -> str:
+        return self.fallback.variants[-1].url
+
+
+@dataclass
+class _Source:
+    path: str
+    digest: str
+    uses: set[str] = field(default_factory=set)
+
+
+def _metadata(path: str) -> list | None:
+    """``[width, height, fallback format]`` of an image, ``None`` if unsupported."""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(path) as image:
+            if getattr(image, "is_animated", False):
+                return None
+            alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+            width, height = ImageOps.exif_transpose(image).size
+    except (OSError, UnidentifiedImageError):
+        return None
+    return [width, height, "png" if alpha else "jpeg"]
+
+
+def encode_variant(job: tuple[str, str, int, str]) -> str:
+    """Write ``source`` resized to ``width`` as ``target`` in ``fmt``."""
+    source, target, width, fmt = job
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            height = max(round(image.height * width / image.width), 1)
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        partial = f"{target}.part"
+        image.save(partial, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+    os.replace(partial, target)
+    return target
+
+
+def _theme_file(settings: Settings, name: str) -> str | None:
+    # Later THEME_STATIC_PATHS override earlier ones when Pelican copies them.
+    for static_path in reversed(settings.get("THEME_STATIC_PATHS", ["static"])):
+        path = os.path.join(settings["THEME"], static_path, *name.split("/"))
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def image_urls(generators: list[Generator]) -> Iterator[tuple[str, str]]:
+    """``(url, use)`` of the images the templates may show."""
+    settings = generators[0].settings
+    for generator in generators:
+        for attr in _CONTENT_LISTS:
+            for content in getattr(generator, attr, ()):
+                for name in ("cover", "og_image"):
+                    if url := getattr(content, name, None):
+                        yield url, "cover"
+    for name in ("HEADER_COVER", "HOME_COVER"):
+        if url := settings.get(name):
+            yield url, "cover"
+    for name in ("TAG_META", "CATEGORY_META", "AUTHOR_META"):
+        for meta in (settings.get(name) or {}).values():
+            if url := (meta or {}).get("cover"):
+                yield url, "cover"
+            if name == "AUTHOR_META" and (url := (meta or {}).get("image")):
+                yield url, "avatar"
+
+
+class ImageBuilder:
+    """Encodes and copies the variants of one build."""
+
+    def __init__(self, settings: Settings, output_path: str) -> None:
+        self.settings = settings
+        self.output_path = output_path
+        self.cache_dir = os.path.join(settings.get("CACHE_PATH", "cache"), CACHE_DIR)
+        self.widths = {**WIDTHS, **(settings.get("ATTILA_IMAGE_WIDTHS") or {})}
+        self.formats = self._formats(settings.get("ATTILA_IMAGE_FORMATS", FORMATS))
+        self.manifest: dict[str, list | None] = {}
+        self.written: set[str] = set()
+
+    @staticmethod
+    def _formats(formats) -> list[str]:
+        from PIL import features
+
+        supported = []
+        for fmt in formats:
+            if fmt not in MIME_TYPES:
+                logger.warning("Unknown image format %s", fmt)
+            elif fmt in FORMATS and not features.check(fmt):
+                logger.warning("Pillow cannot encode %s, skipping it", fmt)
+            else:
+                supported.append(fmt)
+        return supported
+
+    def load(self) -> None:
+        try:
+            with open(os.path.join(self.cache_dir, MANIFEST), encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def save(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+
+    def plan(
+        self, key: str, source: _Source, jobs: dict[str, tuple]
+    ) -> ResponsiveImage | None:
+        if source.digest not in self.manifest:
+            self.manifest[source.digest] = _metadata(source.path)
+        if (metadata := self.manifest[source.digest]) is None:
+            return None
+        width, height, fallback = metadata
+
+        ladder = sorted({w for use in source.uses for w in self.widths[use]})
+        widths = [w for w in ladder if w < width] + [min(width, ladder[-1])]
+        # The names go unescaped in ``srcset``, where spaces and commas split
+        # the candidates.
+        subs = self.settings.get(
+            "SLUG_REGEX_SUBSTITUTIONS", DEFAULT_CONFIG["SLUG_REGEX_SUBSTITUTIONS"]
+        )
+        stem = slugify(os.path.splitext(os.path.basename(key))[0], subs) or "image"
+        sets = []
+        for fmt in [*(f for f in self.formats if f != fallback), fallback]:
+            srcset = SourceSet(MIME_TYPES[fmt])
+            for w in widths:
+                name = f"{stem}.{source.digest}.{w}.{EXTENSIONS[fmt]}"
+                cached = os.path.join(self.cache_dir, name)
+                if not os.path.exists(cached):
+                    jobs.setdefault(name, (source.path, cached, w, fmt))
+                srcset.variants.append(Variant(f"{OUTPUT_DIR}/{name}", w))
+                self.written.add(name)
+            sets.append(srcset)
+        return ResponsiveImage(
+            width=widths[-1],
+            height=max(round(height * widths[-1] / width), 1),
+            sources=sets[:-1],
+            fallback=sets[-1],
+        )
+
+    def encode(self, jobs: list[tuple]) -> None:
+        processes = min(
+            pool_size(self.settings.get("ATTILA_IMAGE_WORKERS", True)), len(jobs)
+        )
+        if processes > 1 and "fork" not in multiprocessing.get_all_start_methods():
+            processes = 1
+        if processes <= 1:
+            for job in jobs:
+                encode_variant(job)
+            return
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            for _ in pool.imap_unordered(encode_variant, jobs):
+                pass
+
+    def publish(self) -> None:
+        """Copy the variants to the output, removing those of previous builds."""
+        output_dir = os.path.join(self.output_path, *OUTPUT_DIR.split("/"))
+        os.makedirs(output_dir, exist_ok=True)
+        for name in os.listdir(output_dir):
+            if _VARIANT.match(name) and name not in self.written:
+                os.remove(os.path.join(output_dir, name))
+        for name in sorted(self.written):
+            target = os.path.join(output_dir, name)
+            if not os.path.exists(target):
+                shutil.copyfile(os.path.join(self.cache_dir, name), target)
+
+    def prune(self, digests: set[str]) -> None:
+        """Forget cached variants and sources this build did not use."""
+        self.manifest = {
+            digest: metadata
+            for digest, metadata in self.manifest.items()
+            if digest in digests
+        }
+        for name in os.listdir(self.cache_dir):
+            if _VARIANT.match(name) and name not in self.written:
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+def build_images(generators: list[Generator]) -> dict[str, ResponsiveImage]:
+    """Variants of the images of the site built by ``generators``.
+
+    Returns them by site relative path, the way ``partials/image.html``
+    looks them up.
+    """
+    generator = generators[0]
+    settings = generator.settings
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        logger.warning("Pillow is not installed, images are not resized")
+        return {}
+    static_dir = settings.get("THEME_STATIC_DIR", "theme")
+    static_files = {
+        static.url: static.source_path
+        for generator in generators
+        for static in getattr(generator, "staticfiles", ())
+    }
+
+    sources: dict[str, _Source] = {}
+    for url, use in image_urls(generators):
+        if is_remote(url):
+            continue
+        key = url.lstrip("/")
+        if key not in sources:
+            path = static_files.get(key)
+            if path is None and key.startswith(f"{static_dir}/"):
+                path = _theme_file(settings, key[len(static_dir) + 1 :])
+            if path is None:
+                logger.debug("%s is not a static file, not resizing it", url)
+                continue
+            with open(path, "rb") as f:
+                sources[key] = _Source(path, fingerprint(f.read()))
+        sources[key].uses.add(use)
+
+    builder = ImageBuilder(settings, generator.output_path)
+    builder.load()
+    images, jobs = {}, {}
+    for key, source in sources.items():
+        if (image := builder.plan(key, source, jobs)) is not None:
+            images[key] = image
+
+    os.makedirs(builder.cache_dir, exist_ok=True)
+    builder.encode(list(jobs.values()))
+    builder.publish()
+    builder.prune({source.digest for source in sources.values()})
+    builder.save()
+    logger.info(
+        "Responsive images: %d sources, %d variants encoded, %d reused",
+        len(images),
+        len(jobs),
+        len(builder.written) - len(jobs),
+    )
+    return images
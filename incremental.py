@@ -0,0 +1,194 @@
+"""Dependency graph between rendered outputs and their inputs.
+
+Every output written by :class:`attila.writers.AttilaWriter` is recorded with
+the content sources and theme templates it was rendered from. On the next
+build an output whose inputs all hash the same is left untouched on disk.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from hashlib import sha1
+from typing import TYPE_CHECKING, Any
+
+from jinja2 import meta
+
+from . import get_version, logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from jinja2 import Environment, Template
+    from pelican.contents import Content
+    from pelican.settings import Settings
+
+GRAPH_FILENAME = "attila-incremental.json"
+
+#: Content attributes rendered along with an article, e.g. ``post-nav``.
+LINKED_CONTENT = (
+    "next_article",
+    "prev_article",
+    "next_article_in_category",
+    "prev_article_in_category",
+    "related_posts",
+    "translations",
+)
+
+
+def _stable(value: Any) -> Any:
+    """JSON friendly view of a setting, dropping objects without a stable repr."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): _stable(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_stable(item) for item in value]
+        return sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items
+    return type(value).__qualname__
+
+
+def _digest(*parts: Any) -> str:
+    return sha1(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class DependencyGraph:
+    """Maps each output file to the sources and templates it depends on."""
+
+    def __init__(self, cache_path: str, settings: Settings) -> None:
+        self.path = os.path.join(cache_path, GRAPH_FILENAME)
+        self.settings = settings
+        self.previous: dict[str, dict[str, Any]] = {}
+        self.nodes: dict[str, dict[str, Any]] = {}
+        self._source_hashes: dict[str, str] = {}
+        self._templates: dict[str, tuple[str, set[str]]] = {}
+        self._site_digest: str | None = None
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                graph = json.load(f)
+        except (OSError, ValueError):
+            return
+        if graph.get("version") == get_version():
+            self.previous = graph.get("outputs", {})
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"version": get_version(), "outputs": self.nodes}, f)
+        logger.debug("Saved %d output dependencies to %s", len(self.nodes), self.path)
+
+    def site_digest(self, context: dict[str, Any]) -> str:
+        """Hash of what every page shows: settings, menus, categories and assets."""
+        if self._site_digest is None:
+            pages = [(page.url, page.title) for page in context.get("pages", ())]
+            categories = [
+                str(category) for category, _ in context.get("categories", ())
+            ]
+            settings = {
+                key: _stable(value)
+                for key, value in self.settings.items()
+                if key.isupper()
+            }
+            # Bundled asset and image variant URLs change with their sources,
+            # comment counts with the snapshot.
+            assets = repr(context.get("attila_assets"))
+            images = repr(context.get("attila_images"))
+            counts = repr(context.get("attila_comment_counts"))
+            self._site_digest = _digest(
+                get_version(), settings, pages, categories, assets, images, counts
+            )
+        return self._site_digest
+
+    def source_digest(self, content: Content) -> str:
+        source_path = getattr(content, "source_path", None)
+        if not source_path:
+            return _digest(
+                getattr(content, "url", None), getattr(content, "title", None)
+            )
+        if source_path not in self._source_hashes:
+            try:
+                with open(source_path, "rb") as f:
+                    self._source_hashes[source_path] = sha1(f.read()).hexdigest()
+            except OSError:
+                self._source_hashes[source_path] = ""
+        return self._source_hashes[source_path]
+
+    def _template(self, environment: Environment, name: str) -> tuple[str, set[str]]:
+        if name not in self._templates:
+            source, _, _ = environment.loader.get_source(environment, name)
+            self._templates[name] = (sha1(source.encode("utf-8")).hexdigest(), set())
+            refs = meta.find_referenced_templates(environment.parse(source))
+            referenced = {ref for ref in refs if ref}
+            for ref in tuple(referenced):
+                referenced |= self._template(environment, ref)[1]
+            self._templates[name] = (self._templates[name][0], referenced)
+        return self._templates[name]
+
+    def template_digests(self, template: Template) -> dict[str, str]:
+        """Hashes of ``template`` and every template it extends or includes."""
+        environment = template.environment
+        _, referenced = self._template(environment, template.name)
+        return {
+            name: self._template(environment, name)[0]
+            for name in sorted({template.name, *referenced})
+        }
+
+    def node(
+        self,
+        template: Template,
+        context: dict[str, Any],
+        localcontext: dict[str, Any],
+        kwargs: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Dependencies of the output being rendered with ``localcontext``."""
+        sources = {
+            content.source_path or content.url: self.source_digest(content)
+            for content in self._contents(localcontext, kwargs)
+        }
+        templates = self.template_digests(template)
+        pagination = [
+            (key, value.count, value.num_pages)
+            for key, value in sorted(localcontext.items())
+            if key.endswith("_paginator") and value is not None
+        ]
+        return {
+            "digest": _digest(
+                self.site_digest(context), templates, sources, pagination
+            ),
+            "sources": sorted(sources),
+            "templates": sorted(templates),
+        }
+
+    def _contents(
+        self, localcontext: dict[str, Any], kwargs: dict[str, Any]
+    ) -> Iterator[Content]:
+        for key in ("article", "page"):
+            if (content := kwargs.get(key)) is not None:
+                yield content
+                yield from self._linked(content)
+
+        # Listings only depend on the entries of the page being rendered.
+        for key in ("articles", "dates"):
+            if key in kwargs:
+                page = localcontext.get(f"{key}_page")
+                yield from page.object_list if page is not None else kwargs[key]
+
+    def _linked(self, content: Content) -> Iterator[Content]:
+        for attr in LINKED_CONTENT:
+            linked = getattr(content, attr, None)
+            if isinstance(linked, list):
+                yield from (item for item in linked if item is not None)
+            elif linked is not None:
+                yield linked
+
+    def is_unchanged(self, name: str, node: dict[str, Any]) -> bool:
+        previous = self.previous.get(name)
+        return previous is not None and previous["digest"] == node["digest"]
+
+    def record(self, name: str, node: dict[str, Any]) -> None:
+        self.nodes[name] = node
@@ -0,0 +1,231 @@
+"""Output files written only when their bytes change.
+
+Pelican rewrites every output of a build, which bumps the modification time
+of unchanged pages and defeats the validators of servers and CDNs. Outputs
+written through an :class:`OutputManifest` are hashed as they are written
+and compared with the digests kept in ``CACHE_PATH`` by the previous build:
+an unchanged file is left as it is, a changed one replaced atomically, and
+the outputs of the previous build that were not written again are deleted.
+The size and modification time of each output are saved once the build is
+done post-processing them, so a file is only left as it is if nothing else
+touched it since.
+``ATTILA_SKIP_UNCHANGED`` makes the writer of the theme plugin use it; the
+``build`` task of ``tasks.py`` syncs the docs with it::
+
+    python -m attila.output staging output --cache cache
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import os
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from hashlib import sha1
+from typing import TYPE_CHECKING, BinaryIO
+
+from . import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+MANIFEST_FILE = "attila-output.json"
+
+#: What happened to one output: relative path, [digest, size], written.
+Outcome = tuple[str, list, bool]
+
+
+@dataclass
+class OutputReport:
+    written: int = 0
+    skipped: int = 0
+    deleted: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.written} written, {self.skipped} unchanged, {self.deleted} deleted"
+        )
+
+
+class OutputFile(io.TextIOBase):
+    """Text file hashing what is written to ``file``, see OutputManifest.open()."""
+
+    def __init__(self, file: BinaryIO, encoding: str) -> None:
+        super().__init__()
+        self._file = file
+        self._encoding = encoding
+        self.digest = sha1()
+        self.size = 0
+        self.outcome: Outcome | None = None
+
+    @property
+    def encoding(self) -> str:
+        return self._encoding
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        data = s.encode(self._encoding)
+        self.digest.update(data)
+        self.size += len(data)
+        self._file.write(data)
+        return len(s)
+
+
+class OutputManifest:
+    """Digests of the files written to ``output_path``, kept in ``cache_path``."""
+
+    def __init__(self, output_path: str, cache_path: str) -> None:
+        self.output_path = output_path
+        self.cache = os.path.join(cache_path, MANIFEST_FILE)
+        try:
+            # The rendered [digest, size] of each output, then the size and
+            # modification time of its file once post-processed.
+            with open(self.cache, encoding="utf-8") as f:
+                self.previous: dict[str, list] = json.load(f)
+        except (OSError, ValueError):
+            self.previous = {}
+        # The rendered [digest, size] of the outputs of this build.
+        self.current: dict[str, list] = {}
+        self.report = OutputReport()
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(path, self.output_path).replace(os.sep, "/")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.output_path, *key.split("/"))
+
+    def _unchanged(self, key: str, path: str, entry: list) -> bool:
+        previous = self.previous.get(key)
+        if previous is None or previous[:2] != entry:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        # Not edited since the previous build was done with it.
+        return previous[2:] == [stat.st_size, stat.st_mtime_ns]
+
+    @contextmanager
+    def open(self, path: str, encoding: str = "utf-8") -> Iterator[OutputFile]:
+        """Text file replacing ``path`` once closed, only if its bytes changed."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.part"
+        try:
+            with open(tmp, "wb") as f, OutputFile(f, encoding) as output:
+                yield output
+        except BaseException:
+            # Keep the previous output rather than half a page.
+            os.remove(tmp)
+            raise
+        output.outcome = self.commit(
+            path, tmp, [output.digest.hexdigest(), output.size]
+        )
+
+    def commit(self, path: str, tmp: str, entry: list) -> Outcome:
+        """Move ``tmp``, with digest and size ``entry``, to ``path`` if changed."""
+        key = self._key(path)
+        written = not self._unchanged(key, path, entry)
+        if written:
+            os.replace(tmp, path)
+        else:
+            os.remove(tmp)
+        outcome = (key, entry, written)
+        self.record(outcome)
+        return outcome
+
+    def write_bytes(self, path: str, data: bytes) -> Outcome:
+        """Write ``data`` to ``path`` unless it is already there."""
+        key = self._key(path)
+        entry = [sha1(data).hexdigest(), len(data)]
+        if self._unchanged(key, path, entry):
+            outcome = (key, entry, False)
+            self.record(outcome)
+            return outcome
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        return self.commit(path, tmp, entry)
+
+    def record(self, outcome: Outcome) -> None:
+        """Account for an output written elsewhere, e.g. by a worker process."""
+        key, entry, written = outcome
+        self.current[key] = entry
+        if written:
+            self.report.written += 1
+        else:
+            self.report.skipped += 1
+
+    def keep(self, path: str) -> None:
+        """Account for an output left as it is without rendering it."""
+        key = self._key(path)
+        if key in self.previous:
+            self.current[key] = self.previous[key][:2]
+            self.report.skipped += 1
+
+    def finish(self, delete: bool = True) -> OutputReport:
+        """Delete the outputs not written again and save the digests."""
+        for key in self.previous.keys() - self.current.keys():
+            if not delete:
+                self.current[key] = self.previous[key][:2]
+                continue
+            with suppress(FileNotFoundError):
+                os.remove(self._path(key))
+                self.report.deleted += 1
+        self.save()
+        logger.info("Output: %s", self.report.summary())
+        return self.report
+
+    def save(self) -> None:
+        """Save the digests with the current state of the files.
+
+        Called again once the outputs are post-processed, e.g. by
+        ``ATTILA_CRITICAL_CSS``, so that the next build leaves them as they are.
+        """
+        entries: dict[str, list] = {}
+        for key, entry in self.current.items():
+            try:
+                stat = os.stat(self._path(key))
+            except OSError:
+                continue
+            entries[key] = [*entry, stat.st_size, stat.st_mtime_ns]
+        os.makedirs(os.path.dirname(self.cache), exist_ok=True)
+        with open(self.cache, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+
+
+def sync_tree(source: str, output_path: str, cache_path: str) -> OutputReport:
+    """Copy the files of ``source`` to ``output_path``, the changed ones only."""
+    manifest = OutputManifest(output_path, cache_path)
+    for root, _, names in os.walk(source):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            manifest.write_bytes(
+                os.path.join(output_path, os.path.relpath(path, source)), data
+            )
+    return manifest.finish()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m attila.output", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("source", help="directory of the freshly built files")
+    parser.add_argument("output", help="directory to update")
+    parser.add_argument(
+        "--cache", default="cache", help="where the digests are kept (default: cache)"
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sync_tree(args.source, args.output, args.cache)
+
+
+if __name__ == "__main__":
+    main()
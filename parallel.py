@@ -0,0 +1,96 @@
+"""Render deferred pages across a pool of forked processes."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Any
+
+from . import logger, profiling
+
+if TYPE_CHECKING:
+    from jinja2 import Template
+
+    from .output import Outcome, OutputManifest
+
+#: Pending pages rendered at once; bounds the local contexts kept in memory.
+BATCH_SIZE = 4096
+
+# Set right before forking, so workers inherit the jobs instead of having
+# Jinja templates and Pelican contents pickled to them.
+_JOBS: list[RenderJob] = []
+
+
+@dataclass
+class RenderJob:
+    """A page ``Writer.write_file`` would have rendered and written."""
+
+    path: str
+    template: Template
+    localcontext: dict[str, Any]
+    context: dict[str, Any]
+    #: Set with ``ATTILA_SKIP_UNCHANGED``.
+    manifest: OutputManifest | None = None
+
+    def _open(self) -> AbstractContextManager[IO[str]]:
+        if self.manifest is not None:
+            return self.manifest.open(self.path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        return open(self.path, "w", encoding="utf-8")
+
+    def run(self) -> Outcome | None:
+        # Writer._write_file updates the shared context before rendering so
+        # that contents resolve their links against the right SITEURL.
+        if self.localcontext["localsiteurl"]:
+            self.context["localsiteurl"] = self.localcontext["localsiteurl"]
+        with self._open() as f:
+            # Chunk by chunk, the page is never held whole in memory.
+            self.template.stream(self.localcontext).dump(f)
+        return getattr(f, "outcome", None)
+
+
+def _run_job(index: int) -> tuple[dict[str, Any], Outcome | None]:
+    outcome = _JOBS[index].run()
+    profiler = profiling.get_profiler()
+    return profiler.collect() if profiler is not None else {}, outcome
+
+
+def pool_size(setting: bool | int) -> int:
+    """Number of processes asked for by ``ATTILA_PARALLEL_RENDER``."""
+    if setting is True:
+        return os.cpu_count() or 1
+    return max(int(setting or 0), 0)
+
+
+def run_jobs(jobs: list[RenderJob], processes: int) -> None:
+    """Render ``jobs`` with up to ``processes`` forked workers."""
+    global _JOBS
+
+    if processes > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        logger.warning("Parallel rendering needs fork(), rendering serially")
+        processes = 1
+    processes = min(processes, len(jobs))
+    if processes <= 1:
+        for job in jobs:
+            job.run()
+        return
+
+    _JOBS = jobs
+    try:
+        chunksize = max(1, len(jobs) // (processes * 4))
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            results = pool.imap_unordered(
+                _run_job, range(len(jobs)), chunksize=chunksize
+            )
+            profiler = profiling.get_profiler()
+            for stats, outcome in results:
+                if profiler is not None:
+                    profiler.merge(stats)
+                if outcome is not None:
+                    # The workers only updated their copy of the manifest.
+                    jobs[0].manifest.record(outcome)
+    finally:
+        _JOBS = []
+    logger.debug("Rendered %d pages with %d processes", len(jobs), processes)
@@ -0,0 +1,377 @@
+"""Pelican plugin shipped with the attila theme.
+
+Enable it next to the theme in ``pelicanconf.py``::
+
+    import attila
+
+    THEME = attila.get_path()
+    PLUGINS = [..., "attila.plugin"]
+
+The templates keep working without it; when enabled, values the templates
+would otherwise work out on every render are resolved once per content object.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import TYPE_CHECKING
+
+from jinja2.filters import do_title
+from markupsafe import Markup
+from pelican import signals
+from pelican.generators import ArticlesGenerator
+
+from . import (
+    archives,
+    assets,
+    comments,
+    compress,
+    critical_css,
+    fonts,
+    fragments,
+    highlight,
+    images,
+    logger,
+    profiling,
+    search_index,
+    spill,
+    vendor,
+)
+from .writers import AttilaWriter, finalize_writers, save_manifests
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pelican import Pelican
+    from pelican.contents import Article, Content
+    from pelican.generators import Generator, PagesGenerator
+    from pelican.settings import Settings
+    from pelican.urlwrappers import Author, URLWrapper
+    from pelican.writers import Writer
+
+
+def absolute_url(path: str, siteurl: str) -> str:
+    """Prefix ``path`` with ``siteurl`` unless it already is an ``http`` URL.
+
+    Mirrors the ``|lower|truncate(4)`` / ``startswith('/')`` checks the
+    templates use for covers, avatars and user defined assets.
+    """
+    if path.lower().startswith("http"):
+        return path
+    if path.startswith("/"):
+        return siteurl + path
+    return siteurl + "/" + path
+
+
+def _first_url(candidates: Iterable[str | None], siteurl: str) -> str | None:
+    for candidate in candidates:
+        if candidate:
+            return absolute_url(candidate, siteurl)
+    return None
+
+
+def resolve_header(content: Content, settings: Settings, is_page: bool = False):
+    """Returns ``(selected_cover, selected_color)`` for the post header.
+
+    Articles prefer their own ``color`` over ``HEADER_COVER`` while pages fall
+    back to the site covers first, as ``article.html`` and ``page.html`` do.
+    """
+    siteurl = settings.get("SITEURL", "")
+    cover = getattr(content, "cover", None)
+    og_image = getattr(content, "og_image", None)
+    color = getattr(content, "color", None)
+    header_cover = settings.get("HEADER_COVER")
+
+    if is_page:
+        covers = (cover, og_image, header_cover, settings.get("HOME_COVER"))
+        if selected_cover := _first_url(covers, siteurl):
+            return selected_cover, None
+        return None, color or settings.get("HEADER_COLOR") or None
+
+    if selected_cover := _first_url((cover, og_image), siteurl):
+        return selected_cover, None
+    if color:
+        return None, color
+    if header_cover:
+        return absolute_url(header_cover, siteurl), None
+    return None, settings.get("HEADER_COLOR") or None
+
+
+def resolve_og_cover(content: Content, settings: Settings) -> str:
+    """Cover used by ``partials/og_article.html``."""
+    siteurl = settings.get("SITEURL", "")
+    candidates = (
+        getattr(content, "og_image", None),
+        getattr(content, "cover", None),
+        settings.get("HEADER_COVER"),
+        settings.get("HOME_COVER"),
+    )
+    return _first_url(candidates, siteurl) or "{}/{}/images/home-bg.jpg".format(
+        siteurl, settings.get("THEME_STATIC_DIR", "theme")
+    )
+
+
+def resolve_jsonld_cover(content: Content, settings: Settings) -> str:
+    """Cover used by ``partials/jsonld_article.html``."""
+    siteurl = settings.get("SITEURL", "")
+    candidates = (
+        getattr(content, "og_image", None),
+        getattr(content, "cover", None),
+        settings.get("HEADER_COVER"),
+    )
+    return _first_url(candidates, siteurl) or "{}/{}/images/post-bg.jpg".format(
+        siteurl, settings.get("THEME_STATIC_DIR", "theme")
+    )
+
+
+def resolve_author(author: Author, settings: Settings) -> tuple[str, str]:
+    """Returns ``(display_name, avatar)`` of an author from ``AUTHOR_META``."""
+    author_meta = settings.get("AUTHOR_META") or {}
+    meta = author_meta.get(author.name.lower())
+    if meta is None:
+        # What the ``|title`` fallback of the templates renders.
+        return do_title(author.name), ""
+
+    avatar = meta.get("image")
+    if avatar and not avatar.lower().startswith("http"):
+        avatar = settings.get("SITEURL", "") + "/" + avatar
+    return meta.get("name") or author.name, avatar or ""
+
+
+#: Lengths the templates cut the summary to: listings, meta descriptions and
+#: the previous and next article teasers.
+EXCERPT_LENGTHS = (250, 140, 90)
+#: Jinja's default ``truncate.leeway`` policy.
+TRUNCATE_LEEWAY = 5
+
+
+def truncate(text: str, length: int) -> str:
+    """Jinja's ``truncate(length)`` filter."""
+    if len(text) <= length + TRUNCATE_LEEWAY:
+        return text
+    return text[: length - 3].rsplit(" ", 1)[0] + "..."
+
+
+def excerpts(summary: str | None) -> dict[int, str]:
+    """``summary|striptags|truncate(length)`` for each of ``EXCERPT_LENGTHS``."""
+    text = Markup(summary or "").striptags()
+    return {length: truncate(text, length) for length in EXCERPT_LENGTHS}
+
+
+def precompute_content(content: Content, settings: Settings, is_page: bool = False):
+    """Attach the resolved template values to ``content`` and its authors."""
+    content.selected_cover, content.selected_color = resolve_header(
+        content, settings, is_page=is_page
+    )
+    content.og_cover = resolve_og_cover(content, settings)
+    content.jsonld_cover = resolve_jsonld_cover(content, settings)
+    # Pages without code blocks do not load highlight.js when self-hosted.
+    content.has_code = "<pre" in (getattr(content, "_content", None) or "")
+    for author in getattr(content, "authors", ()):
+        author.display_name, author.avatar = resolve_author(author, settings)
+
+
+@dataclass
+class IndexEntry:
+    """A tag, category or author as listed by ``tags.html`` and friends."""
+
+    item: URLWrapper
+    articles: list[Article]
+    count: int
+    #: Tag cloud font size, from 1 to ``TAG_CLOUD_STEPS``.
+    weight: int
+
+
+def build_index(
+    items: Iterable[tuple[URLWrapper, list[Article]]], steps: int | None = None
+) -> list[IndexEntry]:
+    """Sorted index of ``(item, articles)`` pairs, as in the generator context.
+
+    Weights are bucketed against the most used item, the same way the tag
+    cloud of ``tags.html`` does when the plugin is disabled.
+    """
+    items = sorted(items, key=itemgetter(0))
+    max_count = max((len(articles) for _, articles in items), default=0) or 1
+    bucket = max_count / max((steps or 5) - 1, 1)
+    return [
+        IndexEntry(item, articles, len(articles), int(len(articles) / bucket) + 1)
+        for item, articles in items
+    ]
+
+
+_INDEXES = (
+    ("tags", "tag_index"),
+    ("categories", "category_index"),
+    ("authors", "author_index"),
+)
+
+
+def index_taxonomies(generator: ArticlesGenerator) -> None:
+    """Expose ``tag_index``, ``category_index`` and ``author_index`` to templates."""
+    steps = generator.settings.get("TAG_CLOUD_STEPS")
+    for name, index in _INDEXES:
+        generator.context[index] = build_index(generator.context.get(name, ()), steps)
+
+
+_ARTICLE_LISTS = (
+    "articles",
+    "translations",
+    "hidden_articles",
+    "hidden_translations",
+    "drafts",
+    "drafts_translations",
+)
+_PAGE_LISTS = (
+    "pages",
+    "translations",
+    "hidden_pages",
+    "hidden_translations",
+    "draft_pages",
+    "draft_translations",
+)
+
+
+def _relative_urls(settings: Settings) -> bool:
+    # Pelican rewrites SITEURL per output file in that mode, so anything
+    # prefixed here would point to the wrong place. Let the templates do it.
+    if settings.get("RELATIVE_URLS"):
+        logger.debug("RELATIVE_URLS is set, skipping attila precomputation")
+        return True
+    return False
+
+
+def content_object_init(content: Content) -> None:
+    settings = content.settings
+    if settings.get("ATTILA_HIGHLIGHT"):
+        # Before anything renders and memoizes the content.
+        highlight.highlight_contents(
+            [content], numbers=settings.get("ATTILA_HIGHLIGHT_LINE_NUMBERS", False)
+        )
+
+
+def article_generator_finalized(generator: ArticlesGenerator) -> None:
+    index_taxonomies(generator)
+    if (snapshot := generator.settings.get("ATTILA_COMMENT_COUNTS")) and (
+        counts := comments.load_counts(snapshot)
+    ) is not None:
+        generator.context["attila_comment_counts"] = counts
+        for attr in _ARTICLE_LISTS:
+            comments.apply_counts(getattr(generator, attr, ()), counts)
+    if (
+        generator.settings.get("ATTILA_ARCHIVE_CHUNKS")
+        and (chunks := archives.archive_chunks(generator)) is not None
+    ):
+        generator.context["attila_archive_index"] = chunks
+    if _relative_urls(generator.settings):
+        return
+    for attr in _ARTICLE_LISTS:
+        for article in getattr(generator, attr, ()):
+            precompute_content(article, generator.settings)
+
+
+def page_generator_finalized(generator: PagesGenerator) -> None:
+    if _relative_urls(generator.settings):
+        return
+    for attr in _PAGE_LISTS:
+        for page in getattr(generator, attr, ()):
+            precompute_content(page, generator.settings, is_page=True)
+
+
+def all_generators_finalized(generators: list[Generator]) -> None:
+    context = generators[0].context
+    # Rendering the summary resolves its links, and memoizes the content, so
+    # only once every generator knows its contents. It does not depend on
+    # SITEURL.
+    for generator in generators:
+        if isinstance(generator, ArticlesGenerator):
+            for attr in _ARTICLE_LISTS:
+                for article in getattr(generator, attr, ()):
+                    article.excerpts = excerpts(article.summary)
+    if (
+        generators[0].settings.get("ATTILA_ASSETS")
+        and (bundled := assets.build_assets(generators)) is not None
+    ):
+        context["attila_assets"] = bundled
+    if generators[0].settings.get("ATTILA_IMAGES"):
+        context["attila_images"] = images.build_images(generators)
+    if generators[0].settings.get("ATTILA_HIGHLIGHT"):
+        context["attila_highlight"] = True
+    if (
+        generators[0].settings.get("ATTILA_SELF_HOSTED")
+        and (vendored := vendor.vendored(generators[0].settings)) is not None
+    ):
+        context["attila_vendor"] = vendored
+    if generators[0].settings.get("ATTILA_FONT_SUBSET"):
+        context["attila_font_preloads"] = fonts.preloads(generators[0].settings)
+    if generators[0].settings.get("ATTILA_SPILL"):
+        context["attila_spill"] = spill.make_store(generators[0].settings)
+
+
+def content_written(path: str, context: dict) -> None:
+    if context.get("attila_spill") is not None:
+        # Its HTML is read back from the store by the listings.
+        spill.forget_written(context)
+
+
+def article_writer_finalized(generator: ArticlesGenerator, writer: Writer) -> None:
+    chunks = generator.context.get("attila_archive_index")
+    if chunks and generator.settings.get("ATTILA_ARCHIVE_CHUNKS") != "year":
+        archives.write_chunks(generator, writer, chunks)
+    if generator.settings.get("ATTILA_SEARCH_INDEX"):
+        search_index.write_index(generator)
+
+
+#: Settings enabling one of the build modes of :class:`attila.writers.AttilaWriter`.
+WRITER_SETTINGS = (
+    "ATTILA_INCREMENTAL",
+    "ATTILA_PARALLEL_RENDER",
+    "ATTILA_ARCHIVE_CHUNKS",
+    "ATTILA_SPILL",
+    "ATTILA_SKIP_UNCHANGED",
+)
+
+
+def generator_init(generator: Generator) -> None:
+    if generator.settings.get("ATTILA_FRAGMENT_CACHE"):
+        fragments.install(
+            generator.env,
+            generator.settings.get(
+                "ATTILA_FRAGMENT_CACHE_SIZE", fragments.DEFAULT_SIZE
+            ),
+        )
+    if generator.settings.get("ATTILA_PROFILE"):
+        profiling.instrument(generator.env)
+
+
+def finalized(pelican: Pelican) -> None:
+    finalize_writers()
+    spill.prune_stores()
+    if pelican.settings.get("ATTILA_FONT_SUBSET"):
+        fonts.subset_fonts(pelican.output_path, pelican.settings)
+    if pelican.settings.get("ATTILA_CRITICAL_CSS"):
+        critical_css.inline_critical_css(pelican.output_path, pelican.settings)
+    # Last, once nothing rewrites the output anymore.
+    if pelican.settings.get("ATTILA_COMPRESS"):
+        compress.compress_output(pelican.output_path, pelican.settings)
+    save_manifests()
+    if pelican.settings.get("ATTILA_PROFILE"):
+        profiling.finish(pelican.settings)
+
+
+def get_writer(pelican: Pelican):
+    if any(pelican.settings.get(setting) for setting in WRITER_SETTINGS):
+        return AttilaWriter
+    return None
+
+
+def register() -> None:
+    signals.content_object_init.connect(content_object_init)
+    signals.article_generator_finalized.connect(article_generator_finalized)
+    signals.page_generator_finalized.connect(page_generator_finalized)
+    signals.all_generators_finalized.connect(all_generators_finalized)
+    signals.article_writer_finalized.connect(article_writer_finalized)
+    signals.content_written.connect(content_written)
+    signals.get_writer.connect(get_writer)
+    signals.generator_init.connect(generator_init)
+    signals.finalized.connect(finalized)
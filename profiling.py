@@ -0,0 +1,151 @@
+"""Per-template render profiling, enabled with ``ATTILA_PROFILE``."""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from . import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from jinja2 import Environment
+    from jinja2.runtime import Context
+    from pelican.settings import Settings
+
+REPORT_FILENAME = "attila-profile.json"
+
+
+@dataclass
+class TemplateStats:
+    """Wall time, call count and output size of one template.
+
+    Times are inclusive: a page template accounts for the templates it
+    extends and includes, which are also reported on their own.
+    """
+
+    calls: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+
+    def add(self, other: TemplateStats) -> None:
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.bytes += other.bytes
+
+
+class RenderProfiler:
+    """Collects :class:`TemplateStats` of the templates rendered in a build."""
+
+    def __init__(self) -> None:
+        self.stats: dict[str, TemplateStats] = {}
+
+    def wrap(self, name: str, render_func: Callable) -> Callable:
+        def root_render_func(context: Context) -> Iterator[str]:
+            stats = TemplateStats(calls=1)
+            chunks = render_func(context)
+            while True:
+                started = perf_counter()
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    stats.seconds += perf_counter() - started
+                    break
+                stats.seconds += perf_counter() - started
+                stats.bytes += len(chunk.encode("utf-8"))
+                yield chunk
+            self.stats.setdefault(name, TemplateStats()).add(stats)
+
+        return root_render_func
+
+    def collect(self) -> dict[str, dict[str, Any]]:
+        """Returns the stats recorded so far and starts over."""
+        stats, self.stats = self.stats, {}
+        return {name: asdict(value) for name, value in stats.items()}
+
+    def merge(self, stats: dict[str, dict[str, Any]]) -> None:
+        """Adds stats collected in another process, see :func:`collect`."""
+        for name, value in stats.items():
+            self.stats.setdefault(name, TemplateStats()).add(TemplateStats(**value))
+
+    def table(self) -> str:
+        rows = sorted(self.stats.items(), key=lambda item: -item[1].seconds)
+        width = max((len(name) for name in self.stats), default=8)
+        lines = [
+            (
+                f"{'template':<{width}}  {'calls':>8}  {'total s':>9}  "
+                f"{'mean ms':>9}  {'bytes':>12}"
+            )
+        ]
+        for name, stats in rows:
+            lines.append(
+                f"{name:<{width}}  {stats.calls:>8}  {stats.seconds:>9.3f}  "
+                f"{stats.seconds * 1000 / stats.calls:>9.3f}  {stats.bytes:>12}"
+            )
+        return "\n".join(lines)
+
+    def report(self, path: str) -> None:
+        """Logs the table of the slowest templates and writes it as JSON."""
+        logger.info("Template render profile:\n%s", self.table())
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    name: asdict(stats)
+                    for name, stats in sorted(
+                        self.stats.items(), key=lambda item: -item[1].seconds
+                    )
+                },
+                f,
+                indent=2,
+            )
+        logger.info("Template render profile written to %s", path)
+
+
+_profiler: RenderProfiler | None = None
+
+
+def get_profiler() -> RenderProfiler | None:
+    """The profiler of the running build, ``None`` unless profiling is on."""
+    return _profiler
+
+
+def report_path(settings: Settings) -> str:
+    setting = settings.get("ATTILA_PROFILE")
+    if isinstance(setting, (str, os.PathLike)):
+        return os.fspath(setting)
+    return os.path.join(settings.get("CACHE_PATH", "cache"), REPORT_FILENAME)
+
+
+def instrument(environment: Environment) -> RenderProfiler:
+    """Profile every template ``environment`` loads from now on."""
+    global _profiler
+
+    if _profiler is None:
+        _profiler = RenderProfiler()
+    profiler = _profiler
+
+    class ProfiledTemplate(environment.template_class):
+        @classmethod
+        def _from_namespace(cls, environment, namespace, globals):
+            template = super()._from_namespace(environment, namespace, globals)
+            template.root_render_func = profiler.wrap(
+                template.name, template.root_render_func
+            )
+            return template
+
+    environment.template_class = ProfiledTemplate
+    return profiler
+
+
+def finish(settings: Settings) -> None:
+    """Writes the report of the build and stops profiling."""
+    global _profiler
+
+    if _profiler is not None:
+        _profiler.report(report_path(settings))
+        _profiler = None
@@ -0,0 +1,195 @@
+"""Sharded full text index searched in the browser by ``static/js/search.js``.
+
+The index is a set of static JSON files written under the theme static
+directory of the output:
+
+``index.json``
+    The list of shard keys and how documents are chunked.
+``terms/<key>.json``
+    Postings of the terms starting with ``key``, as flat
+    ``[document, weight, document, weight, ...]`` lists. Keys start as the
+    first letter of the terms and grow a letter at a time until the shard
+    fits in ``ATTILA_SEARCH_SHARD_SIZE`` bytes; a term lives in the shard with
+    the longest key it starts with.
+``docs/<n>.json``
+    ``[url, title, date]`` of ``DOCS_PER_SHARD`` articles, ``n`` being the
+    first document number divided by ``DOCS_PER_SHARD``.
+
+A query only downloads the term shards of its words and the document shards
+of the results it shows.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any
+
+from markupsafe import Markup
+
+from . import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pelican.contents import Article
+    from pelican.generators import ArticlesGenerator
+
+INDEX_DIRNAME = "search"
+DEFAULT_SHARD_SIZE = 32 * 1024
+DOCS_PER_SHARD = 500
+#: Shorter words are not indexed, nor searched.
+MIN_TERM_LENGTH = 2
+#: Weight of a term by the field it appears in.
+FIELD_WEIGHTS = {"title": 4, "tags": 3, "authors": 2, "summary": 1}
+
+# Keep in line with the WORD expression of search.js.
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower cased words of ``text`` long enough to be indexed."""
+    return [
+        word for word in _WORD.findall(text.lower()) if len(word) >= MIN_TERM_LENGTH
+    ]
+
+
+def _text(value: Any) -> str:
+    return Markup(str(value)).striptags() if value else ""
+
+
+def article_fields(article: Article) -> dict[str, str]:
+    """Plain text of the fields of ``article`` that are indexed."""
+    return {
+        "title": _text(getattr(article, "title", "")),
+        "tags": " ".join(str(tag) for tag in getattr(article, "tags", ())),
+        "authors": " ".join(
+            f"{author} {getattr(author, 'display_name', '')}"
+            for author in getattr(article, "authors", ())
+        ),
+        "summary": _text(getattr(article, "summary", "")),
+    }
+
+
+def _dump(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class SearchIndex:
+    """Inverted index of articles, split in shards of about ``shard_size``."""
+
+    def __init__(self, shard_size: int = DEFAULT_SHARD_SIZE) -> None:
+        self.shard_size = shard_size
+        self.docs: list[list[str]] = []
+        self.postings: dict[str, dict[int, int]] = defaultdict(dict)
+
+    def add(self, article: Article) -> None:
+        doc = len(self.docs)
+        self.docs.append(
+            [
+                article.url,
+                _text(article.title),
+                getattr(article, "locale_date", ""),
+            ]
+        )
+        for field, text in article_fields(article).items():
+            for term in set(tokenize(text)):
+                postings = self.postings[term]
+                postings[doc] = postings.get(doc, 0) + FIELD_WEIGHTS[field]
+
+    def _entry(self, term: str) -> list[int]:
+        return [value for item in sorted(self.postings[term].items()) for value in item]
+
+    def shards(self) -> dict[str, list[str]]:
+        """Terms of each shard, by shard key."""
+        sizes = {
+            term: len(_dump(term)) + len(_dump(self._entry(term))) + 2
+            for term in self.postings
+        }
+        shards: dict[str, list[str]] = {}
+
+        def split(prefix: str, terms: list[str]) -> None:
+            own = [term for term in terms if len(term) == len(prefix)]
+            if (
+                len(own) == len(terms)
+                or sum(sizes[t] for t in terms) <= self.shard_size
+            ):
+                shards[prefix] = terms
+                return
+            if own:
+                shards[prefix] = own
+            groups = defaultdict(list)
+            for term in terms:
+                if len(term) > len(prefix):
+                    groups[term[: len(prefix) + 1]].append(term)
+            for key, group in sorted(groups.items()):
+                split(key, group)
+
+        first_letters = defaultdict(list)
+        for term in sorted(self.postings):
+            first_letters[term[0]].append(term)
+        for key, group in sorted(first_letters.items()):
+            split(key, group)
+        return shards
+
+    def write(self, path: str) -> None:
+        """Replace the index in ``path`` by this one."""
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(os.path.join(path, "terms"))
+        os.makedirs(os.path.join(path, "docs"))
+
+        shards = self.shards()
+        for key, terms in shards.items():
+            with open(
+                os.path.join(path, "terms", f"{key}.json"), "w", encoding="utf-8"
+            ) as f:
+                f.write(_dump({term: self._entry(term) for term in terms}))
+        for start in range(0, len(self.docs), DOCS_PER_SHARD):
+            name = f"{start // DOCS_PER_SHARD}.json"
+            with open(os.path.join(path, "docs", name), "w", encoding="utf-8") as f:
+                f.write(_dump(self.docs[start : start + DOCS_PER_SHARD]))
+        with open(os.path.join(path, "index.json"), "w", encoding="utf-8") as f:
+            f.write(
+                _dump(
+                    {
+                        "shards": sorted(shards),
+                        "docs": len(self.docs),
+                        "docs_per_shard": DOCS_PER_SHARD,
+                        "min_term_length": MIN_TERM_LENGTH,
+                    }
+                )
+            )
+        logger.info(
+            "Search index: %d articles, %d terms in %d shards",
+            len(self.docs),
+            len(self.postings),
+            len(shards),
+        )
+
+
+def build_index(
+    articles: Iterable[Article], shard_size: int = DEFAULT_SHARD_SIZE
+) -> SearchIndex:
+    index = SearchIndex(shard_size)
+    for article in articles:
+        index.add(article)
+    return index
+
+
+def write_index(generator: ArticlesGenerator) -> None:
+    """Index the published articles of ``generator`` in its output."""
+    settings = generator.settings
+    index = build_index(
+        generator.articles,
+        settings.get("ATTILA_SEARCH_SHARD_SIZE") or DEFAULT_SHARD_SIZE,
+    )
+    index.write(
+        os.path.join(
+            generator.output_path,
+            settings.get("THEME_STATIC_DIR", "theme"),
+            INDEX_DIRNAME,
+        )
+    )
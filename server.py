@@ -0,0 +1,303 @@
+"""Development server for the sites built with the theme.
+
+Unlike ``pelican --listen``, requests are served by threads, with ETags, the
+``.gz`` and ``.br`` copies written by ``ATTILA_COMPRESS`` when the browser
+accepts them, and a long-lived ``Cache-Control`` for the fingerprinted
+assets, image variants and self-hosted libraries. With ``--reload``, the site
+is rebuilt when its content, theme or settings change, incrementally when the
+theme plugin is enabled, and the open pages reload::
+
+    python -m attila.server -s pelicanconf.py --reload
+"""
+
+from __future__ import annotations
+
+import argparse
+import email.utils
+import io
+import logging
+import os
+import re
+import threading
+import urllib.parse
+from collections.abc import Callable
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer
+from typing import TYPE_CHECKING
+
+from jinja2 import TemplateError
+from pelican.server import ComplexHTTPRequestHandler
+
+from . import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+#: Open pages listen to this path for reloads.
+RELOAD_PATH = "/__attila__/reload"
+#: Injected in the HTML pages, with the build generation they come from.
+RELOAD_SCRIPT = (
+    f"<script>new EventSource('{RELOAD_PATH}?generation={{generation}}')"
+    ".onmessage = function () {{ location.reload(); }};</script>"
+)
+#: Seconds between the keep-alive comments sent to the open pages.
+HEARTBEAT = 15
+#: Fingerprinted bundles and image variants, and versioned vendor directories.
+IMMUTABLE = re.compile(r"\.[0-9a-f]{10}\.|/vendor/[^/]+-\d[^/]*/")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+#: Errors of a failed rebuild, after which the pages are served as they are.
+REBUILD_ERRORS: tuple[type[Exception], ...] = (
+    OSError,
+    ValueError,
+    LookupError,
+    TypeError,
+    AttributeError,
+    RuntimeError,
+    TemplateError,
+)
+#: Content encodings of the precompressed copies, by order of preference.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class Reloader:
+    """Build generation the open pages wait on."""
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self._condition = threading.Condition()
+
+    def notify(self) -> None:
+        with self._condition:
+            self.generation += 1
+            self._condition.notify_all()
+
+    def wait(self, generation: int, timeout: float | None = None) -> int:
+        """Wait for a build after ``generation``, returns the current one."""
+        with self._condition:
+            self._condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Content codings of an ``Accept-Encoding`` header, but those with ``q=0``."""
+    accepted = set()
+    for value in header.split(","):
+        coding, *params = (part.strip() for part in value.split(";"))
+        quality = next((p[2:] for p in params if p.startswith("q=")), "1")
+        try:
+            if float(quality) > 0:
+                accepted.add(coding.lower())
+        except ValueError:
+            continue
+    return accepted
+
+
+class DevRequestHandler(ComplexHTTPRequestHandler):
+    """Pelican's request handler, with validators and precompressed files."""
+
+    #: Set on the subclasses :func:`make_server` creates.
+    base_path: str = "."
+    reloader: Reloader | None = None
+
+    def do_GET(self):
+        if self.reloader is not None and self.path.split("?", 1)[0] == RELOAD_PATH:
+            self.send_events()
+            return
+        super().do_GET()
+
+    def send_events(self) -> None:
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        try:
+            # Pages built before the last build reload right away.
+            generation = int(query["generation"][0])
+        except (KeyError, ValueError):
+            generation = self.reloader.generation
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            while True:
+                if self.reloader.wait(generation, HEARTBEAT) != generation:
+                    self.wfile.write(b"data: reload\n\n")
+                    self.wfile.flush()
+                    return
+                self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split("?", 1)[0].endswith("/"):
+            path = os.path.join(path, "index.html")
+        if not os.path.isfile(path):
+            # Redirects, listings and errors as usual.
+            return super().send_head()
+
+        content_type = self.guess_type(path)
+        inject = self.reloader is not None and content_type == "text/html"
+        served, encoding = path, None
+        variants = [
+            (coding, path + ext)
+            for coding, ext in ENCODINGS
+            if os.path.isfile(path + ext)
+        ]
+        if not inject:
+            accepted = accepted_encodings(self.headers.get("Accept-Encoding", ""))
+            modified = os.path.getmtime(path)
+            for coding, variant in variants:
+                # Not a copy left behind by an older build.
+                if coding in accepted and os.path.getmtime(variant) >= modified:
+                    served, encoding = variant, coding
+                    break
+
+        stat = os.stat(served)
+        etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        if encoding:
+            etag += f"-{encoding}"
+        if inject:
+            generation = self.reloader.generation
+            etag += f"-reload{generation}"
+        etag = f'"{etag}"'
+        url_path = self.path.split("?", 1)[0]
+        cache_control = IMMUTABLE_CACHE if IMMUTABLE.search(url_path) else "no-cache"
+
+        if etag in {
+            tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")
+        }:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+            return None
+
+        with open(served, "rb") as f:
+            body = f.read()
+        if inject:
+            head, marker, tail = body.rpartition(b"</body>")
+            script = RELOAD_SCRIPT.format(generation=generation).encode()
+            body = head + script + marker + tail if marker else body + script
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header(
+            "Last-Modified", email.utils.formatdate(stat.st_mtime, usegmt=True)
+        )
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if variants:
+            self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return io.BytesIO(body)
+
+
+class DevServer(ThreadingHTTPServer):
+    allow_reuse_address = True
+
+
+def make_server(
+    output_path: str,
+    host: str = "localhost",
+    port: int = 8000,
+    reloader: Reloader | None = None,
+) -> DevServer:
+    """A server of ``output_path``, pushing the builds of ``reloader``."""
+    handler = type(
+        "RequestHandler",
+        (DevRequestHandler,),
+        {"base_path": os.path.abspath(output_path), "reloader": reloader},
+    )
+    return DevServer((host, port), handler)
+
+
+def watch(
+    changes: Iterable[set[tuple]],
+    rebuild: Callable[[set[str]], None],
+    reloader: Reloader,
+    errors: tuple[type[Exception], ...] = REBUILD_ERRORS,
+) -> None:
+    """Call ``rebuild`` with each set of watchfiles ``changes``, then reload.
+
+    A rebuild failing with one of ``errors`` is logged and the open pages are
+    not reloaded.
+    """
+    for batch in changes:
+        paths = {path for _, path in batch}
+        logger.info("Modified: %s", ", ".join(sorted(paths)))
+        try:
+            rebuild(paths)
+        except errors:
+            logger.exception("Rebuild failed, keeping the pages as they are")
+        else:
+            reloader.notify()
+
+
+def serve_site(settings_file: str, host: str, port: int, reload: bool = False) -> None:
+    """Serve the output of the Pelican site of ``settings_file``."""
+    from pelican import Pelican
+    from pelican.settings import read_settings
+    from pelican.utils import wait_for_changes
+
+    def load() -> tuple[dict, Pelican]:
+        settings = read_settings(settings_file)
+        # Only rebuild what changed, when the theme plugin is enabled.
+        settings.setdefault("ATTILA_INCREMENTAL", True)
+        return settings, Pelican(settings)
+
+    settings, pelican = load()
+    reloader = Reloader() if reload else None
+    server = make_server(settings["OUTPUT_PATH"], host, port, reloader)
+    logger.info("Serving %s at http://%s:%d/", settings["OUTPUT_PATH"], host, port)
+    if reloader is None:
+        server.serve_forever()
+        return
+
+    def changes():
+        # Content, static paths, theme and settings, less IGNORE_FILES.
+        while True:
+            yield wait_for_changes(settings_file, settings)
+
+    def rebuild(paths: set[str]) -> None:
+        nonlocal settings, pelican
+        if os.path.abspath(settings_file) in paths:
+            settings, pelican = load()
+        pelican.run()
+
+    pelican.run()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    watch(changes(), rebuild, reloader)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m attila.server", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        "-s", "--settings", default="pelicanconf.py", help="default: %(default)s"
+    )
+    parser.add_argument(
+        "-b", "--bind", default="localhost", help="default: %(default)s"
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, default=8000, help="default: %(default)s"
+    )
+    parser.add_argument(
+        "-r",
+        "--reload",
+        action="store_true",
+        help="build, then rebuild on changes and reload the open pages",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        serve_site(args.settings, args.bind, args.port, args.reload)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
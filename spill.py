@@ -0,0 +1,128 @@
+"""Article bodies kept on disk for the listings, enabled with ``ATTILA_SPILL``.
+
+With ``SHOW_FULL_ARTICLE_IN_SUMMARY``, every listing page embeds the full
+content of its articles, and Pelican memoizes the HTML of every article for
+every ``SITEURL`` it is rendered with until the build ends. In this mode the
+listings read the bodies back from files named after their hash, under
+``CACHE_PATH``, the memoized copies are dropped once a page is written, and
+the listing templates are streamed to their file. Past
+``ATTILA_SPILL_BUDGET`` bytes of bodies, the next articles of a page show
+their excerpt.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import weakref
+from contextlib import suppress
+from hashlib import sha1
+from typing import TYPE_CHECKING, Any
+
+from pelican.contents import Content
+
+from . import logger
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+#: Listing templates the writer streams to their output in this mode.
+TEMPLATES = ("index.html", "tag.html", "category.html", "author.html")
+#: Bytes of article bodies a listing page embeds by default.
+DEFAULT_BUDGET = 1024 * 1024
+STORE_DIR = "attila-spill"
+
+# Stores of the build, pruned by prune_stores().
+_STORES: weakref.WeakSet[SpillStore] = weakref.WeakSet()
+
+
+class SpilledBody:
+    """Article HTML in the store, read when the template outputs it."""
+
+    __slots__ = ("path", "size")
+
+    def __init__(self, path: str, size: int) -> None:
+        self.path = path
+        self.size = size
+
+    def __str__(self) -> str:
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def __html__(self) -> str:
+        return str(self)
+
+
+def forget_content(content: Content, siteurl: str) -> None:
+    """Drop the HTML Pelican memoized for ``content`` at ``siteurl``."""
+    Content.get_content.cache.pop((content, siteurl), None)
+
+
+class SpillStore:
+    """Content-addressed files of the article bodies shown by the listings."""
+
+    def __init__(self, directory: str, budget: int = DEFAULT_BUDGET) -> None:
+        self.directory = directory
+        self.budget = budget
+        # Some file systems keep coarse modification times.
+        self.started = time.time() - 1
+        self._bodies: dict[tuple[str, str], SpilledBody] = {}
+        os.makedirs(directory, exist_ok=True)
+        _STORES.add(self)
+
+    def body(self, content: Content) -> SpilledBody:
+        """The body of ``content`` for the page being rendered."""
+        siteurl = content.get_siteurl()
+        key = (content.source_path or content.url, siteurl)
+        if (body := self._bodies.get(key)) is not None:
+            return body
+
+        data = content.get_content(siteurl).encode("utf-8")
+        forget_content(content, siteurl)
+        digest = sha1(data).hexdigest()
+        path = os.path.join(self.directory, digest[:2], f"{digest[2:]}.html")
+        if os.path.exists(path):
+            # Still in use, see prune().
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Parallel renders may spill the same body at once.
+            tmp = f"{path}.{os.getpid()}.part"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        body = self._bodies[key] = SpilledBody(path, len(data))
+        return body
+
+    def prune(self) -> None:
+        """Remove the bodies no page of this build used."""
+        removed = 0
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                with suppress(FileNotFoundError):
+                    if os.path.getmtime(path) < self.started:
+                        os.remove(path)
+                        removed += 1
+        logger.debug("Removed %d unused article bodies", removed)
+
+
+def make_store(settings: Settings) -> SpillStore:
+    return SpillStore(
+        os.path.join(settings.get("CACHE_PATH", "cache"), STORE_DIR),
+        settings.get("ATTILA_SPILL_BUDGET", DEFAULT_BUDGET),
+    )
+
+
+def prune_stores() -> None:
+    """Prune the stores of the build, once every page is written."""
+    for store in list(_STORES):
+        _STORES.discard(store)
+        store.prune()
+
+
+def forget_written(context: dict[str, Any]) -> None:
+    """Drop the HTML of the article or page written with ``context``."""
+    for key in ("article", "page"):
+        if (content := context.get(key)) is not None:
+            forget_content(content, context.get("localsiteurl", ""))
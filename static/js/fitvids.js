@@ -0,0 +1,108 @@
+/*jshint browser:true */
+/*!
+* FitVids 1.1, without jQuery
+*
+* Copyright 2013, Chris Coyier - http://css-tricks.com + Dave Rupert - http://daverupert.com
+* Credit to Thierry Koblentz - http://www.alistapart.com/articles/creating-intrinsic-ratios-for-video/
+* Released under the WTFPL license - http://sam.zoy.org/wtfpl/
+*
+* Same behaviour as jquery.fitvids.js: fitVids(elements, options) wraps the
+* videos of the elements (an element, a NodeList or a selector) in a
+* .fluid-width-video-wrapper keeping their aspect ratio.
+*/
+
+;(function (window, document) {
+
+  'use strict';
+
+  var count = 0;
+
+  function addStyles() {
+    if (document.getElementById('fit-vids-style')) {
+      return;
+    }
+    var style = document.createElement('style');
+    style.id = 'fit-vids-style';
+    style.textContent = '.fluid-width-video-wrapper{width:100%;position:relative;padding:0;}.fluid-width-video-wrapper iframe,.fluid-width-video-wrapper object,.fluid-width-video-wrapper embed {position:absolute;top:0;left:0;width:100%;height:100%;}';
+    (document.head || document.getElementsByTagName('head')[0]).appendChild(style);
+  }
+
+  function fit(video, ignoreList) {
+    var parent = video.parentNode;
+    if (video.closest(ignoreList)) {
+      return; // Disable FitVids on this video.
+    }
+    if (video.tagName.toLowerCase() === 'embed' && parent.tagName.toLowerCase() === 'object' ||
+        parent.classList.contains('fluid-width-video-wrapper')) {
+      return;
+    }
+    var style = window.getComputedStyle(video);
+    if ((!style.height && !style.width) &&
+        (isNaN(video.getAttribute('height')) || isNaN(video.getAttribute('width')))) {
+      video.setAttribute('height', 9);
+      video.setAttribute('width', 16);
+    }
+    var heightAttribute = parseInt(video.getAttribute('height'), 10);
+    var widthAttribute = parseInt(video.getAttribute('width'), 10);
+    var height = (video.tagName.toLowerCase() === 'object' || !isNaN(heightAttribute)) ? heightAttribute : video.offsetHeight;
+    var width = !isNaN(widthAttribute) ? widthAttribute : video.offsetWidth;
+    if (!video.getAttribute('name')) {
+      video.setAttribute('name', 'fitvid' + count);
+      count++;
+    }
+    var wrapper = document.createElement('div');
+    wrapper.className = 'fluid-width-video-wrapper';
+    wrapper.style.paddingTop = ((height / width) * 100) + '%';
+    parent.insertBefore(wrapper, video);
+    wrapper.appendChild(video);
+    video.removeAttribute('height');
+    video.removeAttribute('width');
+  }
+
+  window.fitVids = function (elements, options) {
+    var settings = {
+      customSelector: null,
+      ignore: null
+    };
+    for (var key in options || {}) {
+      settings[key] = options[key];
+    }
+    if (typeof elements === 'string') {
+      elements = document.querySelectorAll(elements);
+    } else if (!elements) {
+      elements = [];
+    } else if (elements.nodeType) {
+      elements = [elements];
+    }
+
+    addStyles();
+
+    var selectors = [
+      'iframe[src*="player.vimeo.com"]',
+      'iframe[src*="youtube.com"]',
+      'iframe[src*="youtube-nocookie.com"]',
+      'iframe[src*="kickstarter.com"][src*="video.html"]',
+      'object',
+      'embed'
+    ];
+    if (settings.customSelector) {
+      selectors.push(settings.customSelector);
+    }
+    var ignoreList = '.fitvidsignore';
+    if (settings.ignore) {
+      ignoreList = ignoreList + ', ' + settings.ignore;
+    }
+
+    Array.prototype.forEach.call(elements, function (element) {
+      var videos = element.querySelectorAll(selectors.join(','));
+      Array.prototype.forEach.call(videos, function (video) {
+        if (video.matches('object object')) {
+          return; // SwfObj conflict patch
+        }
+        fit(video, ignoreList);
+      });
+    });
+    return elements;
+  };
+
+})(window, document);
@@ -1,73 +1,39 @@
-jQuery(function($) {
+(function () {
 
-  var html = $('html');
-  var viewport = $(window);
+  'use strict';
+
+  var html = document.documentElement;
+
+  function on(selector, type, listener) {
+    Array.prototype.forEach.call(document.querySelectorAll(selector), function (element) {
+      element.addEventListener(type, listener);
+    });
+  }
 
 /* ==========================================================================
    Menu
    ========================================================================== */
 
   function menu() {
-    html.toggleClass('menu-active');
+    html.classList.toggle('menu-active');
   };
 
-  $('#menu').on({
-    'click': function() {
-      menu();
-    }
-  });
-
-  $('.nav-menu').on({
-    'click': function() {
-      menu();
-    }
+  on('#menu', 'click', function() {
+    menu();
   });
 
-  $('.nav-close').on({
-    'click': function() {
-      menu();
-    }
+  on('.nav-menu', 'click', function() {
+    menu();
   });
 
-  viewport.on({
-    'resize': function() {
-      html.removeClass('menu-active');
-    },
-    'orientationchange': function() {
-      html.removeClass('menu-active');
-    }
+  on('.nav-close', 'click', function() {
+    menu();
   });
 
-/* ==========================================================================
-   Parallax cover
-   ========================================================================== */
-
-  var cover = $('.cover');
-  var coverPosition = 0;
-
-  function prlx() {
-    if (cover.length >= 1) {
-      var windowPosition = viewport.scrollTop();
-      (windowPosition > 0) ? coverPosition = Math.floor(windowPosition * 0.25): coverPosition = 0;
-      cover.css({
-        '-webkit-transform': 'translate3d(0, ' + coverPosition + 'px, 0)',
-        'transform': 'translate3d(0, ' + coverPosition + 'px, 0)'
-      });
-      (viewport.scrollTop() < cover.height()) ? html.addClass('cover-active'): html.removeClass('cover-active');
-    }
-  }
-  prlx();
-
-  viewport.on({
-    'scroll': function() {
-      prlx();
-    },
-    'resize': function() {
-      prlx();
-    },
-    'orientationchange': function() {
-      prlx();
-    }
+  ['resize', 'orientationchange'].forEach(function (type) {
+    window.addEventListener(type, function() {
+      html.classList.remove('menu-active');
+    }, { passive: true });
   });
 
 /* ==========================================================================
@@ -75,7 +41,6 @@ jQuery(function($) {
    ========================================================================== */
 
   function gallery() {
-    'use strict';
     var images = document.querySelectorAll('.kg-gallery-image img');
     images.forEach(function(image) {
       var container = image.closest('.kg-gallery-image');
@@ -93,26 +58,35 @@ jQuery(function($) {
    ========================================================================== */
 
   function theme() {
-    'use strict';
-    var toggle = $('.js-theme');
-    var toggleText = toggle.find('.theme-text');
+    var toggles = document.querySelectorAll('.js-theme');
+
+    function setText(attribute) {
+      toggles.forEach(function (toggle) {
+        var toggleText = toggle.querySelector('.theme-text');
+        if (toggleText) {
+          toggleText.textContent = toggle.getAttribute(attribute);
+        }
+      });
+    }
 
     function system() {
-      html.removeClass(['theme-dark', 'theme-light']);
+      html.classList.remove('theme-dark', 'theme-light');
       localStorage.removeItem('attila_theme');
-      toggleText.text(toggle.attr('data-system'));
+      setText('data-system');
     }
 
     function dark() {
-      html.removeClass('theme-light').addClass('theme-dark');
+      html.classList.remove('theme-light');
+      html.classList.add('theme-dark');
       localStorage.setItem('attila_theme', 'dark');
-      toggleText.text(toggle.attr('data-dark'));
+      setText('data-dark');
     }
 
     function light() {
-      html.removeClass('theme-dark').addClass('theme-light');
+      html.classList.remove('theme-dark');
+      html.classList.add('theme-light');
       localStorage.setItem('attila_theme', 'light');
-      toggleText.text(toggle.attr('data-light'));
+      setText('data-light');
     }
 
     switch (localStorage.getItem('attila_theme')) {
@@ -127,12 +101,12 @@ jQuery(function($) {
       break;
     }
 
-    toggle.on('click', function (e) {
+    on('.js-theme', 'click', function (e) {
       e.preventDefault();
 
-      if (!html.hasClass('theme-dark') && !html.hasClass('theme-light')) {
+      if (!html.classList.contains('theme-dark') && !html.classList.contains('theme-light')) {
         dark();
-      } else if (html.hasClass('theme-dark')) {
+      } else if (html.classList.contains('theme-dark')) {
         light();
       } else {
         system();
@@ -140,4 +114,4 @@ jQuery(function($) {
     });
   }
   theme();
-});
+})();
@@ -0,0 +1,113 @@
+/* ==========================================================================
+   Scroll effects: parallax cover and reading progress
+
+   The handlers only record that a frame is needed; the frame reads the
+   scroll position and writes the styles, at most once per animation frame.
+   Layout (cover and post sizes) is measured on load and resize only, and
+   whether the cover is on screen comes from an IntersectionObserver.
+   ========================================================================== */
+
+(function () {
+  'use strict';
+
+  var root = document.documentElement;
+  var cover = document.querySelector('.cover');
+  var post = document.querySelector('.post-content');
+  var progress = document.querySelector('.progress-container');
+  var bar = progress && progress.querySelector('.progress-bar');
+  var passive = { passive: true };
+
+  // Cached layout, refreshed by measure()
+  var coverBottom = 0;
+  var postBottom = 0;
+  var viewportHeight = 0;
+  // Last written values, not to touch the styles when nothing changed
+  var coverVisible = !!cover;
+  var coverPosition = null;
+  var progressWidth = null;
+  var complete = null;
+  var scheduled = false;
+
+  function measure() {
+    viewportHeight = window.innerHeight;
+    if (cover) {
+      // The cover fills its header, which is not translated.
+      var header = cover.offsetParent || cover.parentNode;
+      coverBottom = header.getBoundingClientRect().bottom + window.pageYOffset;
+    }
+    if (post) {
+      postBottom = post.getBoundingClientRect().bottom + window.pageYOffset;
+    }
+  }
+
+  function setCoverActive(active) {
+    coverVisible = active;
+    root.classList.toggle('cover-active', active);
+  }
+
+  function frame() {
+    scheduled = false;
+    var scrollTop = window.pageYOffset;
+
+    if (cover) {
+      if (!('IntersectionObserver' in window)) {
+        setCoverActive(scrollTop < coverBottom);
+      }
+      var position = scrollTop > 0 ? Math.floor(scrollTop * 0.25) : 0;
+      if (coverVisible && position !== coverPosition) {
+        coverPosition = position;
+        cover.style.transform = 'translate3d(0, ' + position + 'px, 0)';
+      }
+    }
+
+    if (bar && post) {
+      var offset = viewportHeight / 3;
+      var width = 100 - (((postBottom - (scrollTop + viewportHeight) + offset) / (postBottom - viewportHeight + offset)) * 100);
+      if (width !== progressWidth) {
+        progressWidth = width;
+        bar.style.width = width + '%';
+      }
+      if ((width > 100) !== complete) {
+        complete = width > 100;
+        progress.classList.toggle('complete', complete);
+      }
+    }
+  }
+
+  function schedule() {
+    if (!scheduled) {
+      scheduled = true;
+      window.requestAnimationFrame(frame);
+    }
+  }
+
+  function remeasure() {
+    measure();
+    schedule();
+  }
+
+  if (!cover && !(bar && post)) {
+    return;
+  }
+
+  if (cover && 'IntersectionObserver' in window) {
+    new IntersectionObserver(function (entries) {
+      setCoverActive(entries[entries.length - 1].isIntersecting);
+      schedule();
+    }).observe(cover.offsetParent || cover.parentNode);
+  } else if (cover) {
+    setCoverActive(true);
+  }
+
+  // Images and embeds change the length of the post once they load.
+  if (post && 'ResizeObserver' in window) {
+    new ResizeObserver(remeasure).observe(post);
+  } else {
+    window.addEventListener('load', remeasure);
+  }
+
+  window.addEventListener('scroll', schedule, passive);
+  window.addEventListener('resize', remeasure, passive);
+  window.addEventListener('orientationchange', remeasure, passive);
+  remeasure();
+})();
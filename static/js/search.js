@@ -0,0 +1,177 @@
+/* ==========================================================================
+   Search
+   Queries the sharded index written by the attila plugin when
+   ATTILA_SEARCH_INDEX is set, see search_index.py for its layout.
+   ========================================================================== */
+
+(function() {
+  'use strict';
+
+  var container = document.getElementById('search');
+  if (!container || !container.getAttribute('data-index')) {
+    return;
+  }
+
+  var base = container.getAttribute('data-index');
+  var siteurl = container.getAttribute('data-siteurl') || '';
+  // Keep in line with the _WORD expression of search_index.py.
+  var WORD = /[\p{L}\p{N}_]+/gu;
+  var MAX_RESULTS = 20;
+  // Prefix matches score less than the word itself.
+  var PREFIX_FACTOR = 0.5;
+
+  var cache = {};
+  var manifest = load('index.json');
+  var pending = 0;
+
+  function load(path) {
+    if (!cache[path]) {
+      cache[path] = fetch(base + path).then(function(response) {
+        if (!response.ok) {
+          throw new Error(response.status + ' ' + response.url);
+        }
+        return response.json();
+      });
+    }
+    return cache[path];
+  }
+
+  function tokenize(text, minLength) {
+    return (text.toLowerCase().match(WORD) || []).filter(function(word) {
+      return Array.from(word).length >= minLength;
+    });
+  }
+
+  // Shards holding the terms starting with word: the one with the longest
+  // key word starts with, or every shard below word when it is shorter.
+  function shardsOf(word, keys) {
+    return keys.filter(function(key) {
+      return word.indexOf(key) === 0 || key.indexOf(word) === 0;
+    });
+  }
+
+  function scoreWord(word, keys) {
+    return Promise.all(shardsOf(word, keys).map(function(key) {
+      return load('terms/' + encodeURIComponent(key) + '.json');
+    })).then(function(shards) {
+      var scores = {};
+      shards.forEach(function(shard) {
+        Object.keys(shard).forEach(function(term) {
+          if (term.indexOf(word) !== 0) {
+            return;
+          }
+          var factor = term === word ? 1 : PREFIX_FACTOR;
+          var postings = shard[term];
+          for (var i = 0; i < postings.length; i += 2) {
+            var score = postings[i + 1] * factor;
+            scores[postings[i]] = Math.max(scores[postings[i]] || 0, score);
+          }
+        });
+      });
+      return scores;
+    });
+  }
+
+  function search(query) {
+    return manifest.then(function(index) {
+      var words = tokenize(query, index.min_term_length);
+      if (!words.length) {
+        return [];
+      }
+      return Promise.all(words.map(function(word) {
+        return scoreWord(word, index.shards);
+      })).then(function(perWord) {
+        // Every word has to match; documents are numbered newest first.
+        var totals = perWord.reduce(function(totals, scores) {
+          var next = {};
+          Object.keys(scores).forEach(function(doc) {
+            if (totals === null || doc in totals) {
+              next[doc] = (totals === null ? 0 : totals[doc]) + scores[doc];
+            }
+          });
+          return next;
+        }, null);
+        var docs = Object.keys(totals).map(Number).sort(function(a, b) {
+          return totals[b] - totals[a] || a - b;
+        }).slice(0, MAX_RESULTS);
+        return Promise.all(docs.map(function(doc) {
+          return load('docs/' + Math.floor(doc / index.docs_per_shard) + '.json')
+            .then(function(shard) {
+              return shard[doc % index.docs_per_shard];
+            });
+        }));
+      });
+    });
+  }
+
+  var form = document.createElement('form');
+  form.className = 'search-form';
+  form.setAttribute('role', 'search');
+  var input = document.createElement('input');
+  input.type = 'search';
+  input.name = 'q';
+  input.placeholder = 'Search';
+  input.setAttribute('aria-label', 'Search');
+  form.appendChild(input);
+  var status = document.createElement('p');
+  status.className = 'search-status';
+  status.setAttribute('aria-live', 'polite');
+  var results = document.createElement('ol');
+  results.className = 'search-results';
+  container.appendChild(form);
+  container.appendChild(status);
+  container.appendChild(results);
+
+  function render(docs, query) {
+    results.textContent = '';
+    status.textContent = query ? docs.length + ' result(s) for “' + query + '”' : '';
+    docs.forEach(function(doc) {
+      var item = document.createElement('li');
+      var link = document.createElement('a');
+      link.href = siteurl + '/' + doc[0];
+      link.textContent = doc[1];
+      item.appendChild(link);
+      if (doc[2]) {
+        var date = document.createElement('time');
+        date.textContent = doc[2];
+        item.appendChild(document.createTextNode(' '));
+        item.appendChild(date);
+      }
+      results.appendChild(item);
+    });
+  }
+
+  function run() {
+    var query = input.value.trim();
+    var current = ++pending;
+    if (window.history.replaceState) {
+      var url = new URL(window.location.href);
+      query ? url.searchParams.set('q', query) : url.searchParams.delete('q');
+      window.history.replaceState(null, '', url);
+    }
+    search(query).then(function(docs) {
+      if (current === pending) {
+        render(docs, query);
+      }
+    }, function(error) {
+      status.textContent = 'Search is not available.';
+      window.console && console.error(error);
+    });
+  }
+
+  var timer;
+  input.addEventListener('input', function() {
+    clearTimeout(timer);
+    timer = setTimeout(run, 150);
+  });
+  form.addEventListener('submit', function(event) {
+    event.preventDefault();
+    clearTimeout(timer);
+    run();
+  });
+
+  input.value = new URLSearchParams(window.location.search).get('q') || '';
+  if (input.value) {
+    run();
+  }
+})();
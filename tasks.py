@@ -4,19 +4,21 @@ import datetime
 import os
 import shutil
 import sys
+import tempfile
+import threading
 
 from invoke import task
-from pelican.server import ComplexHTTPRequestHandler, RootedHTTPServer
 
 """
 To use this
 
 virtualenv .venv
 source .venv/bin/activate
-pip3 install invoke pelican ghp-import
+pip3 install invoke -e .  # or: uv sync && uv pip install invoke
 invoke build
 invoke serve
-invoke gh-pages
+invoke reserve
+invoke gh-pages [--dry-run]
 """
 
 OPEN_BROWSER_ON_SERVE = False
@@ -24,6 +26,8 @@ OPEN_BROWSER_ON_SERVE = False
 CONFIG = {
     # Output path. Can be absolute or relative to tasks.py. Default: 'output'
     "deploy_path": "output",
+    # Digests of the published files, so a build only rewrites the changed ones
+    "cache_path": "cache",
     # Github Pages configuration
     "github_pages_branch": "gh-pages",
     "commit_message": "'Publish site on {}'".format(datetime.date.today().isoformat()),
@@ -43,25 +47,29 @@ def clean(c):
 
 @task
 def build(c):
-    """Build local version of site"""
-    c.run("asciidoctor -D {deploy_path} *.adoc".format(**CONFIG))
-    c.run("cp *.png {deploy_path}".format(**CONFIG))
-    c.run("mv {deploy_path}/README.html {deploy_path}/index.html".format(**CONFIG))
+    """Build local version of site, only rewriting the files that changed"""
+    from attila.output import sync_tree
+
+    staging = tempfile.mkdtemp(prefix="attila-build-")
+    try:
+        c.run(f"asciidoctor -D {staging} *.adoc")
+        c.run(f"cp *.png {staging}")
+        c.run(f"mv {staging}/README.html {staging}/index.html")
+        report = sync_tree(staging, CONFIG["deploy_path"], CONFIG["cache_path"])
+    finally:
+        shutil.rmtree(staging)
+    print(report.summary())
 
 
 @task
 def serve(c):
     """Serve site at http://$HOST:$PORT/ (default is localhost:8000)"""
+    from attila.server import make_server
 
-    class AddressReuseTCPServer(RootedHTTPServer):
-        allow_reuse_address = True
+    _serve(make_server(CONFIG["deploy_path"], CONFIG["host"], CONFIG["port"]))
 
-    server = AddressReuseTCPServer(
-        CONFIG["deploy_path"],
-        (CONFIG["host"], CONFIG["port"]),
-        ComplexHTTPRequestHandler,
-    )
 
+def _serve(server):
     if OPEN_BROWSER_ON_SERVE:
         # Open site in default browser
         import webbrowser
@@ -72,19 +80,45 @@ def serve(c):
     server.serve_forever()
 
 
+def _is_source(change, path):
+    # Not the copies `build` makes in the deploy path.
+    deploy_path = os.path.abspath(CONFIG["deploy_path"])
+    return path.endswith((".adoc", ".png")) and not path.startswith(deploy_path)
+
+
 @task
 def reserve(c):
-    """`build`, then `serve`"""
+    """`build`, then `serve`, rebuilding and reloading the pages on changes"""
+    import watchfiles
+    from attila.server import REBUILD_ERRORS, Reloader, make_server, watch
+    from invoke.exceptions import Failure
+
     build(c)
-    serve(c)
+    reloader = Reloader()
+    server = make_server(
+        CONFIG["deploy_path"], CONFIG["host"], CONFIG["port"], reloader
+    )
+    threading.Thread(target=_serve, args=(server,), daemon=True).start()
+    watch(
+        watchfiles.watch(".", watch_filter=_is_source),
+        lambda paths: build(c),
+        reloader,
+        # asciidoctor failing
+        (Failure, *REBUILD_ERRORS),
+    )
 
 
 @task
-def gh_pages(c):
-    """Publish to GitHub Pages"""
+def gh_pages(c, dry_run=False):
+    """Publish to GitHub Pages, only the files changed since the last time"""
+    from attila.deploy import deploy
+
     build(c)
-    c.run(
-        "ghp-import -b {github_pages_branch} "
-        '-m "{commit_message}" '
-        "{deploy_path} -p".format(**CONFIG)
+    changes = deploy(
+        CONFIG["deploy_path"],
+        CONFIG["github_pages_branch"],
+        CONFIG["commit_message"].strip("'"),
+        remote=None if dry_run else "origin",
+        dry_run=dry_run,
     )
+    print(changes.summary())
@@ -1,11 +1,60 @@
 {% if DISQUS_SITENAME %}
 <script type="text/javascript">
     var disqus_shortname = '{{ DISQUS_SITENAME }}';
+    {% if ATTILA_LAZY_COMMENT_COUNTS %}
+    // count.js fetches the counts of every link of the page in one request:
+    // load it once, after the page, when a post box comes into view.
+    (function () {
+        var links = document.querySelectorAll('a[href$="#disqus_thread"], .disqus-comment-count');
+        if (!links.length) {
+            return;
+        }
+        var observer = null;
+        var requested = false;
+        function load() {
+            var s = document.createElement('script'); s.async = true;
+            s.id = 'dsq-count-scr';
+            s.type = 'text/javascript';
+            s.src = '//' + disqus_shortname + '.disqus.com/count.js';
+            (document.getElementsByTagName('HEAD')[0] || document.getElementsByTagName('BODY')[0]).appendChild(s);
+        }
+        function request() {
+            if (requested) {
+                return;
+            }
+            requested = true;
+            if (observer) {
+                observer.disconnect();
+            }
+            function idle() {
+                (window.requestIdleCallback || window.setTimeout)(load);
+            }
+            if (document.readyState === 'complete') {
+                idle();
+            } else {
+                window.addEventListener('load', idle);
+            }
+        }
+        if (!('IntersectionObserver' in window)) {
+            request();
+            return;
+        }
+        observer = new IntersectionObserver(function (entries) {
+            if (entries.some(function (entry) { return entry.isIntersecting; })) {
+                request();
+            }
+        }, { rootMargin: '200px 0px' });
+        Array.prototype.forEach.call(links, function (link) {
+            observer.observe(link.closest('.post') || link);
+        });
+    }());
+    {% else %}
     (function () {
         var s = document.createElement('script'); s.async = true;
         s.type = 'text/javascript';
         s.src = '//' + disqus_shortname + '.disqus.com/count.js';
         (document.getElementsByTagName('HEAD')[0] || document.getElementsByTagName('BODY')[0]).appendChild(s);
     }());
+    {% endif %}
 </script>
 {% endif %}
@@ -1,18 +1,23 @@
 from __future__ import annotations
 
 import os
+from collections.abc import Callable, Iterator
 from functools import partial
 from pathlib import Path
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING
 
 import pytest
 from bs4 import BeautifulSoup
+from pelican import signals
 from pelican.contents import Article
-from pelican.generators import ArticlesGenerator, PagesGenerator
+from pelican.generators import ArticlesGenerator, PagesGenerator, StaticGenerator
 from pelican.readers import Author, Page, RstReader
 from pelican.settings import read_settings
 from pelican.writers import Writer
 
+from .. import plugin
+from ..writers import AttilaWriter
+
 if TYPE_CHECKING:
     from pelican.settings import Settings
 
@@ -40,6 +45,21 @@ def default_writer(default_settings: Settings) -> Writer:
     return Writer("output", default_settings)
 
 
+@pytest.fixture
+def attila_plugin() -> Iterator[None]:
+    plugin.register()
+    yield
+    signals.content_object_init.disconnect(plugin.content_object_init)
+    signals.article_generator_finalized.disconnect(plugin.article_generator_finalized)
+    signals.page_generator_finalized.disconnect(plugin.page_generator_finalized)
+    signals.all_generators_finalized.disconnect(plugin.all_generators_finalized)
+    signals.article_writer_finalized.disconnect(plugin.article_writer_finalized)
+    signals.content_written.disconnect(plugin.content_written)
+    signals.get_writer.disconnect(plugin.get_writer)
+    signals.generator_init.disconnect(plugin.generator_init)
+    signals.finalized.disconnect(plugin.finalized)
+
+
 @pytest.fixture(autouse=True)
 def chdir_base_to_tests(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.chdir("tests")
@@ -278,3 +298,45 @@ def gen_category_and_html_from_name(default_writer: Writer, default_settings: Se
         writer=default_writer,
         settings=default_settings,
     )
+
+
+def _gen_site(
+    settings: Settings,
+    path: str = CONTENT_DIR,
+    output_path: str = OUTPUT_DIR,
+) -> AttilaWriter:
+    context = settings.copy()
+    context["generated_content"] = {}
+    context["static_links"] = set()
+    context["static_content"] = {}
+    context["localsiteurl"] = settings["SITEURL"]
+
+    generators = [
+        cls(
+            context=context,
+            settings=settings,
+            path=str(path),
+            theme=settings["THEME"],
+            output_path=str(output_path),
+        )
+        for cls in (ArticlesGenerator, PagesGenerator, StaticGenerator)
+    ]
+    for generator in generators:
+        generator.generate_context()
+    signals.all_generators_finalized.send(generators)
+    generator = generators[0]
+    writer = AttilaWriter(str(output_path), settings)
+    generator.generate_output(writer)
+    writer.finalize()
+    return writer
+
+
+@pytest.fixture
+def gen_site(default_settings: Settings) -> Callable:
+    default_settings.update(
+        TAGS_URL="tags.html",
+        CATEGORIES_URL="categories.html",
+        AUTHORS_URL="authors.html",
+        ARCHIVES_URL="archives.html",
+    )
+    return partial(_gen_site, settings=default_settings)
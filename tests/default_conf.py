@@ -114,8 +114,6 @@ JINJA_ENVIRONMENT = {
     "extensions": ["jinja2.ext.loopcontrols", "jinja2.ext.i18n", "jinja2.ext.do"]
 }
 
-JINJA_FILTERS = {"max": max}
-
 # AUTHOR_META = {
 #   "arul": {
 #     "name": "Arul",
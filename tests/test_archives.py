@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+
+from .. import archives, parallel
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pelican.settings import Settings
+
+
+def _soup(path: Path) -> BeautifulSoup:
+    return BeautifulSoup(path.read_text(encoding="utf-8"), "html.parser")
+
+
+def _listed(soup: BeautifulSoup) -> list[str]:
+    return [dd.a["href"] for dd in soup.select(".post-content dd")]
+
+
+@pytest.mark.usefixtures("attila_plugin")
+class TestArchiveChunks:
+    def test_size_chunks(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ):
+        gen_site(output_path=tmp_path / "full")
+        everything = _listed(_soup(tmp_path / "full/archives.html"))
+        assert len(everything) == 4
+
+        default_settings["ATTILA_ARCHIVE_CHUNKS"] = 3
+        gen_site(output_path=tmp_path / "chunked")
+        index = _soup(tmp_path / "chunked/archives.html")
+        assert not _listed(index)
+        links = [a["href"] for a in index.select(".archive-index a")]
+        assert links == ["/archives/1.html", "/archives/2.html"]
+
+        first = _soup(tmp_path / "chunked/archives/1.html")
+        second = _soup(tmp_path / "chunked/archives/2.html")
+        assert _listed(first) + _listed(second) == everything
+        assert first.select_one(".archive-next")["href"] == "/archives/2.html"
+        assert first.select_one(".archive-previous") is None
+        assert second.select_one(".archive-previous")["href"] == "/archives/1.html"
+        assert second.find("link", rel="canonical")["href"] == "/archives/2.html"
+
+    def test_year_chunks(
+        self,
+        tmp_path: Path,
+        default_settings: Settings,
+        gen_site: Callable,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        streamed = []
+        run = parallel.RenderJob.run
+        monkeypatch.setattr(
+            parallel.RenderJob, "run", lambda job: streamed.append(job.path) or run(job)
+        )
+        default_settings["ATTILA_ARCHIVE_CHUNKS"] = "year"
+        gen_site(output_path=tmp_path)
+        assert {str(tmp_path / "archives.html"), str(tmp_path / "2018/index.html")} <= (
+            set(streamed)
+        )
+        index = _soup(tmp_path / "archives.html")
+        (link,) = index.select(".archive-index a")
+        assert link["href"] == "/2018/index.html"
+        assert link.parent.text.strip() == "2018 (4)"
+        # Pelican's yearly archive, streamed
+        assert len(_listed(_soup(tmp_path / "2018/index.html"))) == 4
+        assert not (tmp_path / "archives/1.html").exists()
+
+    def test_year_chunks_need_year_archives(
+        self,
+        tmp_path: Path,
+        default_settings: Settings,
+        gen_site: Callable,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        default_settings["ATTILA_ARCHIVE_CHUNKS"] = "year"
+        default_settings["YEAR_ARCHIVE_SAVE_AS"] = ""
+        gen_site(output_path=tmp_path)
+        assert "needs YEAR_ARCHIVE_SAVE_AS" in caplog.text
+        assert len(_listed(_soup(tmp_path / "archives.html"))) == 4
+
+
+def test_size_chunks_bounds():
+    dates = [type("Article", (), {"locale_date": str(day)})() for day in range(7)]
+    chunks = archives.size_chunks(dates, 3, {})
+    assert [chunk.count for chunk in chunks] == [3, 3, 1]
+    assert chunks[1].title == "3 – 5"
+    assert chunks[2].save_as == "archives/3.html"
+    assert chunks[0].previous is None and chunks[0].next is chunks[1]
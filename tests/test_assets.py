@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+
+from .. import assets
+
+THEME_DIR = Path(__file__).parent.parent
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+
+def test_relocate_css():
+    text, imports = assets.relocate_css(
+        '@charset "utf-8";\n@import "fonts.css" screen;\n'
+        ".a{background:url(img/a.png?v=1)}"
+        '.b{background:url("/abs.png")}.c{background:url(data:image/png;base64,AA)}',
+        "assets/css",
+        "theme/css",
+    )
+    assert imports == ['@import url("../../assets/css/fonts.css") screen;']
+    assert text == (
+        ".a{background:url(../../assets/css/img/a.png?v=1)}"
+        '.b{background:url("/abs.png")}.c{background:url(data:image/png;base64,AA)}'
+    )
+
+
+@pytest.mark.usefixtures("attila_plugin")
+class TestAssetBundles:
+    @pytest.fixture
+    def build(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ) -> Callable:
+        default_settings["ATTILA_ASSETS"] = True
+
+        def build() -> BeautifulSoup:
+            gen_site(output_path=tmp_path)
+            with open(tmp_path / "index.html", encoding="utf-8") as f:
+                return BeautifulSoup(f, "html.parser")
+
+        return build
+
+    def test_bundles(self, tmp_path: Path, build: Callable):
+        soup = build()
+        stylesheets = [link["href"] for link in soup.find_all("link", rel="stylesheet")]
+        bundle = next(href for href in stylesheets if "/attila." in href)
+        assert re.search(r"/theme/css/attila\.[0-9a-f]{10}\.css$", bundle)
+        assert not any(
+            href.endswith(("style.css", "myblog.css")) for href in stylesheets
+        )
+
+        css = (tmp_path / bundle.lstrip("/")).read_text(encoding="utf-8")
+        assert "normalize.css" in css
+        assert len(css) < (THEME_DIR / "static/css/style.css").stat().st_size
+
+        scripts = [script["src"] for script in soup.find_all("script", src=True)]
+        js = [src for src in scripts if "/theme/js/attila." in src]
+        assert len(js) == 1
+        assert not any(
+            src.endswith(("script.js", "scroll.js", "fitvids.js")) for src in scripts
+        )
+        code = (tmp_path / js[0].lstrip("/")).read_text(encoding="utf-8")
+        assert "fitVids" in code and "menu-active" in code and "cover-active" in code
+
+    def test_stale_bundles_removed(
+        self, tmp_path: Path, default_settings: Settings, build: Callable
+    ):
+        stale = tmp_path / "theme" / "css" / "attila.0123456789.css"
+        stale.parent.mkdir(parents=True)
+        stale.write_text("", encoding="utf-8")
+        kept = tmp_path / "theme" / "css" / "user.0123456789.css"
+        kept.write_text("", encoding="utf-8")
+
+        build()
+        assert not stale.exists()
+        assert kept.exists()
+        assert len(list((tmp_path / "theme" / "js").glob("search.*.js"))) == 1
+
+    def test_remote_overrides_keep_their_order(
+        self, default_settings: Settings, build: Callable
+    ):
+        default_settings["JS_OVERRIDE"] = [
+            "https://example.com/before.js",
+            "/assets/js/missing.js",
+        ]
+        soup = build()
+        scripts = [script["src"] for script in soup.find_all("script", src=True)]
+        start = scripts.index("https://example.com/before.js")
+        assert "/theme/js/attila." in scripts[start - 1]
+        assert scripts[start + 1].endswith("/assets/js/missing.js")
@@ -0,0 +1,255 @@
+"""Build-time benchmarks of the theme over synthetic corpora.
+
+Skipped unless ``ATTILA_BENCHMARK`` lists the corpus sizes to build::
+
+    ATTILA_BENCHMARK=100,1000,10000,50000 pytest tests/test_benchmark.py
+
+Each corpus is built in a forked process so peak RSS is measured per size.
+Results are written as JSON to ``ATTILA_BENCHMARK_REPORT`` (by default
+``tests/output/benchmark.json``, ignored by git) to compare theme releases.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import platform
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pelican
+import pytest
+from jinja2 import Template
+
+from .. import get_version
+from .conftest import OUTPUT_DIR, _gen_site
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SIZES = [
+    int(size) for size in os.environ.get("ATTILA_BENCHMARK", "").split(",") if size
+]
+REPORT = os.environ.get("ATTILA_BENCHMARK_REPORT", f"{OUTPUT_DIR}/benchmark.json")
+
+WORDS = [
+    "lorem",
+    "ipsum",
+    "dolor",
+    "sit",
+    "amet",
+    "consectetur",
+    "adipiscing",
+    "elit",
+    "sed",
+    "do",
+    "eiusmod",
+    "tempor",
+    "incididunt",
+    "ut",
+    "labore",
+    "et",
+    "dolore",
+    "magna",
+    "aliqua",
+    "pelican",
+    "theme",
+    "attila",
+    "python",
+    "jinja",
+    "template",
+    "cover",
+    "author",
+    "category",
+    "archive",
+]
+
+ARTICLE = """\
+{title}
+{underline}
+
+:date: {date:%Y-%m-%d %H:%M}
+:author: {author}
+:category: {category}
+:tags: {tags}
+:slug: {slug}
+{extra}
+
+{paragraphs}
+
+.. code-block:: python
+
+    def example_{index}():
+        return {index}
+"""
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def generate_corpus(path: Path, size: int, seed: int = 0) -> dict[str, Any]:
+    """Writes ``size`` reST articles to ``path``, returns the matching settings.
+
+    Tags follow a long-tail distribution over ``size // 10`` names, with a few
+    authors (described in ``AUTHOR_META``) and a mix of covers and colors.
+    """
+    rng = random.Random(seed)
+    authors = [f"author{i}" for i in range(max(3, min(size // 50, 40)))]
+    categories = [f"category{i}" for i in range(12)]
+    tags = [f"tag{i}" for i in range(max(5, size // 10))]
+    start = datetime(2010, 1, 1)
+
+    path.mkdir(parents=True, exist_ok=True)
+    for index in range(size):
+        title = f"Article {index} {_sentence(rng, 4)}"
+        extra = rng.choice(
+            (
+                f":cover: /assets/images/cover-{index % 50}.jpg",
+                f":og_image: assets/images/og-{index % 50}.jpg",
+                ":color: #336699",
+                "",
+            )
+        )
+        paragraphs = "\n\n".join(
+            " ".join(_sentence(rng, rng.randint(8, 20)) for _ in range(5))
+            for _ in range(rng.randint(3, 8))
+        )
+        article_tags = {
+            tags[min(int(rng.paretovariate(1.2)) - 1, len(tags) - 1)]
+            for _ in range(rng.randint(1, 5))
+        }
+        (path / f"article-{index}.rst").write_text(
+            ARTICLE.format(
+                title=title,
+                underline="#" * len(title),
+                date=start + timedelta(hours=index * 7),
+                author=rng.choice(authors),
+                category=rng.choice(categories),
+                tags=", ".join(sorted(article_tags)),
+                slug=f"article-{index}",
+                extra=extra,
+                paragraphs=paragraphs,
+                index=index,
+            ),
+            encoding="utf-8",
+        )
+
+    return {
+        "AUTHOR_META": {
+            author: {
+                "name": author.title(),
+                "image": f"assets/images/{author}.png",
+                "cover": f"/assets/images/{author}-cover.jpg",
+                "bio": _sentence(rng, 20),
+                "twitter": author,
+            }
+            for author in authors
+        },
+        "HEADER_COVER": "/assets/images/header_cover.jpg",
+    }
+
+
+def _profile_renders(timings: dict[str, list[float]]) -> None:
+    render = Template.render
+
+    def _render(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            timings[self.name].append(time.perf_counter() - started)
+
+    Template.render = _render
+
+
+def _peak_rss() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if platform.system() == "Darwin" else peak * 1024
+
+
+def _build(settings: Settings, content: Path, output: Path, conn) -> None:
+    timings: dict[str, list[float]] = defaultdict(list)
+    _profile_renders(timings)
+
+    started = time.perf_counter()
+    _gen_site(settings, path=str(content), output_path=str(output))
+    elapsed = time.perf_counter() - started
+
+    files = [file for file in output.rglob("*") if file.is_file()]
+    conn.send(
+        {
+            "seconds": elapsed,
+            "peak_rss_bytes": _peak_rss(),
+            "output_files": len(files),
+            "output_bytes": sum(file.stat().st_size for file in files),
+            "templates": {
+                name: {"calls": len(calls), "seconds": sum(calls)}
+                for name, calls in sorted(timings.items())
+            },
+        }
+    )
+    conn.close()
+
+
+@pytest.mark.skipif(not SIZES, reason="set ATTILA_BENCHMARK to run benchmarks")
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="benchmarks fork one process per corpus",
+)
+@pytest.mark.usefixtures("gen_site")
+def test_benchmark(tmp_path: Path, default_settings: Settings):
+    results = []
+    for size in SIZES:
+        content = tmp_path / f"content-{size}"
+        settings = default_settings.copy()
+        settings.update(generate_corpus(content, size))
+
+        context = multiprocessing.get_context("fork")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_build,
+            args=(settings, content, tmp_path / f"output-{size}", sender),
+        )
+        process.start()
+        # Only the child can send, so recv() fails once it is gone.
+        sender.close()
+        try:
+            result = receiver.recv()
+        except EOFError:
+            process.join()
+            pytest.fail(
+                f"Building {size} articles failed, exit code {process.exitcode}"
+            )
+        process.join()
+        assert process.exitcode == 0
+
+        results.append({"articles": size, **result})
+        assert result["templates"]["article.html"]["calls"] == size
+
+    os.makedirs(os.path.dirname(REPORT), exist_ok=True)
+    with open(REPORT, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "theme_version": get_version(),
+                "pelican_version": pelican.__version__,
+                "python_version": platform.python_version(),
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
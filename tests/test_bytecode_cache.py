@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import pytest
+from jinja2 import Environment
+from pelican.writers import Writer
+
+from .. import get_jinja_environment
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pelican.settings import Settings
+
+
+@pytest.fixture
+def compile_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls = []
+    compile_ = Environment.compile
+
+    def _compile(self, source, name=None, filename=None, *args, **kwargs):
+        calls.append(name)
+        return compile_(self, source, name, filename, *args, **kwargs)
+
+    monkeypatch.setattr(Environment, "compile", _compile)
+    return calls
+
+
+class TestBytecodeCache:
+    def test_warm_build_skips_compilation(
+        self,
+        tmp_path: Path,
+        default_settings: Settings,
+        gen_article_and_html_from_rst: Callable,
+        compile_calls: list[str],
+    ):
+        jinja_env = default_settings["JINJA_ENVIRONMENT"]
+
+        default_settings["JINJA_ENVIRONMENT"] = get_jinja_environment(
+            cache_dir=tmp_path, **jinja_env
+        )
+        _, cold = gen_article_and_html_from_rst(
+            rst_path="content/article_with_cover_image.rst"
+        )
+        assert "article.html" in compile_calls
+        assert "base.html" in compile_calls
+
+        compile_calls.clear()
+        default_settings["JINJA_ENVIRONMENT"] = get_jinja_environment(
+            cache_dir=tmp_path, **jinja_env
+        )
+        _, warm = gen_article_and_html_from_rst(
+            rst_path="content/article_with_cover_image.rst",
+            writer=Writer("output", default_settings),
+        )
+        assert compile_calls == []
+        assert str(warm) == str(cold)
+
+    def test_changed_template_is_recompiled(self, tmp_path: Path):
+        cache = get_jinja_environment(cache_dir=tmp_path)["bytecode_cache"]
+        env = Environment(bytecode_cache=cache)
+        bucket = cache.get_bucket(env, "t.html", None, "{{ 1 }}")
+        bucket.code = env.compile("{{ 1 }}", "t.html")
+        cache.set_bucket(bucket)
+
+        assert cache.get_bucket(env, "t.html", None, "{{ 1 }}").code is not None
+        assert cache.get_bucket(env, "t.html", None, "{{ 2 }}").code is None
+
+    def test_eviction_by_size(self, tmp_path: Path):
+        cache = get_jinja_environment(cache_dir=tmp_path, max_size=0)["bytecode_cache"]
+        env = Environment(bytecode_cache=cache)
+        bucket = cache.get_bucket(env, "t.html", None, "{{ 1 }}")
+        bucket.code = env.compile("{{ 1 }}", "t.html")
+        cache.set_bucket(bucket)
+
+        assert list(tmp_path.iterdir()) == []
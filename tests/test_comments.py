@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+
+from .. import comments
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+
+def test_load_counts(tmp_path: Path):
+    snapshot = tmp_path / "counts.json"
+    snapshot.write_text(json.dumps({"/a.html": 2, "b": "0"}), encoding="utf-8")
+    assert comments.load_counts(str(snapshot)) == {"/a.html": 2, "b": 0}
+
+
+def test_load_api_response(tmp_path: Path):
+    snapshot = tmp_path / "threads.json"
+    snapshot.write_text(
+        json.dumps(
+            {"code": 0, "response": [{"identifiers": ["/a.html", "a"], "posts": 4}]}
+        ),
+        encoding="utf-8",
+    )
+    assert comments.load_counts(str(snapshot)) == {"/a.html": 4, "a": 4}
+
+
+def test_missing_snapshot(tmp_path: Path, caplog):
+    with caplog.at_level(logging.WARNING, logger="attila"):
+        assert comments.load_counts(str(tmp_path / "missing.json")) is None
+    assert "Comment counts not loaded" in caplog.text
+
+
+def _index(tmp_path: Path, gen_site: Callable) -> BeautifulSoup:
+    gen_site(output_path=tmp_path)
+    with open(tmp_path / "index.html", encoding="utf-8") as f:
+        return BeautifulSoup(f, "html.parser")
+
+
+@pytest.mark.usefixtures("attila_plugin")
+def test_baked_counts(tmp_path: Path, default_settings: Settings, gen_site: Callable):
+    snapshot = tmp_path / "counts.json"
+    snapshot.write_text(
+        json.dumps({"/2018/04/with-cover-images.html": 1}), encoding="utf-8"
+    )
+    default_settings["ATTILA_COMMENT_COUNTS"] = str(snapshot)
+    soup = _index(tmp_path / "output", gen_site)
+
+    links = soup.select(".post-comments-count a")
+    baked = [link for link in links if link.string == "1 comment"]
+    assert len(baked) == 1
+    assert baked[0]["href"] == "/2018/04/with-cover-images.html#show-disqus"
+    assert len(links) > 1
+    assert all(
+        link["href"].endswith("#disqus_thread") for link in links if link not in baked
+    )
+
+
+def test_lazy_counts(tmp_path: Path, default_settings: Settings, gen_site: Callable):
+    default_settings["ATTILA_LAZY_COMMENT_COUNTS"] = True
+    soup = _index(tmp_path, gen_site)
+    loader = next(
+        script.string
+        for script in soup.find_all("script")
+        if script.string and "count.js" in script.string
+    )
+    assert "IntersectionObserver" in loader and "'load'" in loader
+    assert loader.count("disqus.com/count.js") == 1
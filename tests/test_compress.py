@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from .. import compress
+
+PAGE = "<html><body>" + "<p>Lorem ipsum dolor sit amet.</p>" * 100 + "</body></html>"
+
+
+@pytest.fixture
+def output(tmp_path: Path) -> Path:
+    output = tmp_path / "output"
+    (output / "theme/css").mkdir(parents=True)
+    (output / "index.html").write_text(PAGE, encoding="utf-8")
+    (output / "theme/css/style.css").write_text("a{color:red}" * 50, encoding="utf-8")
+    (output / "robots.txt").write_text("User-agent: *", encoding="utf-8")
+    (output / "cover.jpg").write_bytes(b"\xff\xd8" * 500)
+    return output
+
+
+@pytest.fixture
+def settings(tmp_path: Path) -> dict:
+    return {"CACHE_PATH": str(tmp_path / "cache"), "ATTILA_COMPRESS_WORKERS": 2}
+
+
+def test_compress(output: Path, settings: dict):
+    report = compress.compress_output(
+        str(output), {**settings, "ATTILA_COMPRESS_FORMATS": ["gz"]}
+    )
+    assert report.files == report.compressed == 2
+    assert gzip.decompress((output / "index.html.gz").read_bytes()).decode() == PAGE
+    assert (output / "theme/css/style.css.gz").exists()
+    # Too small, or not text
+    assert not (output / "robots.txt.gz").exists()
+    assert not (output / "cover.jpg.gz").exists()
+    assert report.compressed_bytes["gz"] < report.original_bytes
+
+
+def test_brotli(output: Path, settings: dict):
+    brotli = pytest.importorskip("brotli")
+    compress.compress_output(str(output), settings)
+    assert brotli.decompress((output / "index.html.br").read_bytes()).decode() == PAGE
+
+
+def test_unchanged_files_skipped(output: Path, settings: dict):
+    settings["ATTILA_COMPRESS_FORMATS"] = ["gz"]
+    compress.compress_output(str(output), settings)
+    assert compress.compress_output(str(output), settings).compressed == 0
+
+    (output / "index.html").write_text(PAGE.replace("Lorem", "Hello"), encoding="utf-8")
+    (output / "theme/css/style.css").unlink()
+    report = compress.compress_output(str(output), settings)
+    assert report.files == report.compressed == 1
+    assert b"Hello" in gzip.decompress((output / "index.html.gz").read_bytes())
+    assert not (output / "theme/css/style.css.gz").exists()
+
+
+def test_report(tmp_path: Path, output: Path, settings: dict):
+    report_path = tmp_path / "report.json"
+    compress.compress_output(
+        str(output),
+        {
+            **settings,
+            "ATTILA_COMPRESS_FORMATS": ["gz"],
+            "ATTILA_COMPRESS_REPORT": str(report_path),
+        },
+    )
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["sizes"]["index.html"]["original"] == len(PAGE)
+    assert (
+        report["sizes"]["index.html"]["gz"] == (output / "index.html.gz").stat().st_size
+    )
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+
+from .. import critical_css, plugin
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+THEME_DIR = Path(__file__).parent.parent
+
+
+def test_parse():
+    rules = critical_css.parse(
+        '@import "a.css";/* a { } */a{content:"}"}@media print{b{color:red}}'
+    )
+    assert rules == [
+        ('@import "a.css"', None),
+        ("a", 'content:"}"'),
+        ("@media print", "b{color:red}"),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("selector", "expected"),
+    [
+        ("a:hover", "a"),
+        (".nav-menu::before", ".nav-menu"),
+        ("li:first-child > a:focus-visible", "li:first-child > a"),
+        ("::selection", "*"),
+        ("input::-webkit-search-decoration", "input"),
+    ],
+)
+def test_base_selector(selector: str, expected: str):
+    assert critical_css.base_selector(selector) == expected
+
+
+@pytest.mark.usefixtures("attila_plugin")
+class TestCriticalCss:
+    @pytest.fixture
+    def site(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ) -> Callable:
+        default_settings["ATTILA_CRITICAL_CSS"] = True
+        gen_site(output_path=tmp_path)
+        # Static files are copied by Pelican's static generator.
+        (tmp_path / "theme" / "css").mkdir(parents=True)
+        shutil.copy(THEME_DIR / "static/css/style.css", tmp_path / "theme/css")
+        override = tmp_path / "assets/css/myblog.css"
+        override.parent.mkdir(parents=True)
+        override.write_text(
+            ".post-title{color:red}.unused-class{color:blue}", encoding="utf-8"
+        )
+
+        def finalize() -> None:
+            plugin.finalized(
+                SimpleNamespace(settings=default_settings, output_path=str(tmp_path))
+            )
+
+        return finalize
+
+    def _critical(self, path: Path) -> str:
+        soup = BeautifulSoup(path.read_text(encoding="utf-8"), "html.parser")
+        (style,) = soup.find_all("style", attrs={critical_css.MARKER: True})
+        return style.string
+
+    def test_inline_per_family(self, tmp_path: Path, site: Callable):
+        site()
+
+        post = tmp_path / "2018/04/with-cover-images.html"
+        css = self._critical(post)
+        assert ".post-title{color:red}" in css
+        assert ".unused-class" not in css
+        assert ".tag-cloud" not in css
+        assert ".tag-cloud" in self._critical(tmp_path / "tags.html")
+
+        soup = BeautifulSoup(post.read_text(encoding="utf-8"), "html.parser")
+        blocking = [
+            link["href"]
+            for link in soup.head.find_all("link", rel="stylesheet")
+            if link.find_parent("noscript") is None
+        ]
+        assert all(href.startswith("https://fonts.") for href in blocking)
+        preloads = [link["href"] for link in soup.head.find_all("link", rel="preload")]
+        assert preloads == ["/theme/css/style.css", "/assets/css/myblog.css"]
+        hrefs = [
+            link["href"]
+            for noscript in soup.head.find_all("noscript")
+            for link in noscript.find_all("link")
+        ]
+        assert hrefs == preloads
+
+    def test_idempotent(self, tmp_path: Path, site: Callable):
+        site()
+        page = tmp_path / "index.html"
+        first = page.read_text(encoding="utf-8")
+        site()
+        assert page.read_text(encoding="utf-8") == first
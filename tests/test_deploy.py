@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from .. import deploy
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.name", "Test")
+    _git(repo, "config", "user.email", "test@example.com")
+    return repo
+
+
+@pytest.fixture
+def output(tmp_path: Path) -> Path:
+    output = tmp_path / "output"
+    (output / "theme/css").mkdir(parents=True)
+    (output / "index.html").write_text("<p>Hello</p>", encoding="utf-8")
+    (output / "about.html").write_text("<p>About</p>", encoding="utf-8")
+    (output / "theme/css/style.css").write_text("a{}", encoding="utf-8")
+    return output
+
+
+def _published(repo: Path) -> dict[str, str]:
+    files = _git(repo, "ls-tree", "-r", "--name-only", "gh-pages").split()
+    return {path: _git(repo, "show", f"gh-pages:{path}") for path in files}
+
+
+def test_blob_sha(output: Path, repo: Path):
+    path = output / "index.html"
+    assert deploy.blob_sha(str(path), path.stat().st_size) == (
+        _git(repo, "hash-object", str(path)).strip()
+    )
+
+
+def test_deploy(output: Path, repo: Path):
+    changes = deploy.deploy(str(output), message="First", repo=str(repo), workers=2)
+    assert changes.added == ["about.html", "index.html", "theme/css/style.css"]
+    assert _published(repo) == {
+        "about.html": "<p>About</p>",
+        "index.html": "<p>Hello</p>",
+        "theme/css/style.css": "a{}",
+    }
+
+    (output / "index.html").write_text("<p>Hello, world</p>", encoding="utf-8")
+    (output / "about.html").unlink()
+    (output / "feed.xml").write_text("<feed/>", encoding="utf-8")
+    changes = deploy.deploy(str(output), message="Second", repo=str(repo))
+    assert changes.added == ["feed.xml"]
+    assert changes.changed == ["index.html"]
+    assert changes.removed == ["about.html"]
+    assert changes.size == len("<feed/>") + len("<p>Hello, world</p>")
+    assert _published(repo) == {
+        "feed.xml": "<feed/>",
+        "index.html": "<p>Hello, world</p>",
+        "theme/css/style.css": "a{}",
+    }
+    assert _git(repo, "log", "--format=%s", "gh-pages").split() == ["Second", "First"]
+    # Nothing left to publish
+    assert not deploy.deploy(str(output), repo=str(repo))
+    assert _git(repo, "rev-list", "--count", "gh-pages").strip() == "2"
+
+
+def test_dry_run(output: Path, repo: Path):
+    changes = deploy.deploy(str(output), repo=str(repo), dry_run=True)
+    assert len(changes.added) == 3
+    assert "3 added, 0 changed, 0 removed" in changes.summary()
+    with pytest.raises(subprocess.CalledProcessError):
+        _git(repo, "rev-parse", "--verify", "gh-pages")
+
+
+def test_stat_cache(output: Path, repo: Path, monkeypatch: pytest.MonkeyPatch):
+    deploy.deploy(str(output), repo=str(repo))
+    (output / "index.html").write_text("<p>Bye</p>", encoding="utf-8")
+    hashed = []
+    blob_sha = deploy.blob_sha
+    monkeypatch.setattr(
+        deploy,
+        "blob_sha",
+        lambda path, size: hashed.append(path) or blob_sha(path, size),
+    )
+    changes = deploy.deploy(str(output), repo=str(repo))
+    assert changes.changed == ["index.html"]
+    assert hashed == [os.path.join(str(output), "index.html")]
+
+
+def test_push_retried(output: Path, repo: Path, tmp_path: Path):
+    remote = tmp_path / "remote.git"
+    _git(repo, "remote", "add", "origin", str(remote))
+    with pytest.raises(subprocess.CalledProcessError):
+        deploy.deploy(str(output), repo=str(repo), remote="origin")
+
+    _git(tmp_path, "init", "-q", "--bare", str(remote))
+    assert not deploy.deploy(str(output), repo=str(repo), remote="origin")
+    assert _git(remote, "rev-parse", "gh-pages") == _git(repo, "rev-parse", "gh-pages")
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+
+from .. import fonts, plugin
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+THEME_DIR = Path(__file__).parent.parent
+
+FONT_FACE = """@font-face {
+    font-family: 'icon';
+    src: url("../font/icon.eot?1");
+    src: url("../font/icon.eot?1#iefix") format("embedded-opentype"),url("../font/icon.woff2?1") format("woff2"),url("../font/icon.woff?1") format("woff");
+    font-weight: normal
+}"""
+
+
+def test_drop_legacy_formats():
+    css = fonts.drop_legacy_formats(FONT_FACE)
+    assert ".eot" not in css and ".woff?" not in css
+    assert 'url("../font/icon.woff2?1") format("woff2")' in css
+    assert fonts.font_faces(css) == [
+        fonts.FontFace("icon", "400", "normal", "../font/icon.woff2?1")
+    ]
+
+
+def test_icon_codepoints():
+    css = (THEME_DIR / "static/css/style.css").read_text(encoding="utf-8")
+    codepoints = fonts.icon_codepoints(css)
+    assert codepoints["icon-star"] == 0xE800
+    assert codepoints["icon-rss"] == 0xE801
+
+
+def test_collect_text(tmp_path: Path):
+    page = tmp_path / "page.html"
+    page.write_text(
+        '<p class="post icon-rss">Żółw</p><script>var ŝ;</script><img alt="Ωmega">',
+        encoding="utf-8",
+    )
+    characters, icons = fonts.collect_text([str(page)])
+    assert {"Ż", "ł", "Ω"} <= characters
+    assert "ŝ" not in characters
+    assert icons == {"icon-rss"}
+
+
+@pytest.mark.usefixtures("attila_plugin")
+class TestFontSubset:
+    @pytest.fixture
+    def site(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ) -> Callable:
+        default_settings["ATTILA_FONT_SUBSET"] = True
+
+        def build() -> None:
+            gen_site(output_path=tmp_path)
+            # Static files are copied by Pelican's static generator.
+            shutil.copytree(THEME_DIR / "static/font", tmp_path / "theme/font")
+            (tmp_path / "theme/css").mkdir(parents=True)
+            shutil.copy(THEME_DIR / "static/css/style.css", tmp_path / "theme/css")
+            plugin.finalized(
+                SimpleNamespace(settings=default_settings, output_path=str(tmp_path))
+            )
+
+        return build
+
+    def test_preloads(self, tmp_path: Path, site: Callable):
+        site()
+        with open(tmp_path / "index.html", encoding="utf-8") as f:
+            soup = BeautifulSoup(f, "html.parser")
+        preloads = [link["href"] for link in soup.head.find_all("link", rel="preload")]
+        assert preloads == [
+            "/theme/font/icon.woff2?89549845",
+            "/theme/font/fira-sans-v8-latin-regular.woff2",
+        ]
+
+    def test_subset(self, tmp_path: Path, site: Callable):
+        pytest.importorskip("fontTools")
+        from fontTools.ttLib import TTFont
+
+        site()
+        font_dir = tmp_path / "theme/font"
+        icon = font_dir / "icon.woff2"
+        assert (
+            icon.stat().st_size < (THEME_DIR / "static/font/icon.woff2").stat().st_size
+        )
+        codepoints = fonts.icon_codepoints(
+            (THEME_DIR / "static/css/style.css").read_text(encoding="utf-8")
+        )
+        cmap = TTFont(icon).getBestCmap()
+        assert codepoints["icon-menu"] in cmap
+        assert codepoints["icon-star"] not in cmap
+        assert not list(font_dir.glob("*.eot")) and not list(font_dir.glob("*.woff"))
+        css = (tmp_path / "theme/css/style.css").read_text(encoding="utf-8")
+        assert ".eot" not in css and "icon.woff2" in css
+
+    def test_legacy_formats(
+        self, tmp_path: Path, default_settings: Settings, site: Callable
+    ):
+        default_settings["ATTILA_FONT_LEGACY_FORMATS"] = True
+        site()
+        assert (tmp_path / "theme/font/icon.eot").exists()
+        css = (tmp_path / "theme/css/style.css").read_text(encoding="utf-8")
+        assert "icon.eot" in css
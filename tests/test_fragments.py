@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from jinja2 import DictLoader, Environment
+
+from .. import fragments
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+
+def _render(environment: Environment, **context) -> str:
+    return environment.from_string(
+        "{{ attila_cached_include('nav.html', active) }}"
+    ).render(**context)
+
+
+@pytest.fixture
+def environment() -> Environment:
+    return Environment(
+        loader=DictLoader({"nav.html": "<a>{{ SITEURL }} {{ active }}</a>"})
+    )
+
+
+def test_renders_once_per_inputs(environment: Environment):
+    cache = fragments.install(environment)
+    assert _render(environment, SITEURL="/blog", active="home") == ("<a>/blog home</a>")
+    assert _render(environment, SITEURL="/blog", active="home") == ("<a>/blog home</a>")
+    assert _render(environment, SITEURL="/blog", active="about") == (
+        "<a>/blog about</a>"
+    )
+    # Relative URLs
+    assert _render(environment, SITEURL="..", active="home") == "<a>.. home</a>"
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_lru(environment: Environment):
+    cache = fragments.install(environment, size=2)
+    for active in ("home", "about", "home", "tags"):
+        _render(environment, SITEURL="", active=active)
+    assert len(cache) == 2
+    # "about" was dropped, not "home"
+    _render(environment, SITEURL="", active="home")
+    _render(environment, SITEURL="", active="about")
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_unhashable_inputs(environment: Environment):
+    cache = fragments.install(environment)
+    assert _render(environment, SITEURL="", active=["home"]) == "<a> ['home']</a>"
+    assert len(cache) == 0
+
+
+@pytest.mark.usefixtures("attila_plugin")
+def test_site_unchanged(
+    tmp_path: Path,
+    default_settings: Settings,
+    gen_site: Callable,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    default_settings["MENUITEMS"] = [("Tags", "/tags.html")]
+    default_settings["SHOW_CATEGORIES_ON_MENU"] = True
+    gen_site(output_path=tmp_path / "plain")
+
+    caches = []
+    install = fragments.install
+    monkeypatch.setattr(
+        fragments, "install", lambda *args: caches.append(install(*args)) or caches[-1]
+    )
+    default_settings["ATTILA_FRAGMENT_CACHE"] = True
+    gen_site(output_path=tmp_path / "cached")
+
+    plain = sorted((tmp_path / "plain").rglob("*.html"))
+    assert plain
+    for path in plain:
+        cached = tmp_path / "cached" / path.relative_to(tmp_path / "plain")
+        assert cached.read_text() == path.read_text(), cached
+    assert caches[0].hits > 0
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+
+from .. import highlight
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+PYGMENTS = (
+    '<div class="highlight"><pre><span></span><span class="k">def</span>'
+    '<span class="w"> </span><span class="nf">f</span><span class="p">():</span>\n'
+    '<span class="hll">    <span class="k">return</span> <span class="mi">1</span>\n'
+    "</span></pre></div>"
+)
+ASCIIDOC = (
+    '<pre class="highlightjs highlight"><code class="language-python hljs" '
+    'data-lang="python">if a &lt; 1:\n    pass</code></pre>'
+)
+
+
+def test_pygments_classes_renamed():
+    html = highlight.highlight_html(PYGMENTS)
+    soup = BeautifulSoup(html, "html.parser")
+    assert soup.pre["class"] == ["hljs"]
+    classes = [span.get("class", [""])[0] for span in soup.pre.find_all("span")]
+    assert classes == ["", "hljs-keyword", "", "hljs-title", "", "", "hljs-keyword"] + [
+        "hljs-number"
+    ]
+    assert soup.pre.get_text() == "def f():\n    return 1\n"
+    assert highlight.highlight_html(html) == html
+
+
+def test_asciidoc_tokenized():
+    html = highlight.highlight_html(ASCIIDOC, asciidoc=True, numbers=True)
+    soup = BeautifulSoup(html, "html.parser")
+    assert soup.code.get_text() == "if a < 1:\n    pass"
+    assert soup.code.find("span", class_="hljs-keyword").string == "if"
+    assert [line.string for line in soup.select("pre > .lines .line")] == ["1", "2"]
+    assert "has-lines" in soup.pre["class"]
+    assert highlight.highlight_html(html, asciidoc=True) == html
+
+
+def test_asciidoc_selector_only_for_asciidoc():
+    assert highlight.highlight_html(ASCIIDOC) == ASCIIDOC
+
+
+@pytest.mark.parametrize(("code", "count"), [("a", 0), ("a\n", 0), ("a\nb\n", 2)])
+def test_line_numbers(code: str, count: int):
+    assert highlight.line_numbers(code).count('class="line"') == count
+
+
+@pytest.mark.usefixtures("attila_plugin")
+def test_no_client_side_highlighting(
+    tmp_path: Path, default_settings: Settings, gen_site: Callable
+):
+    default_settings["ATTILA_HIGHLIGHT"] = True
+    content = tmp_path / "content"
+    content.mkdir()
+    (content / "code.rst").write_text(
+        "Code\n####\n\n:date: 2018-04-29 00:45\n:slug: code\n\n"
+        ".. code-block:: python\n\n    def f():\n        return 1\n",
+        encoding="utf-8",
+    )
+    gen_site(path=content, output_path=tmp_path / "output")
+
+    page = (tmp_path / "output/2018/04/code.html").read_text(encoding="utf-8")
+    soup = BeautifulSoup(page, "html.parser")
+    assert soup.select_one(".highlight pre .hljs-keyword").string == "def"
+    assert not any("highlight" in s["src"] for s in soup.find_all("script", src=True))
+    assert "hljs.highlightElement" not in page
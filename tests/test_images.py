@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+
+from .. import images
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+pytest.importorskip("PIL")
+
+
+@pytest.mark.usefixtures("attila_plugin")
+class TestResponsiveImages:
+    @pytest.fixture
+    def build(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ) -> Callable:
+        default_settings.update(
+            ATTILA_IMAGES=True,
+            ATTILA_IMAGE_FORMATS=["webp"],
+            ATTILA_IMAGE_WORKERS=1,
+            CACHE_PATH=str(tmp_path / "cache"),
+            AUTHOR_META={"raj": {"image": "assets/images/avatar.png"}},
+        )
+
+        def build(page: str = "2018/04/with-cover-images.html") -> BeautifulSoup:
+            gen_site(output_path=tmp_path / "output")
+            path = tmp_path / "output" / page
+            return BeautifulSoup(path.read_text(encoding="utf-8"), "html.parser")
+
+        return build
+
+    def test_cover(self, tmp_path: Path, build: Callable):
+        soup = build()
+        picture = soup.find("div", class_="post-cover").picture
+        source = picture.source
+        assert source["type"] == "image/webp"
+        assert source["srcset"] == (
+            "/images/responsive/article_cover.{0}.640.webp 640w, "
+            "/images/responsive/article_cover.{0}.662.webp 662w"
+        ).format(source["srcset"].split(".")[1])
+        img = picture.img
+        assert (img["width"], img["height"]) == ("662", "245")
+        assert img["src"].endswith(".662.jpg")
+        for candidate in img["srcset"].split(", "):
+            url, _ = candidate.split()
+            assert (tmp_path / "output" / url.lstrip("/")).is_file()
+
+    def test_avatar_keeps_transparency(self, build: Callable):
+        soup = build("author/raj/index.html")
+        img = soup.find("figure", class_="archive-avatar").img
+        assert img["src"].endswith(".64.png")
+        assert img["sizes"] == "(max-width: 640px) 8rem, 10rem"
+
+    def test_remote_cover_left_as_is(self, build: Callable):
+        soup = build("2018/04/with-http-cover-images.html")
+        img = soup.find("div", class_="post-cover").img
+        assert img["src"] == "http://example.com/cover.jpg"
+        assert img.find_parent("picture") is None
+
+    def test_rebuild_reuses_variants(
+        self, tmp_path: Path, build: Callable, monkeypatch: pytest.MonkeyPatch
+    ):
+        build()
+        cache = tmp_path / "cache" / images.CACHE_DIR
+        cached = {path.name for path in cache.iterdir()}
+        (tmp_path / "output" / images.OUTPUT_DIR / "old.0123abcd.640.jpg").touch()
+
+        def fail(job):
+            raise AssertionError(f"{job[1]} encoded again")
+
+        monkeypatch.setattr(images, "encode_variant", fail)
+        build()
+        assert {path.name for path in cache.iterdir()} == cached
+        assert not (
+            tmp_path / "output" / images.OUTPUT_DIR / "old.0123abcd.640.jpg"
+        ).exists()
+
+    @pytest.mark.parametrize(
+        ("key", "stem"),
+        [
+            ("assets/images/my photo, 2.jpg", "my-photo-2"),
+            ("assets/images/Café.jpg", "cafe"),
+            ("assets/images/!?.jpg", "image"),
+        ],
+    )
+    def test_variant_names_fit_srcset(
+        self, tmp_path: Path, default_settings: Settings, key: str, stem: str
+    ):
+        default_settings.update(
+            ATTILA_IMAGE_FORMATS=["webp"], CACHE_PATH=str(tmp_path / "cache")
+        )
+        builder = images.ImageBuilder(default_settings, str(tmp_path / "output"))
+        path = Path(__file__).parent / "content/assets/images/article_cover.jpg"
+        source = images._Source(str(path), "0123abcd", {"cover"})
+        image = builder.plan(key, source, {})
+        for srcset in (*image.sources, image.fallback):
+            for variant in srcset.variants:
+                name = variant.url.rpartition("/")[2]
+                assert name.startswith(f"{stem}.0123abcd.")
+                assert images._VARIANT.match(name)
+                assert len(f"{variant.url} {variant.width}w".split()) == 2
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import shutil
+from collections.abc import Callable
+from functools import partial
+from typing import TYPE_CHECKING
+
+import pytest
+
+from .conftest import CONTENT_DIR
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pelican.settings import Settings
+
+
+class TestIncrementalBuild:
+    @pytest.fixture
+    def build(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ) -> Callable:
+        content_dir = tmp_path / "content"
+        shutil.copytree(CONTENT_DIR, content_dir)
+        default_settings.update(
+            ATTILA_INCREMENTAL=True, CACHE_PATH=str(tmp_path / "cache")
+        )
+        return partial(gen_site, path=content_dir, output_path=tmp_path / "output")
+
+    def test_unchanged_build_renders_nothing(self, build: Callable):
+        first = build()
+        assert first.dependencies.nodes
+        assert first.unchanged == set()
+
+        second = build()
+        assert len(second.unchanged) == len(second.dependencies.nodes)
+
+    def test_edit_renders_only_affected_outputs(self, tmp_path: Path, build: Callable):
+        content_dir, output_dir = tmp_path / "content", tmp_path / "output"
+        build()
+        article = output_dir / "2018/04/with-og-cover-images.html"
+        untouched = output_dir / "2018/04/with-http-cover-images.html"
+        untouched_mtime = untouched.stat().st_mtime_ns
+
+        source = content_dir / "article_with_og_image.rst"
+        source.write_text(source.read_text() + "\n\nA typo fix.\n")
+        writer = build()
+
+        rendered = {
+            name
+            for name in writer.dependencies.nodes
+            if str(output_dir / name) not in writer.unchanged
+        }
+        assert "2018/04/with-og-cover-images.html" in rendered
+        assert "tag/bartag/index.html" in rendered
+        assert "tag/footag/index.html" not in rendered
+        assert "A typo fix." in article.read_text()
+        assert untouched.stat().st_mtime_ns == untouched_mtime
+
+    def test_dependency_graph(self, build: Callable):
+        writer = build()
+        node = writer.dependencies.nodes["2018/04/with-og-cover-images.html"]
+        assert any(
+            source.endswith("article_with_og_image.rst") for source in node["sources"]
+        )
+        assert {"article.html", "base.html", "partials/og_article.html"} <= set(
+            node["templates"]
+        )
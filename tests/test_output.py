@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+
+from .. import output, plugin
+from .conftest import CONTENT_DIR
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+
+def _mtimes(path: Path) -> dict[Path, int]:
+    return {file: file.stat().st_mtime_ns for file in path.rglob("*.html")}
+
+
+@pytest.mark.usefixtures("attila_plugin")
+class TestSkipUnchanged:
+    @pytest.fixture
+    def content(self, tmp_path: Path) -> Path:
+        return Path(shutil.copytree(CONTENT_DIR, tmp_path / "content"))
+
+    @pytest.mark.parametrize("processes", [0, 2])
+    def test_rebuild(
+        self,
+        tmp_path: Path,
+        content: Path,
+        default_settings: Settings,
+        gen_site: Callable,
+        processes: int,
+    ):
+        default_settings.update(
+            ATTILA_SKIP_UNCHANGED=True,
+            ATTILA_PARALLEL_RENDER=processes,
+            CACHE_PATH=str(tmp_path / "cache"),
+        )
+        site = tmp_path / "output"
+        first = gen_site(path=content, output_path=site).manifest.report
+        assert first.written > 0
+        assert first.skipped == first.deleted == 0
+        mtimes = _mtimes(site)
+
+        second = gen_site(path=content, output_path=site).manifest.report
+        assert (second.written, second.skipped) == (0, first.written)
+        assert _mtimes(site) == mtimes
+        assert not list(site.rglob("*.part"))
+
+    def test_post_processed_outputs(
+        self,
+        tmp_path: Path,
+        content: Path,
+        default_settings: Settings,
+        gen_site: Callable,
+    ):
+        default_settings.update(
+            ATTILA_SKIP_UNCHANGED=True,
+            ATTILA_CRITICAL_CSS=True,
+            CACHE_PATH=str(tmp_path / "cache"),
+        )
+        site = tmp_path / "output"
+        pelican = SimpleNamespace(settings=default_settings, output_path=str(site))
+
+        def build() -> output.OutputReport:
+            # Alive until finalized, as in Pelican.run()
+            writer = gen_site(path=content, output_path=site)
+            # Static files are copied by Pelican's static generator.
+            (site / "theme/css").mkdir(parents=True, exist_ok=True)
+            shutil.copy(
+                Path(__file__).parent.parent / "static/css/style.css",
+                site / "theme/css",
+            )
+            plugin.finalized(pelican)
+            return writer.manifest.report
+
+        first = build()
+        article = site / "2018/04/with-cover-images.html"
+        assert "data-attila-critical" in article.read_text(encoding="utf-8")
+        mtimes = _mtimes(site)
+
+        second = build()
+        assert (second.written, second.skipped) == (0, first.written)
+        assert _mtimes(site) == mtimes
+
+    def test_removed_outputs(
+        self,
+        tmp_path: Path,
+        content: Path,
+        default_settings: Settings,
+        gen_site: Callable,
+    ):
+        default_settings.update(
+            ATTILA_SKIP_UNCHANGED=True, CACHE_PATH=str(tmp_path / "cache")
+        )
+        site = tmp_path / "output"
+        gen_site(path=content, output_path=site)
+        article = site / "2018/04/with-cover-images.html"
+        assert article.exists()
+
+        (content / "article_with_cover_image.rst").unlink()
+        report = gen_site(path=content, output_path=site).manifest.report
+        assert report.deleted >= 1
+        assert report.written > 0
+        assert not article.exists()
+
+
+def test_sync_tree(tmp_path: Path):
+    source, site, cache = tmp_path / "source", tmp_path / "site", tmp_path / "cache"
+    source.mkdir()
+    (source / "index.html").write_text("<p>Hello</p>", encoding="utf-8")
+    (source / "old.html").write_text("<p>Old</p>", encoding="utf-8")
+    report = output.sync_tree(str(source), str(site), str(cache))
+    assert (report.written, report.skipped, report.deleted) == (2, 0, 0)
+    mtime = (site / "index.html").stat().st_mtime_ns
+
+    (source / "old.html").unlink()
+    (source / "new.html").write_text("<p>New</p>", encoding="utf-8")
+    report = output.sync_tree(str(source), str(site), str(cache))
+    assert (report.written, report.skipped, report.deleted) == (1, 1, 1)
+    assert (site / "index.html").stat().st_mtime_ns == mtime
+    assert sorted(path.name for path in site.iterdir()) == ["index.html", "new.html"]
+    assert "1 written, 1 unchanged, 1 deleted" == report.summary()
+
+
+def test_failed_write_keeps_output(tmp_path: Path):
+    manifest = output.OutputManifest(str(tmp_path), str(tmp_path / "cache"))
+    page = tmp_path / "index.html"
+    page.write_text("<p>Before</p>", encoding="utf-8")
+    with pytest.raises(RuntimeError), manifest.open(str(page)) as f:
+        f.write("<p>Half")
+        raise RuntimeError
+    assert page.read_text(encoding="utf-8") == "<p>Before</p>"
+    assert [path.name for path in tmp_path.iterdir() if path.is_file()] == [
+        "index.html"
+    ]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from pelican import signals
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pelican.settings import Settings
+
+
+def _read_tree(path: Path) -> dict[str, bytes]:
+    return {
+        str(file.relative_to(path)): file.read_bytes()
+        for file in path.rglob("*")
+        if file.is_file()
+    }
+
+
+class TestParallelRender:
+    def test_output_matches_serial_build(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ):
+        default_settings["SITEURL"] = "http://www.example.com"
+        gen_site(output_path=tmp_path / "serial")
+
+        default_settings["ATTILA_PARALLEL_RENDER"] = 2
+        writer = gen_site(output_path=tmp_path / "parallel")
+
+        assert writer.pending == {}
+        serial = _read_tree(tmp_path / "serial")
+        assert "2018/04/with-cover-images.html" in serial
+        assert "tag/footag/index.html" in serial
+        assert _read_tree(tmp_path / "parallel") == serial
+
+    def test_relative_urls(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ):
+        default_settings["RELATIVE_URLS"] = True
+        gen_site(output_path=tmp_path / "serial")
+
+        default_settings["ATTILA_PARALLEL_RENDER"] = True
+        gen_site(output_path=tmp_path / "parallel")
+
+        assert _read_tree(tmp_path / "parallel") == _read_tree(tmp_path / "serial")
+
+    def test_content_written_after_write(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ):
+        written = {}
+
+        def content_written(path: str, context: dict) -> None:
+            # What pelican-image-process and pelican-seo do.
+            with open(path, encoding="utf-8") as f:
+                written[path] = f.read()
+
+        signals.content_written.connect(content_written)
+        try:
+            default_settings["ATTILA_PARALLEL_RENDER"] = 2
+            gen_site(output_path=tmp_path)
+        finally:
+            signals.content_written.disconnect(content_written)
+
+        article = os.path.join(tmp_path, "2018/04/with-og-cover-images.html")
+        assert written[article].startswith("<!DOCTYPE html>")
+        assert set(written) == {
+            str(path) for path in tmp_path.rglob("*.html") if "theme" not in path.parts
+        }
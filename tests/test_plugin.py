@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+from jinja2 import Environment
+from pelican.settings import Settings
+
+from .. import plugin
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.usefixtures("attila_plugin")
+class TestPrecomputedArticle:
+    def test_article_cover(
+        self,
+        default_settings: Settings,
+        gen_article_and_html_from_rst: Callable,
+    ):
+        default_settings["SITEURL"] = "http://www.example.com"
+        result, soup = gen_article_and_html_from_rst(
+            rst_path="content/article_with_cover_image.rst",
+        )
+        assert result.selected_cover == f"{default_settings['SITEURL']}{result.cover}"
+        assert result.selected_color is None
+
+        selected = soup.find(name="div", attrs={"class": "post-cover cover"})
+        assert selected is not None
+        assert selected.find(name="img")["src"] == result.selected_cover
+
+    def test_article_header_color(
+        self,
+        default_settings: Settings,
+        gen_article_and_html_from_rst: Callable,
+    ):
+        default_settings["HEADER_COLOR"] = "blue"
+        result, soup = gen_article_and_html_from_rst(
+            rst_path="content/article_without_cover.rst"
+        )
+        assert result.selected_cover is None
+        assert result.selected_color == "blue"
+
+        selected = soup.find(name="div", class_="post-cover cover")
+        assert selected is not None
+        assert "blue" in selected["style"]
+
+    def test_og_and_jsonld_cover(
+        self,
+        default_settings: Settings,
+        gen_article_and_html_from_rst: Callable,
+    ):
+        default_settings["SITEURL"] = "http://www.example.com"
+        result, soup = gen_article_and_html_from_rst(
+            rst_path="content/article_with_og_image.rst"
+        )
+        og_image = soup.find(name="meta", property="og:image")
+        assert og_image is not None
+        assert og_image["content"] == result.og_cover
+        assert result.og_image in result.og_cover
+        assert result.og_image in result.jsonld_cover
+
+    def test_author_meta(
+        self,
+        default_settings: Settings,
+        gen_article_and_html_from_rst: Callable,
+    ):
+        default_settings["AUTHOR_META"] = {
+            "raj": {"name": "Raj V", "image": "assets/images/avatar.png"}
+        }
+        result, soup = gen_article_and_html_from_rst(
+            rst_path="content/article_with_og_image.rst"
+        )
+        author = result.authors[0]
+        assert author.display_name == "Raj V"
+        assert author.avatar == "/assets/images/avatar.png"
+
+        selected = soup.find(name="img", class_="author-profile-image")
+        assert selected is not None
+        assert selected["src"] == author.avatar
+        assert selected["alt"] == "Raj V"
+
+    @pytest.mark.parametrize("name", ["raj", "o'neil", "john2doe", "jean-luc"])
+    def test_author_name_matches_filter(self, default_settings: Settings, name: str):
+        author = type("Author", (), {"name": name})()
+        display_name, _ = plugin.resolve_author(author, default_settings)
+        assert display_name == Environment().from_string("{{ name|title }}").render(
+            name=name
+        )
+
+    def test_excerpts(self, tmp_path: Path, gen_site: Callable):
+        (tmp_path / "content").mkdir()
+        (tmp_path / "content/article.rst").write_text(
+            "Excerpts\n########\n\n:date: 2018-04-29 00:59\n:slug: excerpts\n\n"
+            + "Lorem *ipsum* dolor sit amet. " * 20,
+            encoding="utf-8",
+        )
+        gen_site(path=tmp_path / "content", output_path=tmp_path / "output")
+        soup = BeautifulSoup(
+            (tmp_path / "output/2018/04/excerpts.html").read_text(encoding="utf-8"),
+            "html.parser",
+        )
+        description = soup.find(name="meta", attrs={"name": "description"})
+        assert description["content"].endswith("...")
+        assert len(description["content"]) <= 140
+
+    def test_excerpts_keep_intrasite_links(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ):
+        default_settings["PATH"] = str(tmp_path / "content")
+        (tmp_path / "content/pages").mkdir(parents=True)
+        (tmp_path / "content/pages/about.rst").write_text(
+            "About\n#####\n\n:slug: about\n\nAbout me.\n", encoding="utf-8"
+        )
+        (tmp_path / "content/article.rst").write_text(
+            "Links\n#####\n\n:date: 2018-04-29 00:59\n:slug: links\n\n"
+            "See `about <{filename}/pages/about.rst>`_.\n",
+            encoding="utf-8",
+        )
+        gen_site(path=tmp_path / "content", output_path=tmp_path / "output")
+        soup = BeautifulSoup(
+            (tmp_path / "output/2018/04/links.html").read_text(encoding="utf-8"),
+            "html.parser",
+        )
+        link = soup.select_one(".post-content a")
+        assert link["href"] == "/pages/about/"
+
+    @pytest.mark.parametrize(
+        "summary",
+        [
+            None,
+            "<p>Short &amp; sweet</p>",
+            "<p>" + "Lorem ipsum <em>dolor</em> sit amet. " * 20 + "</p>",
+            "<p>" + "x" * 300 + "</p>",
+        ],
+    )
+    def test_excerpts_match_filters(self, summary: str | None):
+        environment = Environment()
+        excerpts = plugin.excerpts(summary)
+        for length in plugin.EXCERPT_LENGTHS:
+            expected = environment.from_string(
+                "{{ summary|striptags|truncate(length) }}"
+            ).render(summary=summary or "", length=length)
+            assert excerpts[length] == expected
+
+
+@pytest.mark.usefixtures("attila_plugin")
+class TestPrecomputedPage:
+    def test_page_header_cover(
+        self,
+        default_settings: Settings,
+        gen_page_and_html_from_rst: Callable,
+    ):
+        default_settings["HEADER_COVER"] = "http://example.com/cover.jpg"
+        result, soup = gen_page_and_html_from_rst(
+            rst_path="content/pages/page_without_cover_image.rst"
+        )
+        assert result.selected_cover == default_settings["HEADER_COVER"]
+
+        selected = soup.find(name="div", attrs={"class": "post-cover cover"})
+        assert selected.find(name="img")["src"] == result.selected_cover
+
+    def test_relative_urls_skip(
+        self,
+        default_settings: Settings,
+        gen_page_and_html_from_rst: Callable,
+    ):
+        default_settings["RELATIVE_URLS"] = True
+        result, _ = gen_page_and_html_from_rst(
+            rst_path="content/pages/page_with_cover_image.rst"
+        )
+        assert not hasattr(result, "selected_cover")
+
+
+class TestTaxonomyIndex:
+    def test_weights(self):
+        items = [(name, [None] * count) for name, count in zip("dcba", (1, 2, 5, 10))]
+        index = plugin.build_index(items, steps=5)
+        assert [entry.item for entry in index] == ["a", "b", "c", "d"]
+        assert [entry.count for entry in index] == [10, 5, 2, 1]
+        assert [entry.weight for entry in index] == [5, 3, 1, 1]
+        assert plugin.build_index([], steps=5) == []
+
+    @pytest.mark.parametrize("steps", [None, 3])
+    def test_listings_match_templates(
+        self,
+        request: pytest.FixtureRequest,
+        tmp_path: Path,
+        default_settings: Settings,
+        gen_site: Callable,
+        steps: int | None,
+    ):
+        default_settings["TAG_CLOUD_STEPS"] = steps
+        gen_site(output_path=tmp_path / "legacy")
+        request.getfixturevalue("attila_plugin")
+        gen_site(output_path=tmp_path / "indexed")
+
+        for name in ("categories.html", "authors.html", "tags.html"):
+            legacy = (tmp_path / "legacy" / name).read_text(encoding="utf-8")
+            indexed = (tmp_path / "indexed" / name).read_text(encoding="utf-8")
+            assert " ".join(indexed.split()) == " ".join(legacy.split())
+        assert "tag-weight-" in indexed
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+
+from .. import plugin, profiling
+from .conftest import CONTENT_DIR
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+
+@pytest.mark.usefixtures("attila_plugin")
+class TestRenderProfiling:
+    @pytest.fixture(autouse=True)
+    def reset_profiler(self):
+        yield
+        profiling._profiler = None
+
+    def _build(self, settings: Settings, gen_site: Callable, tmp_path: Path):
+        settings["ATTILA_PROFILE"] = str(tmp_path / "profile.json")
+        gen_site(output_path=tmp_path / "output")
+        stats = {
+            name: profiling.TemplateStats(**value)
+            for name, value in profiling.get_profiler().collect().items()
+        }
+        return stats
+
+    def test_records_every_template(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ):
+        stats = self._build(default_settings, gen_site, tmp_path)
+
+        article = stats["article.html"]
+        assert article.calls == len(list(Path(CONTENT_DIR).glob("*.rst")))
+        assert article.bytes > 0
+        # Parents and includes are reported on their own as well.
+        assert stats["base.html"].calls >= article.calls
+        assert stats["partials/og_article.html"].calls == article.calls
+
+    def test_parallel_workers_report_to_the_parent(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ):
+        serial = self._build(default_settings, gen_site, tmp_path / "serial")
+        default_settings["ATTILA_PARALLEL_RENDER"] = 2
+        parallel = self._build(default_settings, gen_site, tmp_path / "parallel")
+
+        assert {name: value.calls for name, value in parallel.items()} == {
+            name: value.calls for name, value in serial.items()
+        }
+        assert parallel["article.html"].bytes == serial["article.html"].bytes
+
+    def test_report(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ):
+        report = tmp_path / "profile.json"
+        default_settings["ATTILA_PROFILE"] = str(report)
+        gen_site(output_path=tmp_path / "output")
+        plugin.finalized(SimpleNamespace(settings=default_settings))
+
+        assert profiling.get_profiler() is None
+        stats = json.loads(report.read_text(encoding="utf-8"))
+        assert set(stats["article.html"]) == {"calls", "seconds", "bytes"}
+        seconds = [value["seconds"] for value in stats.values()]
+        assert seconds == sorted(seconds, reverse=True)
+
+    def test_default_report_path(self, default_settings: Settings):
+        default_settings.update(ATTILA_PROFILE=True, CACHE_PATH="cache")
+        assert profiling.report_path(default_settings) == "cache/attila-profile.json"
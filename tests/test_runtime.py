@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+
+@pytest.fixture
+def build(tmp_path: Path, gen_site: Callable) -> Callable:
+    def build() -> BeautifulSoup:
+        gen_site(output_path=tmp_path)
+        page = tmp_path / "2018/04/with-cover-images.html"
+        return BeautifulSoup(page.read_text(encoding="utf-8"), "html.parser")
+
+    return build
+
+
+def test_no_jquery(build: Callable):
+    soup = build()
+    srcs = [script["src"] for script in soup.find_all("script", src=True)]
+    assert not any("jquery" in src for src in srcs)
+    assert "/theme/js/fitvids.js" in srcs and "/theme/js/script.js" in srcs
+    assert all(
+        script.has_attr("defer") or script.has_attr("async")
+        for script in soup.find_all("script", src=True)
+    )
+    inline = "".join(script.get_text() for script in soup.find_all("script"))
+    assert "$(" not in inline and "fitVids(document.querySelector" in inline
+
+
+def test_jquery_setting(default_settings: Settings, build: Callable):
+    default_settings["ATTILA_JQUERY"] = True
+    srcs = [script["src"] for script in build().find_all("script", src=True)]
+    assert "jquery.slim.min.js" in srcs[0]
+    assert srcs.index("/theme/js/jquery.fitvids.js") < srcs.index("/theme/js/script.js")
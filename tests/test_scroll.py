@@ -0,0 +1,204 @@
+"""Scroll effects of the theme, and a benchmark of their cost in a browser.
+
+The benchmark is skipped unless ``ATTILA_BENCHMARK_SCROLL`` is set, and needs
+Playwright with Chromium (``pip install playwright && playwright install
+chromium``)::
+
+    ATTILA_BENCHMARK_SCROLL=1 pytest tests/test_scroll.py
+
+It scrolls a long article with a cover from top to bottom, with the CPU
+throttled ``ATTILA_BENCHMARK_SCROLL_CPU`` times (4 by default, about a
+mid-range phone), once with ``scroll.js`` and once with the handlers it
+replaced: ``prlx()`` of ``script.js`` and ``readingProgress()`` of
+``article.html``, rewritten without jQuery but with the same layout reads and
+style writes on every event. Layouts, script time and frame times are written
+as JSON to ``ATTILA_BENCHMARK_SCROLL_REPORT`` (by default
+``tests/output/scroll-benchmark.json``).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import statistics
+import threading
+from collections.abc import Callable
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from bs4 import BeautifulSoup
+
+from .conftest import OUTPUT_DIR
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+BENCHMARK = os.environ.get("ATTILA_BENCHMARK_SCROLL")
+CPU_THROTTLE = float(os.environ.get("ATTILA_BENCHMARK_SCROLL_CPU", "4"))
+REPORT = os.environ.get(
+    "ATTILA_BENCHMARK_SCROLL_REPORT", f"{OUTPUT_DIR}/scroll-benchmark.json"
+)
+FRAMES = 300
+THEME_STATIC = Path(__file__).parent.parent / "static"
+THEME_JS = THEME_STATIC / "js"
+
+ARTICLE = """\
+Long read
+#########
+
+:date: 2018-04-29 00:45
+:slug: long-read
+:cover: /assets/images/cover.jpg
+
+{paragraphs}
+"""
+
+# The handlers scroll.js replaced, as they ran on each scroll event.
+LEGACY = """
+(function () {
+  var html = document.documentElement;
+  var cover = document.querySelector('.cover');
+  var post = document.querySelector('.post-content');
+  function prlx() {
+    var windowPosition = window.pageYOffset;
+    var coverPosition = windowPosition > 0 ? Math.floor(windowPosition * 0.25) : 0;
+    cover.style.transform = 'translate3d(0, ' + coverPosition + 'px, 0)';
+    var active = window.pageYOffset < cover.getBoundingClientRect().height;
+    html.classList.toggle('cover-active', active);
+  }
+  function readingProgress() {
+    var rect = post.getBoundingClientRect();
+    var postBottom = rect.top + window.pageYOffset + post.offsetHeight;
+    var viewportHeight = document.documentElement.clientHeight;
+    var offset = viewportHeight / 3;
+    var left = postBottom - (window.pageYOffset + viewportHeight) + offset;
+    var progress = 100 - ((left / (postBottom - viewportHeight + offset)) * 100);
+    document.querySelector('.progress-bar').style.width = progress + '%';
+    var container = document.querySelector('.progress-container');
+    container.classList.toggle('complete', progress > 100);
+  }
+  ['scroll', 'resize', 'orientationchange'].forEach(function (type) {
+    window.addEventListener(type, prlx);
+    window.addEventListener(type, readingProgress);
+  });
+})();
+"""
+
+# Scrolls to the bottom in FRAMES steps, one per animation frame.
+SCROLL = """
+(frames) => new Promise((resolve) => {
+  const step = (document.documentElement.scrollHeight - innerHeight) / frames;
+  const deltas = [];
+  let last = null;
+  function tick(now) {
+    if (last !== null) deltas.push(now - last);
+    last = now;
+    if (deltas.length >= frames) return resolve(deltas);
+    window.scrollBy(0, step);
+    requestAnimationFrame(tick);
+  }
+  requestAnimationFrame(tick);
+})
+"""
+
+
+@pytest.fixture
+def long_read(tmp_path: Path, default_settings: Settings, gen_site: Callable) -> Path:
+    content = tmp_path / "content"
+    content.mkdir()
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 12
+    (content / "long-read.rst").write_text(
+        ARTICLE.format(paragraphs="\n\n".join([paragraph] * 200)), encoding="utf-8"
+    )
+    gen_site(path=content, output_path=tmp_path / "output")
+    return tmp_path / "output"
+
+
+def test_scroll_handlers(long_read: Path):
+    page = (long_read / "2018/04/long-read.html").read_text(encoding="utf-8")
+    soup = BeautifulSoup(page, "html.parser")
+    scripts = [script["src"] for script in soup.find_all("script", src=True)]
+    assert "/theme/js/scroll.js" in scripts
+    inline = "".join(script.get_text() for script in soup.find_all("script"))
+    assert "readingProgress" not in inline and "'scroll'" not in inline
+
+    script = (THEME_JS / "script.js").read_text(encoding="utf-8")
+    assert "prlx" not in script and "'scroll'" not in script
+    scroll = (THEME_JS / "scroll.js").read_text(encoding="utf-8")
+    assert "jQuery" not in scroll and "$(" not in scroll
+    assert "{ passive: true }" in scroll and "requestAnimationFrame" in scroll
+
+
+def _measure(browser, url: str, legacy: bool) -> dict[str, Any]:
+    page = browser.new_page(viewport={"width": 412, "height": 915})
+    # Nothing but the built site: the CDN scripts are not what is measured.
+    page.route(
+        "**/*",
+        lambda route: (
+            route.continue_()
+            if route.request.url.startswith(url.split("/2018/", 1)[0])
+            and not (legacy and route.request.url.endswith("/scroll.js"))
+            else route.abort()
+        ),
+    )
+    cdp = page.context.new_cdp_session(page)
+    cdp.send("Performance.enable")
+    cdp.send("Emulation.setCPUThrottlingRate", {"rate": CPU_THROTTLE})
+    page.goto(url, wait_until="load")
+    if legacy:
+        page.add_script_tag(content=LEGACY)
+
+    def metrics() -> dict[str, float]:
+        return {
+            m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]
+        }
+
+    before = metrics()
+    deltas = page.evaluate(SCROLL, FRAMES)
+    after = metrics()
+    page.close()
+
+    deltas.sort()
+    return {
+        "layouts": after["LayoutCount"] - before["LayoutCount"],
+        "layout_seconds": after["LayoutDuration"] - before["LayoutDuration"],
+        "style_recalcs": after["RecalcStyleCount"] - before["RecalcStyleCount"],
+        "script_seconds": after["ScriptDuration"] - before["ScriptDuration"],
+        "frame_ms_median": statistics.median(deltas),
+        "frame_ms_p95": deltas[int(len(deltas) * 0.95) - 1],
+        "frames_over_32ms": sum(delta > 32 for delta in deltas),
+    }
+
+
+@pytest.mark.skipif(
+    not BENCHMARK, reason="set ATTILA_BENCHMARK_SCROLL to run the scroll benchmark"
+)
+def test_scroll_benchmark(long_read: Path):
+    sync_api = pytest.importorskip("playwright.sync_api")
+    shutil.copytree(THEME_STATIC, long_read / "theme")
+
+    handler = partial(SimpleHTTPRequestHandler, directory=str(long_read))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/2018/04/long-read.html"
+    try:
+        with sync_api.sync_playwright() as playwright:
+            browser = playwright.chromium.launch()
+            results = {
+                "legacy": _measure(browser, url, legacy=True),
+                "scroll.js": _measure(browser, url, legacy=False),
+            }
+            browser.close()
+    finally:
+        server.shutdown()
+
+    os.makedirs(os.path.dirname(REPORT), exist_ok=True)
+    with open(REPORT, "w", encoding="utf-8") as f:
+        json.dump(
+            {"cpu_throttle": CPU_THROTTLE, "frames": FRAMES, **results}, f, indent=2
+        )
+    assert results["scroll.js"]["layouts"] <= results["legacy"]["layouts"]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+
+from .. import search_index
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pelican.settings import Settings
+
+
+def _article(index: int, title: str, **kwargs) -> SimpleNamespace:
+    return SimpleNamespace(
+        url=f"article-{index}.html",
+        title=title,
+        locale_date="Mon 02 April 2018",
+        tags=kwargs.get("tags", ()),
+        authors=kwargs.get("authors", ()),
+        summary=kwargs.get("summary", ""),
+    )
+
+
+def _read(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+class TestSearchIndex:
+    def test_tokenize(self):
+        assert search_index.tokenize("A <b>Pelican</b> théme, v2_0!") == [
+            "pelican",
+            "théme",
+            "v2_0",
+        ]
+
+    def test_weights(self):
+        index = search_index.build_index(
+            [
+                _article(0, "Pelican <em>theme</em>", summary="<p>A theme.</p>"),
+                _article(1, "Other", tags=("theme",)),
+            ]
+        )
+        assert index.docs[0] == ["article-0.html", "Pelican theme", "Mon 02 April 2018"]
+        assert index.postings["theme"] == {0: 5, 1: 3}
+        assert "em" not in index.postings
+
+    def test_shards_split_by_prefix(self, tmp_path: Path):
+        words = [f"{a}{b}word" for a in "abc" for b in "xyz"] + ["ax"]
+        articles = [_article(i, word) for i, word in enumerate(words * 20)]
+        search_index.build_index(articles, shard_size=200).write(str(tmp_path))
+
+        manifest = _read(tmp_path / "index.json")
+        assert manifest["docs"] == len(articles)
+        assert "ax" in manifest["shards"] and "axw" in manifest["shards"]
+        for key in manifest["shards"]:
+            for term in _read(tmp_path / "terms" / f"{key}.json"):
+                # The shard with the longest matching key holds the term.
+                assert key == max(
+                    (k for k in manifest["shards"] if term.startswith(k)), key=len
+                )
+
+        docs = sorted((tmp_path / "docs").iterdir())
+        assert [doc.name for doc in docs] == ["0.json"]
+        assert len(_read(docs[0])) == len(articles)
+
+    @pytest.mark.usefixtures("attila_plugin")
+    def test_site_index(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ):
+        default_settings["ATTILA_SEARCH_INDEX"] = True
+        gen_site(output_path=tmp_path)
+
+        path = tmp_path / default_settings["THEME_STATIC_DIR"] / "search"
+        manifest = _read(path / "index.json")
+        docs = _read(path / "docs" / "0.json")
+        assert manifest["docs"] == len(docs) == 4
+
+        cover = next(key for key in manifest["shards"] if "cover".startswith(key))
+        postings = _read(path / "terms" / f"{cover}.json")["cover"]
+        titles = {docs[doc][1] for doc in postings[::2]}
+        assert "With Cover Images" in titles
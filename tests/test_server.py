@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import gzip
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from .. import server
+
+PAGE = b"<html><body><p>Hello</p></body></html>"
+
+
+@pytest.fixture
+def output(tmp_path: Path) -> Path:
+    (tmp_path / "theme/css").mkdir(parents=True)
+    (tmp_path / "index.html").write_bytes(PAGE)
+    (tmp_path / "theme/css/style.css").write_bytes(b"a{color:red}")
+    (tmp_path / "theme/css/style.css.gz").write_bytes(gzip.compress(b"a{color:red}"))
+    (tmp_path / "theme/css/attila.0123456789.css").write_bytes(b"a{}")
+    return tmp_path
+
+
+@pytest.fixture
+def serve(output: Path) -> Iterator[Callable]:
+    servers = []
+
+    def serve(reloader: server.Reloader | None = None) -> str:
+        httpd = server.make_server(str(output), "127.0.0.1", 0, reloader)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        return f"http://127.0.0.1:{httpd.server_port}"
+
+    yield serve
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _get(url: str, **headers: str):
+    try:
+        return urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+    except urllib.error.HTTPError as error:
+        return error
+
+
+def test_accepted_encodings():
+    assert server.accepted_encodings("gzip, br;q=0, deflate;q=0.5") == {
+        "gzip",
+        "deflate",
+    }
+
+
+def test_etag(serve: Callable):
+    url = serve() + "/"
+    response = _get(url)
+    assert response.read() == PAGE
+    assert response.headers["Cache-Control"] == "no-cache"
+    etag = response.headers["ETag"]
+    assert _get(url, **{"If-None-Match": etag}).status == 304
+
+
+def test_precompressed(serve: Callable):
+    url = serve() + "/theme/css/style.css"
+    response = _get(url, **{"Accept-Encoding": "br, gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.read()) == b"a{color:red}"
+    response = _get(url)
+    assert response.headers["Content-Encoding"] is None
+    assert response.read() == b"a{color:red}"
+
+
+def test_immutable(serve: Callable):
+    response = _get(serve() + "/theme/css/attila.0123456789.css")
+    assert response.headers["Cache-Control"] == server.IMMUTABLE_CACHE
+
+
+def test_reload(serve: Callable):
+    reloader = server.Reloader()
+    base = serve(reloader)
+    script = server.RELOAD_SCRIPT.format(generation=0)
+    assert script.encode() + b"</body>" in _get(base + "/").read()
+
+    events = _get(base + server.RELOAD_PATH + "?generation=0")
+    assert events.headers["Content-Type"] == "text/event-stream"
+    reloader.notify()
+    assert events.readline() == b"data: reload\n"
+    # Pages loaded before that build
+    assert _get(base + server.RELOAD_PATH + "?generation=0").readline() == (
+        b"data: reload\n"
+    )
+
+
+def test_watch_keeps_pages_of_failed_rebuilds():
+    reloader = server.Reloader()
+    rebuilt = []
+
+    def rebuild(paths: set[str]) -> None:
+        rebuilt.append(paths)
+        if "broken.rst" in paths:
+            raise ValueError("broken.rst")
+
+    changes = [{(1, "broken.rst")}, {(2, "fixed.rst")}]
+    server.watch(iter(changes), rebuild, reloader)
+    assert rebuilt == [{"broken.rst"}, {"fixed.rst"}]
+    assert reloader.generation == 1
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+from pelican.contents import Content
+
+from .. import spill
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pelican.settings import Settings
+
+BODY = "Lorem *ipsum* dolor sit amet. " * 40
+
+
+@pytest.fixture
+def content(tmp_path: Path) -> Path:
+    content = tmp_path / "content"
+    content.mkdir()
+    for day in range(1, 4):
+        (content / f"article-{day}.rst").write_text(
+            f"Article {day}\n#########\n\n:date: 2018-04-0{day}\n\n"
+            f"{BODY}\n\nNumber {day}.\n",
+            encoding="utf-8",
+        )
+    return content
+
+
+def _posts(path: Path) -> list[BeautifulSoup]:
+    soup = BeautifulSoup(path.read_text(encoding="utf-8"), "html.parser")
+    return soup.select("article.post")
+
+
+@pytest.mark.usefixtures("attila_plugin")
+class TestSpill:
+    def test_listings_unchanged(
+        self,
+        tmp_path: Path,
+        content: Path,
+        default_settings: Settings,
+        gen_site: Callable,
+    ):
+        default_settings["SHOW_FULL_ARTICLE_IN_SUMMARY"] = True
+        gen_site(path=content, output_path=tmp_path / "plain")
+
+        default_settings["ATTILA_SPILL"] = True
+        default_settings["CACHE_PATH"] = str(tmp_path / "cache")
+        gen_site(path=content, output_path=tmp_path / "spilled")
+
+        plain = _posts(tmp_path / "plain/index.html")
+        spilled = _posts(tmp_path / "spilled/index.html")
+        assert len(spilled) == 3
+        assert [str(post) for post in spilled] == [str(post) for post in plain]
+        assert len(list((tmp_path / "cache/attila-spill").rglob("*.html"))) == 3
+
+    def test_budget(
+        self,
+        tmp_path: Path,
+        content: Path,
+        default_settings: Settings,
+        gen_site: Callable,
+    ):
+        default_settings.update(
+            SHOW_FULL_ARTICLE_IN_SUMMARY=True,
+            ATTILA_SPILL=True,
+            ATTILA_SPILL_BUDGET=len(BODY) * 2,
+            CACHE_PATH=str(tmp_path / "cache"),
+        )
+        gen_site(path=content, output_path=tmp_path / "output")
+        posts = _posts(tmp_path / "output/index.html")
+        # Each body is a little over len(BODY) once rendered
+        assert [bool(post.select(".post-content")) for post in posts] == [
+            True,
+            False,
+            False,
+        ]
+        assert posts[1].select_one(".post-excerpt").text.strip().endswith("...")
+
+
+def test_store(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    class Article:
+        source_path = "article.rst"
+        url = "article.html"
+
+        def get_siteurl(self) -> str:
+            return ""
+
+        def get_content(self, siteurl: str) -> str:
+            return "<p>Body</p>"
+
+    forgotten = []
+    monkeypatch.setattr(
+        spill, "forget_content", lambda content, siteurl: forgotten.append(siteurl)
+    )
+    store = spill.SpillStore(str(tmp_path / "store"))
+    article = Article()
+    body = store.body(article)
+    assert store.body(article) is body
+    assert (body.size, str(body), forgotten) == (11, "<p>Body</p>", [""])
+
+    stale = tmp_path / "store/ab/stale.html"
+    stale.parent.mkdir()
+    stale.write_text("", encoding="utf-8")
+    os.utime(stale, (0, 0))
+    store.prune()
+    assert not stale.exists()
+    assert os.path.exists(body.path)
+
+
+def test_forget_written():
+    cache = Content.get_content.cache
+    article = object()
+    cache[(article, "/blog")] = "<p>Body</p>"
+    spill.forget_written({"article": article, "localsiteurl": "/blog"})
+    assert (article, "/blog") not in cache
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import io
+import logging
+import tarfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+
+from .. import vendor
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+ARTICLE = """{title}
+##########
+
+:date: 2018-04-29 00:45
+:author: arul
+:slug: {slug}
+
+Some text.
+{code}
+"""
+
+
+def _tarball(path: Path, files: dict[str, bytes]) -> None:
+    with tarfile.open(path, "w:gz") as tarball:
+        for name, data in files.items():
+            info = tarfile.TarInfo(f"package/{name}")
+            info.size = len(data)
+            tarball.addfile(info, io.BytesIO(data))
+
+
+def test_download_from_directory(tmp_path: Path):
+    library = vendor.LIBRARIES[0]
+    _tarball(
+        tmp_path / library.tarball,
+        {library.entry: b"jQuery", "src/core.js": b"", "../escape.js": b""},
+    )
+    assert vendor.download(library, str(tmp_path / "static"), str(tmp_path)) == 1
+    copy = tmp_path / "static" / library.directory / library.entry
+    assert copy.read_bytes() == b"jQuery"
+    assert not (tmp_path / "static" / library.directory / "src").exists()
+    assert not (tmp_path / "escape.js").exists()
+
+
+def test_missing_libraries(default_settings: Settings, caplog):
+    with caplog.at_level(logging.WARNING, logger="attila"):
+        assert vendor.vendored(default_settings) is None
+    assert "python -m attila.vendor" in caplog.text
+
+
+@pytest.mark.usefixtures("attila_plugin")
+class TestSelfHosted:
+    @pytest.fixture
+    def build(
+        self, tmp_path: Path, default_settings: Settings, gen_site: Callable
+    ) -> Callable:
+        static = tmp_path / "vendored"
+        for library in vendor.LIBRARIES:
+            entry = static / library.directory / library.entry
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            entry.write_text("", encoding="utf-8")
+        theme_static = default_settings.get("THEME_STATIC_PATHS", ["static"])
+        default_settings.update(
+            ATTILA_SELF_HOSTED=True, THEME_STATIC_PATHS=[*theme_static, str(static)]
+        )
+
+        content = tmp_path / "content"
+        content.mkdir()
+        for slug, code in (("with-code", "::\n\n    print(1)"), ("no-code", "")):
+            (content / f"{slug}.rst").write_text(
+                ARTICLE.format(title=slug, slug=slug, code=code), encoding="utf-8"
+            )
+
+        def build(page: str) -> BeautifulSoup:
+            gen_site(path=content, output_path=tmp_path / "output")
+            path = tmp_path / "output/2018/04" / page
+            return BeautifulSoup(path.read_text(encoding="utf-8"), "html.parser")
+
+        return build
+
+    def test_no_cdn_and_deferred(self, build: Callable):
+        soup = build("no-code.html")
+        scripts = soup.find_all("script", src=True)
+        assert not any("jquery" in script["src"] for script in scripts)
+        assert all(
+            script.has_attr("defer") or script.has_attr("async") for script in scripts
+        )
+        assert not any("googleapis" in s["src"] or "cdnjs" in s["src"] for s in scripts)
+        assert not any("highlight" in script["src"] for script in scripts)
+
+    def test_highlight_only_with_code(self, build: Callable):
+        soup = build("with-code.html")
+        srcs = [script["src"] for script in soup.find_all("script", src=True)]
+        assert "/theme/vendor/highlight.js-11.11.1/highlight.min.js" in srcs
+
+    def test_jquery(self, default_settings: Settings, build: Callable):
+        default_settings["ATTILA_JQUERY"] = True
+        soup = build("no-code.html")
+        srcs = [script["src"] for script in soup.find_all("script", src=True)]
+        assert srcs[0] == "/theme/vendor/jquery-3.6.4/dist/jquery.slim.min.js"
+        assert "/theme/js/jquery.fitvids.js" in srcs
@@ -0,0 +1,199 @@
+"""Self-hosted copies of the third-party scripts the templates load.
+
+``base.html`` and ``article.html`` load highlight.js, MathJax, Font Awesome
+and, with ``ATTILA_JQUERY``, jQuery from CDNs. With ``ATTILA_SELF_HOSTED``
+set, they link the copies found under ``vendor/`` in the theme static paths
+instead, with ``defer``.
+
+The copies are extracted from the npm packages of the pinned versions, once,
+on a machine with network access or from a directory of package tarballs::
+
+    python -m attila.vendor
+    python -m attila.vendor --registry /mnt/mirror/npm --output static
+
+after which the site builds without any network access.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import logging
+import os
+import posixpath
+import tarfile
+import urllib.request
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from . import ATTILA_ROOT, logger
+
+if TYPE_CHECKING:
+    from pelican.settings import Settings
+
+REGISTRY = "https://registry.npmjs.org"
+VENDOR_DIR = "vendor"
+
+
+@dataclass(frozen=True)
+class Library:
+    name: str
+    version: str
+    #: npm package the files are extracted from.
+    package: str
+    #: Files or directories of the package to keep.
+    files: tuple[str, ...]
+    #: File the templates link.
+    entry: str
+    #: Setting the library is only linked with, if any.
+    setting: str | None = None
+
+    @property
+    def directory(self) -> str:
+        """Directory of the copy, relative to the static paths."""
+        return f"{VENDOR_DIR}/{self.name}-{self.version}"
+
+    @property
+    def tarball(self) -> str:
+        return f"{self.package.rsplit('/', 1)[-1]}-{self.version}.tgz"
+
+    def wanted(self, name: str) -> bool:
+        return any(
+            name == path or name.startswith(path.rstrip("/") + "/")
+            for path in self.files
+        )
+
+
+#: Same versions as the CDN URLs of the templates.
+LIBRARIES = (
+    Library(
+        "jquery",
+        "3.6.4",
+        "jquery",
+        ("dist/jquery.slim.min.js",),
+        "dist/jquery.slim.min.js",
+        "ATTILA_JQUERY",
+    ),
+    Library(
+        "highlight.js",
+        "11.11.1",
+        "@highlightjs/cdn-assets",
+        ("highlight.min.js",),
+        "highlight.min.js",
+    ),
+    Library(
+        "mathjax",
+        "2.7.9",
+        "mathjax",
+        (
+            "MathJax.js",
+            "config",
+            "extensions",
+            "jax/element",
+            "jax/input",
+            "jax/output/HTML-CSS",
+            "jax/output/CommonHTML",
+            "jax/output/NativeMML",
+            "jax/output/PreviewHTML",
+            "localization",
+            "fonts/HTML-CSS/TeX/woff",
+        ),
+        "MathJax.js",
+    ),
+    Library(
+        "font-awesome",
+        "4.6.3",
+        "font-awesome",
+        ("css/font-awesome.min.css", "fonts"),
+        "css/font-awesome.min.css",
+    ),
+)
+
+
+def _theme_file(settings: Settings, name: str) -> str | None:
+    # Later THEME_STATIC_PATHS override earlier ones when Pelican copies them.
+    for static_path in reversed(settings.get("THEME_STATIC_PATHS", ["static"])):
+        path = os.path.join(settings["THEME"], static_path, *name.split("/"))
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def vendored(settings: Settings) -> dict[str, str] | None:
+    """Site relative URLs of the self-hosted libraries, by name.
+
+    Returns ``None`` unless all of them are in the theme static paths.
+    """
+    static_dir = settings.get("THEME_STATIC_DIR", "theme")
+    urls, missing = {}, []
+    for library in LIBRARIES:
+        if library.setting and not settings.get(library.setting):
+            continue
+        entry = f"{library.directory}/{library.entry}"
+        if _theme_file(settings, entry) is None:
+            missing.append(f"{library.name} {library.version}")
+        urls[library.name] = f"{static_dir}/{entry}"
+    if missing:
+        logger.warning(
+            "%s not found in the theme static paths, loading them from CDNs; "
+            "run `python -m attila.vendor` to download them",
+            ", ".join(missing),
+        )
+        return None
+    return urls
+
+
+def _open_tarball(library: Library, registry: str) -> tarfile.TarFile:
+    if os.path.isdir(registry):
+        return tarfile.open(os.path.join(registry, library.tarball), "r:gz")
+    url = f"{registry.rstrip('/')}/{library.package}/-/{library.tarball}"
+    logger.info("Downloading %s", url)
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return tarfile.open(fileobj=io.BytesIO(response.read()), mode="r:gz")
+
+
+def download(library: Library, output: str, registry: str = REGISTRY) -> int:
+    """Extract the files of ``library`` under ``output``, returns their number."""
+    count = 0
+    with _open_tarball(library, registry) as tarball:
+        for member in tarball.getmembers():
+            # npm packages have their files under a single top level directory.
+            name = posixpath.normpath(member.name).split("/", 1)[-1]
+            if not member.isfile() or name.startswith("..") or not library.wanted(name):
+                continue
+            target = os.path.join(
+                output, *library.directory.split("/"), *name.split("/")
+            )
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with tarball.extractfile(member) as source, open(target, "wb") as f:
+                f.write(source.read())
+            count += 1
+    if not count:
+        raise ValueError(f"No files of {library.name} in {library.tarball}")
+    return count
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m attila.vendor", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        "--registry",
+        default=REGISTRY,
+        help="npm registry URL, or a directory of the package tarballs "
+        "(jquery-3.6.4.tgz, cdn-assets-11.11.1.tgz...)",
+    )
+    parser.add_argument(
+        "--output",
+        default=str(ATTILA_ROOT / "static"),
+        help="static path the libraries are written to (default: the theme's)",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for library in LIBRARIES:
+        count = download(library, args.output, args.registry)
+        print(f"{library.name} {library.version}: {count} files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Output writer used by the attila plugin."""
+
+from __future__ import annotations
+
+import os
+import weakref
+from typing import TYPE_CHECKING, Any
+
+from pelican import signals
+from pelican.utils import sanitised_join
+from pelican.writers import FileOverwriteFailedError, Writer
+
+from . import archives, logger, spill
+from .incremental import DependencyGraph
+from .output import OutputManifest
+from .parallel import BATCH_SIZE, RenderJob, pool_size, run_jobs
+
+if TYPE_CHECKING:
+    from jinja2 import Template
+    from pelican import Pelican
+    from pelican.settings import Settings
+
+
+# Writers not finalized yet, see finalize_writers().
+_WRITERS: weakref.WeakSet[AttilaWriter] = weakref.WeakSet()
+# Manifests of the finalized writers, see save_manifests().
+_MANIFESTS: weakref.WeakSet[OutputManifest] = weakref.WeakSet()
+
+
+def finalize_writers() -> None:
+    """Finalize the writers of the build, e.g. before reading their output.
+
+    ``finalized`` receivers run in the order they were connected, so plugin
+    receivers run before the writer is done with its deferred pages.
+    """
+    for writer in list(_WRITERS):
+        writer.finalize()
+
+
+def save_manifests() -> None:
+    """Save the state of the outputs once they are post-processed."""
+    for manifest in list(_MANIFESTS):
+        _MANIFESTS.discard(manifest)
+        manifest.save()
+
+
+class _WriterTemplate:
+    """Template handed to ``Writer.write_file`` by :class:`AttilaWriter`.
+
+    Decides, once the local context of the output is known, whether it has to
+    be rendered at all and whether that happens now or in a worker process.
+    """
+
+    def __init__(
+        self,
+        writer: AttilaWriter,
+        template: Template,
+        context: dict[str, Any],
+        kwargs: dict[str, Any],
+    ) -> None:
+        self.writer = writer
+        self.template = template
+        self.context = context
+        self.kwargs = kwargs
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.template, name)
+
+    def render(self, localcontext: dict[str, Any]) -> str:
+        name = localcontext["output_file"]
+        path = sanitised_join(self.writer.output_path, name)
+
+        if (graph := self.writer.dependencies) is not None:
+            node = graph.node(self.template, self.context, localcontext, self.kwargs)
+            graph.record(name, node)
+            if graph.is_unchanged(name, node) and os.path.exists(path):
+                self.writer.unchanged.add(path)
+                if self.writer.processes:
+                    # Already on disk, see AttilaWriter.write_file().
+                    self.writer.written.append((path, localcontext))
+                return ""
+
+        if self.writer.processes or self.template.name in self.writer.streamed:
+            # Written by the job, straight to the file.
+            self.writer.deferred = RenderJob(
+                path, self.template, localcontext, self.context, self.writer.manifest
+            )
+            return ""
+        return self.template.render(localcontext)
+
+
+class AttilaWriter(Writer):
+    """Pelican writer with the opt-in build modes of the theme.
+
+    ``ATTILA_INCREMENTAL``
+        Skip rendering outputs whose source content and templates did not
+        change since the previous build.
+    ``ATTILA_PARALLEL_RENDER``
+        Render pages in that many processes (``True`` for one per CPU) once
+        each generator is done writing. ``content_written`` is sent once the
+        file of the page exists, rather than when Pelican is done with it.
+    ``ATTILA_SKIP_UNCHANGED``
+        Only replace the outputs whose bytes changed since the previous
+        build, and delete those it did not write again.
+    ``ATTILA_ARCHIVE_CHUNKS`` and ``ATTILA_SPILL``
+        Stream the archive, respectively listing, templates to their file
+        rather than rendering them to a string first.
+    """
+
+    def __init__(self, output_path: str, settings: Settings | None = None) -> None:
+        super().__init__(output_path, settings=settings)
+        self.unchanged: set[str] = set()
+        self.dependencies = None
+        if self.settings.get("ATTILA_INCREMENTAL"):
+            self.dependencies = DependencyGraph(
+                self.settings.get("CACHE_PATH", "cache"), self.settings
+            )
+        self.processes = pool_size(self.settings.get("ATTILA_PARALLEL_RENDER"))
+        self.manifest = None
+        if self.settings.get("ATTILA_SKIP_UNCHANGED"):
+            self.manifest = OutputManifest(
+                output_path, self.settings.get("CACHE_PATH", "cache")
+            )
+        self.deferred: RenderJob | None = None
+        self.streamed: tuple[str, ...] = ()
+        if self.settings.get("ATTILA_ARCHIVE_CHUNKS"):
+            self.streamed += archives.TEMPLATES
+        if self.settings.get("ATTILA_SPILL"):
+            self.streamed += spill.TEMPLATES
+        self.pending: dict[str, RenderJob] = {}
+        # Outputs to send content_written for, with their local context.
+        self.written: list[tuple[str, dict[str, Any]]] = []
+
+        signals.article_writer_finalized.connect(self._generator_finalized)
+        signals.page_writer_finalized.connect(self._generator_finalized)
+        signals.finalized.connect(self.finalize)
+        _WRITERS.add(self)
+
+    def write_file(self, name, template, context, *args, **kwargs):
+        if (self.dependencies is not None or self.processes or self.streamed) and name:
+            template = _WriterTemplate(self, template, context, kwargs)
+        if not (self.processes and name):
+            return super().write_file(name, template, context, *args, **kwargs)
+
+        # Receivers open the file, which the workers have not written yet.
+        with signals.content_written.muted():
+            super().write_file(name, template, context, *args, **kwargs)
+        self._send_written()
+        if len(self.pending) >= BATCH_SIZE:
+            self.flush()
+        return None
+
+    def _send_written(self) -> None:
+        written, self.written = self.written, []
+        for path, localcontext in written:
+            signals.content_written.send(path, context=localcontext)
+
+    def _register_write(self, filename: str, override: bool) -> bool:
+        """Book-keeping of ``Writer._open_w`` for an output written elsewhere.
+
+        Returns ``False`` when Pelican would have discarded that write.
+        """
+        if filename in self._overridden_files:
+            if override:
+                raise FileOverwriteFailedError(
+                    f'Failed to overwrite "{filename}" a second time '
+                    "(was previously overwritten)"
+                )
+            return False
+        if filename in self._written_files and not override:
+            raise FileOverwriteFailedError(
+                f'Failed to overwrite "{filename}" as Pelican has already '
+                "written to it previously (set `override=True` if intended)"
+            )
+        if override:
+            self._overridden_files.add(filename)
+        self._written_files.add(filename)
+        return True
+
+    def _open_w(self, filename, encoding, override=False):
+        deferred, self.deferred = self.deferred, None
+        if deferred is not None and deferred.path == filename:
+            if self._register_write(filename, override):
+                if not self.processes:
+                    # A streamed template, written now.
+                    deferred.run()
+                else:
+                    self.pending[filename] = deferred
+            return open(os.devnull, "w", encoding=encoding)
+        if filename in self.unchanged:
+            self._register_write(filename, override)
+            if self.manifest is not None:
+                self.manifest.keep(filename)
+            logger.debug('Skipping unchanged "%s"', filename)
+            return open(os.devnull, "w", encoding=encoding)
+        if self.manifest is not None:
+            if not self._register_write(filename, override):
+                logger.info('Skipping "%s", not overwriting', filename)
+                return open(os.devnull, "w", encoding=encoding)
+            return self.manifest.open(filename, encoding)
+        return super()._open_w(filename, encoding, override=override)
+
+    def flush(self) -> None:
+        """Render the pages deferred so far."""
+        jobs = list(self.pending.values())
+        self.pending.clear()
+        if jobs:
+            run_jobs(jobs, self.processes)
+        self.written += [(job.path, job.localcontext) for job in jobs]
+        self._send_written()
+
+    def _generator_finalized(self, sender, writer: Writer | None = None) -> None:
+        if writer is self:
+            self.flush()
+
+    def finalize(self, sender: Pelican | None = None) -> None:
+        """Persist the build state, called once all generators are done."""
+        signals.article_writer_finalized.disconnect(self._generator_finalized)
+        signals.page_writer_finalized.disconnect(self._generator_finalized)
+        signals.finalized.disconnect(self.finalize)
+        if self not in _WRITERS:
+            return
+        _WRITERS.discard(self)
+        self.flush()
+        if self.manifest is not None:
+            # A partial build did not write everything it used to.
+            self.manifest.finish(delete=not self.settings.get("WRITE_SELECTED"))
+            _MANIFESTS.add(self.manifest)
+        if self.dependencies is not None:
+            self.dependencies.save()
+            logger.info(
+                "Incremental build: %d outputs unchanged, %d rendered",
+                len(self.unchanged),
+                len(self.dependencies.nodes) - len(self.unchanged),
+            )